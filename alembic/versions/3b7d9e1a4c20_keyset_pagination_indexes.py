@@ -0,0 +1,38 @@
+"""keyset pagination indexes
+
+Revision ID: 3b7d9e1a4c20
+Revises: 8f2808d1c3af
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e1a4c20'
+down_revision: Union[str, None] = '8f2808d1c3af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_schools_created_at_id', 'schools', ['created_at', 'id']),
+    ('ix_students_created_at_id', 'students', ['created_at', 'id']),
+    ('ix_students_school_id_created_at_id', 'students', ['school_id', 'created_at', 'id']),
+    ('ix_invoices_issued_at_id', 'invoices', ['issued_at', 'id']),
+    ('ix_invoices_student_id_issued_at_id', 'invoices', ['student_id', 'issued_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
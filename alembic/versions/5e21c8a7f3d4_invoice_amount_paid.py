@@ -0,0 +1,42 @@
+"""denormalized invoice amount_paid
+
+Revision ID: 5e21c8a7f3d4
+Revises: 3b7d9e1a4c20
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e21c8a7f3d4'
+down_revision: Union[str, None] = '3b7d9e1a4c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'invoices',
+        sa.Column('amount_paid', sa.Numeric(precision=10, scale=2), nullable=False, server_default='0')
+    )
+    # Backfill from the payment history
+    op.execute(
+        """
+        UPDATE invoices AS i
+        SET amount_paid = p.total
+        FROM (
+            SELECT invoice_id, SUM(amount) AS total
+            FROM payments
+            GROUP BY invoice_id
+        ) AS p
+        WHERE p.invoice_id = i.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('invoices', 'amount_paid')
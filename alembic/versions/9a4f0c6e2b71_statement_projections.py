@@ -0,0 +1,68 @@
+"""statement balance projections
+
+Revision ID: 9a4f0c6e2b71
+Revises: 5e21c8a7f3d4
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f0c6e2b71'
+down_revision: Union[str, None] = '5e21c8a7f3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+currency = postgresql.ENUM('USD', 'EUR', 'GBP', name='currency', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table('student_balances',
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency', currency, nullable=False),
+        sa.Column('school_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('invoice_count', sa.Integer(), nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('student_id', 'currency')
+    )
+    op.create_table('school_balances',
+        sa.Column('school_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency', currency, nullable=False),
+        sa.Column('invoice_count', sa.Integer(), nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('school_id', 'currency')
+    )
+
+    # Initial projection; `python -m src.cli rebuild-projections` does the same later on
+    op.execute(
+        """
+        INSERT INTO student_balances
+            (student_id, currency, school_id, invoice_count, total_invoiced, total_paid, updated_at)
+        SELECT student_id, currency, school_id, COUNT(*), SUM(amount_total), SUM(amount_paid), timezone('utc', now())
+        FROM invoices
+        GROUP BY student_id, school_id, currency
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO school_balances
+            (school_id, currency, invoice_count, total_invoiced, total_paid, updated_at)
+        SELECT school_id, currency, COUNT(*), SUM(amount_total), SUM(amount_paid), timezone('utc', now())
+        FROM invoices
+        GROUP BY school_id, currency
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('school_balances')
+    op.drop_table('student_balances')
@@ -0,0 +1,49 @@
+"""daily collections rollup
+
+Revision ID: a8c4e0f79b35
+Revises: f5b8d3c61e27
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e0f79b35'
+down_revision: Union[str, None] = 'f5b8d3c61e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+currency = postgresql.ENUM('USD', 'EUR', 'GBP', name='currency', create_type=False)
+
+
+def upgrade() -> None:
+    # PK order serves the time-series reads: one school, a day range, every currency
+    op.create_table('daily_collections',
+        sa.Column('school_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('currency', currency, nullable=False),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.Column('amount_collected', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('school_id', 'day', 'currency')
+    )
+
+    # Initial backfill; `python -m src.cli backfill-collections` does the same later on
+    op.execute(
+        """
+        INSERT INTO daily_collections (school_id, day, currency, payment_count, amount_collected, updated_at)
+        SELECT i.school_id, p.paid_at::date, p.currency, COUNT(*), SUM(p.amount), timezone('utc', now())
+        FROM payments p
+        JOIN invoices i ON i.id = p.invoice_id
+        GROUP BY i.school_id, p.paid_at::date, p.currency
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_collections')
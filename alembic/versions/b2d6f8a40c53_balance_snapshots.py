@@ -0,0 +1,59 @@
+"""monthly balance snapshots for date-ranged statements
+
+Revision ID: b2d6f8a40c53
+Revises: a8c4e0f79b35
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d6f8a40c53'
+down_revision: Union[str, None] = 'a8c4e0f79b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+currency = postgresql.ENUM('USD', 'EUR', 'GBP', name='currency', create_type=False)
+
+
+def upgrade() -> None:
+    # Cumulative totals of everything issued/paid strictly before `as_of`; filled by the
+    # snapshot_balances job, so no initial data here
+    op.create_table('student_balance_snapshots',
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('currency', currency, nullable=False),
+        sa.Column('school_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('student_id', 'as_of', 'currency')
+    )
+    op.create_table('school_balance_snapshots',
+        sa.Column('school_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('currency', currency, nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('school_id', 'as_of', 'currency')
+    )
+
+    # Each snapshot only reads the payments made since the previous one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_payments_paid_at', 'payments', ['paid_at'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_payments_paid_at', table_name='payments', postgresql_concurrently=True)
+    op.drop_table('school_balance_snapshots')
+    op.drop_table('student_balance_snapshots')
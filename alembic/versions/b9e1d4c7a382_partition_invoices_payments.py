@@ -0,0 +1,149 @@
+"""range-partition invoices and payments by month
+
+Revision ID: b9e1d4c7a382
+Revises: b2d6f8a40c53
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e1d4c7a382'
+down_revision: Union[str, None] = 'b2d6f8a40c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created past the current one; the partition maintenance job keeps this window
+MONTHS_AHEAD = 3
+
+TABLES = {
+    'invoices': {
+        'key': 'issued_at',
+        'indexes': [
+            ('ix_invoices_school_id', 'school_id', None),
+            ('ix_invoices_status', 'status', None),
+            ('ix_invoices_student_id', 'student_id', None),
+            ('ix_invoices_issued_at_id', 'issued_at, id', None),
+            ('ix_invoices_student_id_issued_at_id', 'student_id, issued_at, id', None),
+            ('ix_invoices_school_id_issued_at_id', 'school_id, issued_at, id', None),
+            ('ix_invoices_open_due_date', 'due_date', "status IN ('PENDING', 'PARTIALLY_PAID')"),
+            ('ix_invoices_overdue_issued_at_id', 'issued_at, id', "status = 'OVERDUE'"),
+        ],
+        'foreign_keys': [
+            ('invoices_school_id_fkey', 'school_id', 'schools'),
+            ('invoices_student_id_fkey', 'student_id', 'students'),
+        ],
+    },
+    'payments': {
+        'key': 'paid_at',
+        'indexes': [
+            ('ix_payments_invoice_id', 'invoice_id', None),
+            ('ix_payments_paid_at', 'paid_at', None),
+        ],
+        'foreign_keys': [],
+    },
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes(table: str, spec: dict) -> None:
+    for name, columns, where in spec['indexes']:
+        predicate = f" WHERE {where}" if where else ""
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns}){predicate}")
+
+
+def _receivables_view() -> str:
+    # Views bind to table OIDs, so the view is recreated on top of the new parent
+    return op.get_bind().execute(sa.text("SELECT pg_get_viewdef('school_receivables'::regclass)")).scalar_one()
+
+
+def _create_receivables_view(definition: str) -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW school_receivables AS {definition}")
+    op.create_index(
+        'ux_school_receivables_created_at_id_currency', 'school_receivables',
+        ['school_created_at', 'school_id', 'currency'], unique=True
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    view = _receivables_view()
+    op.execute("DROP MATERIALIZED VIEW school_receivables")
+    # A partitioned invoices table cannot have a unique index on id alone, which the
+    # foreign key needs; payment inserts are guarded by the invoice UPDATE they run with
+    op.execute("ALTER TABLE payments DROP CONSTRAINT payments_invoice_id_fkey")
+
+    for table, spec in TABLES.items():
+        key = spec['key']
+        latest = bind.execute(sa.text(f"SELECT max({key}) FROM {table}")).scalar()
+        newest = max(date.today(), latest.date() if latest else date.today())
+        bound = _add_months(newest.replace(day=1), 1)
+        history = f"{table}_history"
+
+        # The existing table becomes the history partition as-is: no rows are copied
+        op.execute(f"ALTER TABLE {table} RENAME TO {history}")
+        op.execute(f"ALTER TABLE {history} RENAME CONSTRAINT {table}_pkey TO {history}_pkey")
+        for name, _, _ in spec['indexes']:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name.replace(f'ix_{table}_', f'ix_{history}_')}")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {history} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})")
+        for name, column, target in spec['foreign_keys']:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target} (id)")
+        _create_indexes(table, spec)
+
+        # A validated CHECK matching the bound lets ATTACH skip its own full-table scan;
+        # matching indexes are adopted, only the (id, key) unique index is built
+        op.execute(
+            f"ALTER TABLE {history} ADD CONSTRAINT {history}_bound "
+            f"CHECK ({key} IS NOT NULL AND {key} < '{bound.isoformat()}') NOT VALID"
+        )
+        op.execute(f"ALTER TABLE {history} VALIDATE CONSTRAINT {history}_bound")
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {history} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{bound.isoformat()}')"
+        )
+        op.execute(f"ALTER TABLE {history} DROP CONSTRAINT {history}_bound")
+
+        # At least one monthly partition, which partition maintenance builds on
+        month, last = bound, max(bound, _add_months(date.today().replace(day=1), MONTHS_AHEAD))
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+            month = _add_months(month, 1)
+
+    _create_receivables_view(view)
+
+
+def downgrade() -> None:
+    view = _receivables_view()
+    op.execute("DROP MATERIALIZED VIEW school_receivables")
+
+    for table, spec in TABLES.items():
+        flat = f"{table}_unpartitioned"
+        op.execute(f"CREATE TABLE {flat} (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {flat} SELECT * FROM {table}")
+        # Drops every partition, including the history one
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {flat} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        for name, column, target in spec['foreign_keys']:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target} (id)")
+        _create_indexes(table, spec)
+
+    op.execute(
+        "ALTER TABLE payments ADD CONSTRAINT payments_invoice_id_fkey "
+        "FOREIGN KEY (invoice_id) REFERENCES invoices (id)"
+    )
+    _create_receivables_view(view)
@@ -0,0 +1,31 @@
+"""school invoice ordering index
+
+Revision ID: c3e85f2d1a96
+Revises: 9a4f0c6e2b71
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e85f2d1a96'
+down_revision: Union[str, None] = '9a4f0c6e2b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets streamed school statements read invoices in order without a sort step
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_invoices_school_id_issued_at_id', 'invoices', ['school_id', 'issued_at', 'id'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_invoices_school_id_issued_at_id', table_name='invoices', postgresql_concurrently=True)
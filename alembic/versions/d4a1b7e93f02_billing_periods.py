@@ -0,0 +1,36 @@
+"""recurring invoice billing period ledger
+
+Revision ID: d4a1b7e93f02
+Revises: c3e85f2d1a96
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a1b7e93f02'
+down_revision: Union[str, None] = 'c3e85f2d1a96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('billing_periods',
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('billing_period', sa.String(length=7), nullable=False),
+        sa.Column('invoice_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id', 'billing_period')
+    )
+    op.create_index(op.f('ix_billing_periods_invoice_id'), 'billing_periods', ['invoice_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_billing_periods_invoice_id'), table_name='billing_periods')
+    op.drop_table('billing_periods')
@@ -0,0 +1,40 @@
+"""partial indexes for the overdue sweeper and overdue listing
+
+Revision ID: e7c2a95d4b18
+Revises: d4a1b7e93f02
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2a95d4b18'
+down_revision: Union[str, None] = 'd4a1b7e93f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Only invoices the sweeper may still flip; PAID/OVERDUE rows never enter the index
+        op.create_index(
+            'ix_invoices_open_due_date', 'invoices', ['due_date'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text("status IN ('PENDING', 'PARTIALLY_PAID')")
+        )
+        # Keyset pages of /invoices?status=OVERDUE
+        op.create_index(
+            'ix_invoices_overdue_issued_at_id', 'invoices', ['issued_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'OVERDUE'")
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_invoices_overdue_issued_at_id', table_name='invoices', postgresql_concurrently=True)
+        op.drop_index('ix_invoices_open_due_date', table_name='invoices', postgresql_concurrently=True)
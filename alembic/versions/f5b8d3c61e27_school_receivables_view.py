@@ -0,0 +1,49 @@
+"""cross-school receivables materialized view
+
+Revision ID: f5b8d3c61e27
+Revises: e7c2a95d4b18
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d3c61e27'
+down_revision: Union[str, None] = 'e7c2a95d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per (school, currency); refreshed by the `refresh_receivables` job
+    # or `python -m src.cli refresh-receivables`
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW school_receivables AS
+        SELECT s.id AS school_id, s.name AS school_name, s.created_at AS school_created_at, i.currency,
+               COUNT(*) AS invoice_count,
+               SUM(i.amount_total) AS total_invoiced,
+               SUM(i.amount_paid) AS total_collected,
+               SUM(i.amount_total - i.amount_paid) AS total_outstanding,
+               COUNT(*) FILTER (WHERE i.status = 'PENDING') AS pending_count,
+               COUNT(*) FILTER (WHERE i.status = 'PARTIALLY_PAID') AS partially_paid_count,
+               COUNT(*) FILTER (WHERE i.status = 'PAID') AS paid_count,
+               COUNT(*) FILTER (WHERE i.status = 'OVERDUE') AS overdue_count
+        FROM schools s
+        JOIN invoices i ON i.school_id = s.id
+        GROUP BY s.id, s.name, s.created_at, i.currency
+        """
+    )
+    # REFRESH ... CONCURRENTLY needs a unique index; the leading columns also serve
+    # the dashboard's (created_at, id) keyset pages
+    op.create_index(
+        'ux_school_receivables_created_at_id_currency', 'school_receivables',
+        ['school_created_at', 'school_id', 'currency'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW school_receivables")
@@ -0,0 +1,104 @@
+"""Receivables aging: bucketing statement payloads in Python vs GROUP BY in SQL.
+
+Seeds `--schools` throwaway schools with `--students` students each and
+`--invoices` invoices per student (2M invoices with the defaults) using
+set-based INSERT ... SELECT generate_series, inside a transaction that is
+rolled back at the end. It then ages one school three ways:
+
+- "statement (before)": the full account statement is loaded and bucketed client-side
+- "SQL aging (after)": the repository's GROUP BY / CASE query
+- "SQL aging by student": the same query with the per-student breakdown
+
+    python -m benchmarks.bench_aging_report [--schools 100] [--students 100] [--invoices 200] [--rounds 5]
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from src.adapters.persistence.db import AsyncSessionLocal
+from src.adapters.persistence.repos import SQLAlchemyStatementRepository
+
+async def seed(session, schools: int, students: int, invoices: int):
+    tag = f"bench-aging-{uuid4()}"
+    params = {"tag": tag, "schools": schools, "students": students, "invoices": invoices}
+    await session.execute(text(
+        "INSERT INTO schools (id, name, created_at) "
+        "SELECT gen_random_uuid(), :tag, timezone('utc', now()) FROM generate_series(1, :schools)"
+    ), params)
+    await session.execute(text(
+        "INSERT INTO students (id, school_id, name, created_at) "
+        "SELECT gen_random_uuid(), s.id, 'student ' || g, timezone('utc', now()) "
+        "FROM schools s, generate_series(1, :students) g WHERE s.name = :tag"
+    ), params)
+    # Due dates spread over the last ~5 months; a quarter-step of the total already paid
+    await session.execute(text(
+        """
+        INSERT INTO invoices
+            (id, student_id, school_id, amount_total, amount_paid, currency, issued_at, due_date, status)
+        SELECT gen_random_uuid(), st.id, st.school_id, 100.00, paid, 'USD',
+               timezone('utc', now()) - g * interval '1 hour', current_date - due_offset,
+               CASE WHEN paid = 100 THEN 'PAID' WHEN paid > 0 THEN 'PARTIALLY_PAID' ELSE 'PENDING' END::invoicestatus
+        FROM students st
+        JOIN schools s ON s.id = st.school_id AND s.name = :tag
+        CROSS JOIN generate_series(1, :invoices) g
+        CROSS JOIN LATERAL (
+            SELECT floor(random() * 5) * 25.00 AS paid, floor(random() * 150)::int - 15 AS due_offset
+            WHERE g > 0
+        ) r
+        """
+    ), params)
+    await session.execute(text("ANALYZE invoices"))
+    result = await session.execute(text("SELECT id FROM schools WHERE name = :tag LIMIT 1"), params)
+    return result.scalar_one()
+
+def bucket_statement(statement, as_of: date) -> dict:
+    buckets = {"current": Decimal(0), "1_30": Decimal(0), "31_60": Decimal(0), "61_90": Decimal(0), "over_90": Decimal(0)}
+    for invoice in statement.invoices:
+        if invoice.amount_due <= 0:
+            continue
+        days = (as_of - invoice.due_date).days
+        key = "current" if days <= 0 else "1_30" if days <= 30 else "31_60" if days <= 60 else "61_90" if days <= 90 else "over_90"
+        buckets[key] += invoice.amount_due
+    return buckets
+
+async def measure(label, run, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} best {best * 1000:9.1f} ms")
+
+async def main(schools: int, students: int, invoices: int, rounds: int):
+    async with AsyncSessionLocal() as session:
+        start = time.perf_counter()
+        school_id = await seed(session, schools, students, invoices)
+        print(f"seeded {schools * students * invoices:,} invoices in {time.perf_counter() - start:.1f} s "
+              f"({students * invoices:,} in the measured school)")
+
+        repo = SQLAlchemyStatementRepository(session)
+        as_of = date.today()
+
+        async def from_statement():
+            bucket_statement(await repo.get_school_statement(school_id), as_of)
+
+        await measure("statement (before)", from_statement, rounds)
+        await measure("SQL aging (after)", lambda: repo.get_school_aging(school_id, as_of), rounds)
+        await measure("SQL aging by student", lambda: repo.get_school_aging(school_id, as_of, by_student=True), rounds)
+
+        await session.rollback()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schools", type=int, default=100)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--invoices", type=int, default=200, help="Invoices per student")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.schools, args.students, args.invoices, args.rounds))
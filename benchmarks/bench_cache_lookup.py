@@ -0,0 +1,73 @@
+"""Statement cache hits: GET version then GET value vs one Lua round trip.
+
+Writes one cached statement under throwaway `bench-cache-*` keys in the configured
+Redis, then reads it `--reads` times each way straight through RedisCacheAdapter
+(no local tier) and prints p50/p99 per hit. The keys are deleted at the end.
+
+- "two round trips (before)": get_version, then get_model on the versioned key
+- "versioned lookup (after)": get_versioned_model, a single EVALSHA
+
+    python -m benchmarks.bench_cache_lookup [--reads 5000] [--invoices 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from src.adapters.persistence.db import redis_cache
+from src.application.dtos import AccountStatementDTO, InvoiceDTO
+from src.application.ports.cache import version_key, versioned_key
+from src.domain.enums import Currency, InvoiceStatus
+
+def make_statement(invoices: int) -> AccountStatementDTO:
+    rows = [
+        InvoiceDTO(
+            id=uuid4(), amount_total=Decimal("100.00"), amount_paid=Decimal("25.00"), amount_due=Decimal("75.00"),
+            currency=Currency.USD, status=InvoiceStatus.PARTIALLY_PAID, issued_at=datetime.utcnow(), due_date=date.today()
+        )
+        for _ in range(invoices)
+    ]
+    return AccountStatementDTO(
+        entity_id=uuid4(), generated_at=datetime.utcnow(), invoices=rows,
+        total_due=Decimal("75.00") * invoices, currency="USD", invoice_count=invoices
+    )
+
+async def measure(label, run, reads):
+    samples = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        assert await run() is not None
+        samples.append((time.perf_counter() - start) * 1000)
+    cuts = statistics.quantiles(samples, n=100)
+    print(f"{label:<28} p50 {cuts[49]:7.3f} ms   p99 {cuts[98]:7.3f} ms")
+
+async def main(reads: int, invoices: int):
+    key_prefix = f"bench-cache-{uuid4()}"
+    await redis_cache.increment_version(key_prefix)
+    version = await redis_cache.get_version(key_prefix)
+    await redis_cache.set_versioned_model(key_prefix, "statement", "", version, make_statement(invoices), ttl_seconds=600)
+
+    async def two_round_trips():
+        current = await redis_cache.get_version(key_prefix)
+        return await redis_cache.get_model(versioned_key(key_prefix, "statement", current), AccountStatementDTO)
+
+    async def versioned_lookup():
+        _, cached = await redis_cache.get_versioned_model(key_prefix, "statement", "", AccountStatementDTO)
+        return cached
+
+    try:
+        await versioned_lookup()  # loads the script
+        await measure("two round trips (before)", two_round_trips, reads)
+        await measure("versioned lookup (after)", versioned_lookup, reads)
+    finally:
+        await redis_cache.redis.delete(version_key(key_prefix), versioned_key(key_prefix, "statement", version))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--invoices", type=int, default=50, help="Invoices in the cached statement")
+    args = parser.parse_args()
+    asyncio.run(main(args.reads, args.invoices))
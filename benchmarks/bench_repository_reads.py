@@ -0,0 +1,105 @@
+"""Repository read throughput: ORM entity loading vs Core column rows.
+
+Seeds one throwaway school with 10k students and 10k invoices inside a
+transaction that is rolled back at the end, then reads 10k-row pages through
+the previous ORM mapping ("before": entities, with payments selectin-loaded for
+invoices) and the repositories ("after").
+
+    python -m benchmarks.bench_repository_reads [--rows 10000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload
+
+from src.adapters.persistence.db import AsyncSessionLocal
+from src.adapters.persistence.models_business import SchoolModel, StudentModel, InvoiceModel
+from src.adapters.persistence.repos import SQLAlchemyStudentRepository, SQLAlchemyInvoiceRepository
+from src.domain.entities import Student, Invoice, Payment
+from src.domain.enums import Currency, InvoiceStatus
+from src.domain.value_objects import Money
+
+async def seed(session, rows: int):
+    school_id = uuid4()
+    now = datetime.utcnow()
+    await session.execute(insert(SchoolModel).values(id=school_id, name="bench", created_at=now))
+    students = [
+        {"id": uuid4(), "school_id": school_id, "name": f"student {i}", "created_at": now - timedelta(seconds=i)}
+        for i in range(rows)
+    ]
+    await session.execute(insert(StudentModel), students)
+    student_id = students[0]["id"]
+    invoices = [
+        {
+            "id": uuid4(), "student_id": student_id, "school_id": school_id,
+            "amount_total": Decimal("100.00"), "amount_paid": Decimal("0.00"), "currency": Currency.USD,
+            "issued_at": now - timedelta(seconds=i), "due_date": date.today(), "status": InvoiceStatus.PENDING
+        } for i in range(rows)
+    ]
+    await session.execute(insert(InvoiceModel), invoices)
+    return school_id, student_id
+
+async def orm_students(session, school_id, rows):
+    result = await session.execute(
+        select(StudentModel).where(StudentModel.school_id == school_id)
+        .order_by(StudentModel.created_at.desc(), StudentModel.id.desc()).limit(rows)
+    )
+    return [Student(id=m.id, school_id=m.school_id, name=m.name, created_at=m.created_at) for m in result.scalars()]
+
+async def orm_invoices(session, student_id, rows):
+    result = await session.execute(
+        select(InvoiceModel).where(InvoiceModel.student_id == student_id)
+        .options(selectinload(InvoiceModel.payments))
+        .order_by(InvoiceModel.issued_at.desc(), InvoiceModel.id.desc()).limit(rows)
+    )
+    return [
+        Invoice(
+            id=m.id, student_id=m.student_id, school_id=m.school_id, amount=Money(m.amount_total, m.currency),
+            due_date=m.due_date, status=m.status, issued_at=m.issued_at, paid_amount=m.amount_paid,
+            payments=[
+                Payment(id=p.id, invoice_id=p.invoice_id, amount=Money(p.amount, p.currency), paid_at=p.paid_at)
+                for p in m.payments
+            ]
+        ) for m in result.scalars()
+    ]
+
+async def measure(session, label, read, rounds):
+    best = None
+    for _ in range(rounds):
+        session.expunge_all()
+        start = time.perf_counter()
+        items = await read()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {len(items):>7} rows  best {best * 1000:8.1f} ms  {len(items) / best:12,.0f} rows/s")
+
+async def main(rows: int, rounds: int):
+    async with AsyncSessionLocal() as session:
+        school_id, student_id = await seed(session, rows)
+        students = SQLAlchemyStudentRepository(session)
+        invoices = SQLAlchemyInvoiceRepository(session)
+        
+        await measure(session, "students ORM (before)", lambda: orm_students(session, school_id, rows), rounds)
+        await measure(session, "students Core (after)",
+                      lambda: _items(students.list(limit=rows, offset=0, school_id=school_id)), rounds)
+        await measure(session, "invoices ORM (before)", lambda: orm_invoices(session, student_id, rows), rounds)
+        await measure(session, "invoices Core (after)",
+                      lambda: _items(invoices.list(limit=rows, offset=0, student_id=student_id)), rounds)
+        
+        await session.rollback()
+
+async def _items(coro):
+    items, _ = await coro
+    return items
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.rounds))
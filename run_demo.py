@@ -67,24 +67,22 @@ async def main():
         print(f"DEBUG: total_due type: {type(data['total_due'])} value: {data['total_due']}")
         assert float(data["total_due"]) == 100.0, f"Expected 100.0, got {data['total_due']}"
 
-        # TODO: Fix greenlet_spawn error in payment processing
-        # await print_step("5. Process Payment (Amount: 40.00)")
-        # resp = await client.post("/payments", json={
-        #     "invoice_id": invoice_id,
-        #     "amount": 40.00
-        # }, headers=headers)
-        # data = await log_req_res(resp)
-        # assert resp.status_code == 200
+        await print_step("5. Process Payment (Amount: 40.00)")
+        resp = await client.post("/payments", json={
+            "invoice_id": invoice_id,
+            "amount": 40.00
+        }, headers=headers)
+        data = await log_req_res(resp)
+        assert resp.status_code == 201
 
-        # await print_step("6. Get Account Statement (After Payment)")
-        # resp = await client.get(f"/students/{student_id}/account-statement")
-        # data = await log_req_res(resp)
-        # assert resp.status_code == 200
-        # assert float(data["total_due"]) == 60.0, f"Expected 60.0, got {data['total_due']}"
-        # assert data["invoices"][0]["status"] == "PARTIALLY_PAID"
+        await print_step("6. Get Account Statement (After Payment)")
+        resp = await client.get(f"/students/{student_id}/account-statement")
+        data = await log_req_res(resp)
+        assert resp.status_code == 200
+        assert float(data["total_due"]) == 60.0, f"Expected 60.0, got {data['total_due']}"
+        assert data["invoices"][0]["status"] == "PARTIALLY_PAID"
 
-        print("\n✅ SUCCESS: Demo completed (Payment step temporarily disabled)")
-        print("Note: Payment processing has a known async issue that needs fixing")
+        print("\n✅ SUCCESS: Demo completed")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.adapters.cache.local_cache import TwoTierCacheAdapter
+from src.adapters.observability import logger
+
+def subscriber_client(
+    redis_url: str, socket_connect_timeout: Optional[float] = None, health_check_interval: int = 30
+) -> redis.Redis:
+    """A client of its own for the subscription, outside the cache's bounded pool.
+
+    No socket timeout: a quiet channel is not a dead one. Liveness comes from the
+    health-check PING instead.
+    """
+    return redis.Redis.from_url(
+        redis_url,
+        socket_timeout=None,
+        socket_connect_timeout=socket_connect_timeout,
+        health_check_interval=health_check_interval,
+        encoding="utf-8",
+        decode_responses=True
+    )
+
+class CacheInvalidationListener:
+    """Applies the version bumps published by every worker to this worker's local cache.
+
+    Bumps published while unsubscribed are lost, so the local cache is flushed each time
+    the subscription is (re)established, and the cache stops holding versions until then.
+    """
+
+    def __init__(
+        self, client: redis.Redis, cache: TwoTierCacheAdapter, channel: str,
+        retry_seconds: float = 1.0, poll_seconds: float = 1.0
+    ):
+        self.client = client
+        self.cache = cache
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+
+    async def run(self) -> None:
+        """Listen until cancelled, resubscribing after connection errors."""
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self.cache.flush()
+                self.cache.listening = True
+                logger.info("cache_invalidation_subscribed", channel=self.channel)
+                while True:
+                    # Bounded waits: no message within poll_seconds just means nothing changed
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.poll_seconds)
+                    if message is not None:
+                        self._apply(message["data"])
+            except (RedisError, ConnectionError, OSError) as e:
+                logger.warning("cache_invalidation_disconnected", channel=self.channel, error=str(e))
+            finally:
+                self.cache.listening = False
+                await pubsub.aclose()
+            await asyncio.sleep(self.retry_seconds)
+
+    def _apply(self, data: str) -> None:
+        try:
+            key_prefixes = json.loads(data)
+        except ValueError:
+            # Can't tell what changed: forget everything
+            logger.warning("cache_invalidation_unreadable", channel=self.channel)
+            self.cache.flush()
+            return
+        self.cache.invalidate(key_prefixes)
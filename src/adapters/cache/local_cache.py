@@ -0,0 +1,216 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from src.application.ports.cache import CacheService, ModelT, version_key, versioned_key
+from src.adapters.cache.redis_adapter import RedisCacheAdapter
+from src.adapters.resilience.circuit_breaker import CircuitState
+
+# Charged for values that are not models (versions); roughly a key plus a small int
+SCALAR_ENTRY_BYTES = 64
+
+def approximate_size(value: Any) -> int:
+    """Bytes a cached value stands for: its JSON length for models, a flat charge otherwise."""
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    return SCALAR_ENTRY_BYTES
+
+class LRUCache:
+    """Bounded in-process map with per-entry TTL and least-recently-used eviction.
+
+    Bounded both by entry count and, when `max_bytes` is set, by the summed approximate
+    size of the values, so a few very large statements cannot blow the memory budget.
+    Not thread-safe; meant for a single event loop, where no await splits an operation.
+    Expired entries are only dropped when read or evicted, so `get(..., allow_expired=True)`
+    can still return them.
+    """
+
+    def __init__(
+        self, max_entries: int, max_bytes: Optional[int] = None, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or (not allow_expired and entry[0] <= self._clock()):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: float, size: Optional[int] = None) -> None:
+        size = approximate_size(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            self.delete(key)
+            return
+        self.delete(key)
+        self._entries[key] = (self._clock() + ttl_seconds, value, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class TwoTierCacheAdapter(CacheService):
+    """In-process LRU of parsed DTOs and versions in front of Redis.
+
+    A hot read costs no network hop and no JSON parsing. Versions are only held while
+    `listening` (a CacheInvalidationListener is subscribed to the bumps of every worker),
+    and then for at most `version_ttl_seconds` in case a message is lost; otherwise each
+    read still fetches its version from Redis. While the Redis circuit breaker is open,
+    reads keep being served from local memory.
+    """
+
+    def __init__(
+        self,
+        remote: RedisCacheAdapter,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 30.0,
+        version_ttl_seconds: float = 10.0,
+        max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.remote = remote
+        self.ttl_seconds = ttl_seconds
+        self.version_ttl_seconds = version_ttl_seconds
+        self.local = LRUCache(max_entries, max_bytes=max_bytes, clock=clock)
+        self.listening = False
+        # Bumped on every invalidation, so a version fetched concurrently is not cached stale
+        self._generation = 0
+
+    @property
+    def pool(self):
+        return self.remote.pool
+
+    def _remote_down(self) -> bool:
+        return self.remote.circuit_breaker.state == CircuitState.OPEN
+
+    async def get(self, key: str) -> Optional[str]:
+        # Raw strings are not worth the local memory; only DTOs go through L1
+        return await self.remote.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self.remote.set(key, value, ttl_seconds)
+
+    async def get_model(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        cached = self.local.get(key)
+        if isinstance(cached, model):
+            return cached
+        if self._remote_down():
+            return None
+        cached = await self.remote.get_model(key, model)
+        if cached is not None:
+            self.local.set(key, cached, self.ttl_seconds)
+        return cached
+
+    async def set_model(self, key: str, value: BaseModel, ttl_seconds: int) -> None:
+        self.local.set(key, value, min(ttl_seconds, self.ttl_seconds))
+        await self.remote.set_model(key, value, ttl_seconds)
+
+    def invalidate(self, key_prefixes: List[str]) -> None:
+        """Forget the local versions of `key_prefixes`.
+
+        Cached DTOs are keyed by version, so this is enough to stop serving them; they
+        become unreachable and age out of the LRU.
+        """
+        self._generation += 1
+        for key_prefix in key_prefixes:
+            self.local.delete(version_key(key_prefix))
+
+    def flush(self) -> None:
+        self._generation += 1
+        self.local.clear()
+
+    async def increment_version(self, key_prefix: str) -> None:
+        self.invalidate([key_prefix])
+        await self.remote.increment_version(key_prefix)
+
+    async def increment_versions(self, key_prefixes: List[str]) -> None:
+        self.invalidate(key_prefixes)
+        await self.remote.increment_versions(key_prefixes)
+
+    def _local_version(self, counter_key: str) -> Optional[int]:
+        version = self.local.get(counter_key)
+        if version is None and self._remote_down():
+            # Last known version rather than the remote fallback of 0. None once a local
+            # write has invalidated it: the version is then unknown until Redis is back.
+            return self.local.get(counter_key, allow_expired=True)
+        return version
+
+    def _remember_version(self, counter_key: str, version: int, generation: int) -> None:
+        if self.listening and generation == self._generation and not self._remote_down():
+            self.local.set(counter_key, version, self.version_ttl_seconds)
+
+    async def get_version(self, key_prefix: str) -> int:
+        counter_key = version_key(key_prefix)
+        version = self._local_version(counter_key)
+        if version is not None:
+            return version
+        generation = self._generation
+        version = await self.remote.get_version(key_prefix)
+        self._remember_version(counter_key, version, generation)
+        return version
+
+    async def get_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, model: Type[ModelT]
+    ) -> Tuple[int, Optional[ModelT]]:
+        counter_key = version_key(key_prefix)
+        version = self._local_version(counter_key)
+        if version is not None:
+            return version, await self.get_model(versioned_key(key_prefix, report, version, suffix), model)
+        generation = self._generation
+        version, cached = await self.remote.get_versioned_model(key_prefix, report, suffix, model)
+        self._remember_version(counter_key, version, generation)
+        if cached is not None:
+            self.local.set(versioned_key(key_prefix, report, version, suffix), cached, self.ttl_seconds)
+        return version, cached
+
+    async def set_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, version: int, value: BaseModel, ttl_seconds: int
+    ) -> None:
+        # Under a superseded version the local entry is simply never read. While Redis is
+        # down the caller's version may be the fallback 0, which a later write cannot move
+        # past: only a version this worker actually knows is safe to cache under.
+        if not self._remote_down() or self._local_version(version_key(key_prefix)) == version:
+            self.local.set(versioned_key(key_prefix, report, version, suffix), value, min(ttl_seconds, self.ttl_seconds))
+        await self.remote.set_versioned_model(key_prefix, report, suffix, version, value, ttl_seconds)
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        return await self.remote.acquire_lock(key, ttl_ms)
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self.remote.release_lock(key, token)
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "listening": self.listening}
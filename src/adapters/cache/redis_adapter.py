@@ -1,13 +1,95 @@
-from typing import Optional
+import json
+import time
+import uuid
+from typing import List, Optional, Tuple, Type
 import redis.asyncio as redis
+from redis.asyncio.connection import BlockingConnectionPool
 from redis.exceptions import RedisError
 
-from src.application.ports.cache import CacheService
+from pydantic import BaseModel
+
+from src.application.ports.cache import CacheService, ModelT, version_key, versioned_key
+from src.adapters.observability import LatencyHistogram
 from src.adapters.resilience.circuit_breaker import CircuitBreaker, CircuitBreakerOpenException
 
+class InstrumentedBlockingConnectionPool(BlockingConnectionPool):
+    """Bounded pool that waits up to `timeout` for a free connection and records the wait."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = LatencyHistogram()
+
+    async def get_connection(self, command_name, *keys, **options):
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            self.wait_histogram.observe((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> dict:
+        in_use = len(self._in_use_connections)
+        return {
+            "max_connections": self.max_connections,
+            "checked_out": in_use,
+            "idle": len(self._available_connections),
+            "wait_ms": self.wait_histogram.snapshot(),
+        }
+
+# KEYS[1] version counter; ARGV head and tail of the versioned key around the version.
+# The value key depends on the version read here, so it cannot be declared in KEYS. That is
+# only safe on Redis Cluster because both keys carry the same {key_prefix} hash tag (see
+# versioned_key): keep the tag on any key this script builds.
+# A missing entry comes back as false (nil), which keeps the version in the reply.
+GET_VERSIONED = """
+local version = redis.call('GET', KEYS[1]) or '0'
+return {version, redis.call('GET', ARGV[1] .. version .. ARGV[2])}
+"""
+
+# KEYS[1] version counter, KEYS[2] versioned key; ARGV version read, value, ttl
+SET_IF_VERSION = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS[1] lock; ARGV[1] owner token. Only the owner deletes it, never a later holder.
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 class RedisCacheAdapter(CacheService):
-    def __init__(self, redis_url: str):
-        self.redis = redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    def __init__(
+        self,
+        redis_url: str,
+        max_connections: int = 50,
+        pool_timeout: Optional[float] = 2.0,
+        socket_timeout: Optional[float] = None,
+        socket_connect_timeout: Optional[float] = None,
+        health_check_interval: int = 0,
+        invalidation_channel: Optional[str] = None
+    ):
+        # When set, version bumps are also published there for the workers' local caches
+        self.invalidation_channel = invalidation_channel
+        self.pool = InstrumentedBlockingConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            health_check_interval=health_check_interval,
+            encoding="utf-8",
+            decode_responses=True
+        )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        # EVALSHA, with a transparent EVAL the first time a server has not seen the script
+        self._get_versioned = self.redis.register_script(GET_VERSIONED)
+        self._set_if_version = self.redis.register_script(SET_IF_VERSION)
+        self._release_lock = self.redis.register_script(RELEASE_LOCK)
         self.circuit_breaker = CircuitBreaker(
             failure_threshold=3,
             recovery_timeout=30,
@@ -29,16 +111,69 @@ class RedisCacheAdapter(CacheService):
             pass
 
     async def increment_version(self, key_prefix: str) -> None:
+        await self.increment_versions([key_prefix])
+
+    async def increment_versions(self, key_prefixes: List[str]) -> None:
+        if not key_prefixes:
+            return
         try:
-            version_key = f"{key_prefix}:version"
-            await self.circuit_breaker.call(self.redis.incr, version_key)
+            await self.circuit_breaker.call(self._incr_pipeline, key_prefixes)
         except (CircuitBreakerOpenException, RedisError):
             pass
 
+    async def _incr_pipeline(self, key_prefixes: List[str]) -> list:
+        # No MULTI: the counters are independent, we only want a single round trip
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key_prefix in key_prefixes:
+                pipe.incr(version_key(key_prefix))
+            if self.invalidation_channel:
+                pipe.publish(self.invalidation_channel, json.dumps(key_prefixes))
+            return await pipe.execute()
+
     async def get_version(self, key_prefix: str) -> int:
         try:
-            version_key = f"{key_prefix}:version"
-            val = await self.circuit_breaker.call(self.redis.get, version_key)
+            val = await self.circuit_breaker.call(self.redis.get, version_key(key_prefix))
             return int(val) if val else 0
         except (CircuitBreakerOpenException, RedisError, ValueError):
             return 0
+
+    async def get_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, model: Type[ModelT]
+    ) -> Tuple[int, Optional[ModelT]]:
+        # One round trip and one breaker check instead of GET version, then GET value.
+        # The script splices the version in the same place versioned_key does.
+        try:
+            version, cached = await self.circuit_breaker.call(
+                self._get_versioned, keys=[version_key(key_prefix)], args=[f"{{{key_prefix}}}:{report}:v", suffix]
+            )
+            return int(version), self._parse_model(cached, model)
+        except (CircuitBreakerOpenException, RedisError, ValueError):
+            return 0, None
+
+    async def set_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, version: int, value: BaseModel, ttl_seconds: int
+    ) -> None:
+        # A version bumped while the report was built means it may be stale: nobody reads it, don't store it
+        try:
+            await self.circuit_breaker.call(
+                self._set_if_version,
+                keys=[version_key(key_prefix), versioned_key(key_prefix, report, version, suffix)],
+                args=[version, value.model_dump_json(), ttl_seconds]
+            )
+        except (CircuitBreakerOpenException, RedisError):
+            pass
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.circuit_breaker.call(self.redis.set, key, token, nx=True, px=ttl_ms)
+        except (CircuitBreakerOpenException, RedisError):
+            # Without Redis nobody can coordinate: let the caller go ahead
+            return token
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        try:
+            await self.circuit_breaker.call(self._release_lock, keys=[key], args=[token])
+        except (CircuitBreakerOpenException, RedisError):
+            pass
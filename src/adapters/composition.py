@@ -0,0 +1,84 @@
+"""Wiring of the application handlers to the SQLAlchemy repositories and the cache.
+
+Shared by every entry point: the web API, scheduled jobs and the CLI.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Set, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.adapters.observability import logger
+from src.adapters.persistence.db import AsyncSessionLocal, cache_service
+from src.adapters.persistence.repos import (
+    SQLAlchemyUnitOfWork,
+    SQLAlchemySchoolRepository,
+    SQLAlchemyStudentRepository,
+    SQLAlchemyInvoiceRepository,
+    SQLAlchemyStatementRepository,
+    SQLAlchemyBalanceProjectionRepository
+)
+from src.application.use_cases.commands import CommandHandlers
+from src.application.use_cases.queries import QueryHandlers
+
+T = TypeVar("T")
+
+def build_command_handlers(session: AsyncSession) -> CommandHandlers:
+    uow = SQLAlchemyUnitOfWork(session)
+    school_repo = SQLAlchemySchoolRepository(session)
+    student_repo = SQLAlchemyStudentRepository(session)
+    invoice_repo = SQLAlchemyInvoiceRepository(session)
+    projection_repo = SQLAlchemyBalanceProjectionRepository(session)
+
+    return CommandHandlers(
+        uow=uow,
+        school_repo=school_repo,
+        student_repo=student_repo,
+        invoice_repo=invoice_repo,
+        projection_repo=projection_repo,
+        cache=cache_service
+    )
+
+@asynccontextmanager
+async def standalone_command_handlers():
+    # For work that outlives any single request (payment batches, scheduled jobs)
+    async with AsyncSessionLocal() as session:
+        yield build_command_handlers(session)
+
+async def run_on_primary(work: Callable[[QueryHandlers], Awaitable[T]]) -> T:
+    """Run `work` with query handlers on a primary session of its own."""
+    async with AsyncSessionLocal() as session:
+        return await work(build_query_handlers(session))
+
+# Keeps revalidation tasks referenced until they finish
+_revalidations: Set[asyncio.Task] = set()
+
+def revalidate_in_background(work: Callable[[QueryHandlers], Awaitable[Any]]) -> None:
+    """Run `work` with query handlers of its own: the request's session is closed by then."""
+    async def run():
+        try:
+            # The primary: the point is to catch up with a write the replica may not have yet
+            await run_on_primary(work)
+        except Exception as e:
+            logger.error("statement_revalidation_failed", error=str(e))
+
+    task = asyncio.create_task(run())
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+
+def build_query_handlers(session: AsyncSession, on_replica: bool = False) -> QueryHandlers:
+    statement_repo = SQLAlchemyStatementRepository(session)
+    school_repo = SQLAlchemySchoolRepository(session)
+    student_repo = SQLAlchemyStudentRepository(session)
+    invoice_repo = SQLAlchemyInvoiceRepository(session)
+    return QueryHandlers(
+        statement_repo=statement_repo,
+        school_repo=school_repo,
+        student_repo=student_repo,
+        invoice_repo=invoice_repo,
+        cache=cache_service,
+        stale_seconds=settings.STATEMENT_STALE_SECONDS,
+        revalidate=revalidate_in_background,
+        on_primary=run_on_primary if on_replica else None
+    )
@@ -0,0 +1,98 @@
+import csv
+import json
+from typing import AsyncIterator, Iterable, Sequence, Type, TypeVar, Union
+from pydantic import BaseModel, ValidationError
+
+from src.application.dtos import InvoiceImportRow, PaymentImportRow, ImportRowErrorDTO
+
+INVOICE_COLUMNS = ("student_id", "amount", "currency", "due_date")
+# reference is optional: the bank's own transaction id, echoed back in the report
+PAYMENT_COLUMNS = ("invoice_id", "amount", "currency", "reference")
+FORMATS = ("csv", "ndjson")
+
+RowT = TypeVar("RowT", bound=BaseModel)
+
+# Bytes that are not valid UTF-8 decode to this; a line containing it is rejected, not the file
+REPLACEMENT_CHAR = "\ufffd"
+
+def detect_format(content_type: str = "", filename: str = "") -> str:
+    """Pick the import format from a Content-Type header or a file extension."""
+    if "csv" in content_type or filename.endswith(".csv"):
+        return "csv"
+    if "ndjson" in content_type or "json" in content_type or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError("Unsupported import format; send text/csv or application/x-ndjson")
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body.
+
+    Lines are split before decoding, so a character cut across two chunks stays whole.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+async def iter_file_lines(lines: Iterable[str]) -> AsyncIterator[str]:
+    for line in lines:
+        yield line.rstrip("\r\n")
+
+def parse_invoice_rows(
+    lines: AsyncIterator[str], fmt: str
+) -> AsyncIterator[Union[InvoiceImportRow, ImportRowErrorDTO]]:
+    return parse_rows(lines, fmt, InvoiceImportRow, INVOICE_COLUMNS, INVOICE_COLUMNS)
+
+def parse_payment_rows(
+    lines: AsyncIterator[str], fmt: str
+) -> AsyncIterator[Union[PaymentImportRow, ImportRowErrorDTO]]:
+    return parse_rows(lines, fmt, PaymentImportRow, PAYMENT_COLUMNS, PAYMENT_COLUMNS[:3])
+
+async def parse_rows(
+    lines: AsyncIterator[str], fmt: str, model: Type[RowT], columns: Sequence[str], required: Sequence[str]
+) -> AsyncIterator[Union[RowT, ImportRowErrorDTO]]:
+    """Turn CSV (with a header row) or NDJSON lines into validated rows or row errors.
+
+    CSV records must fit on one line; quoted fields with embedded newlines are not supported.
+    """
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+
+        try:
+            if REPLACEMENT_CHAR in line:
+                raise ValueError("Line is not valid UTF-8")
+            if fmt == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    names = [name.strip() for name in values]
+                    missing = [name for name in required if name not in names]
+                    if missing:
+                        raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+                    header = names
+                    continue
+                record = dict(zip(header, values))
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+        except (ValueError, csv.Error) as e:
+            # A broken header makes every following row unreadable; stop at the first error
+            yield ImportRowErrorDTO(line=line_no, error=str(e))
+            if fmt == "csv" and header is None:
+                return
+            continue
+
+        try:
+            row = model(line=line_no, **{name: record.get(name) for name in columns if record.get(name) is not None})
+        except ValidationError as e:
+            row = ImportRowErrorDTO(line=line_no, error="; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+        yield row
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable, List
+
+from src.config import settings
+from src.adapters.observability import logger
+from src.adapters.persistence import partitions
+from src.adapters.persistence.db import AsyncSessionLocal, engine
+from src.adapters.persistence.repos import SQLAlchemyBalanceProjectionRepository
+from src.adapters.composition import standalone_command_handlers
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], Awaitable[dict]]) -> None:
+    """Run `job` every `interval_seconds` until cancelled; a failed run is logged and retried next time."""
+    while True:
+        start = time.perf_counter()
+        try:
+            result = await job()
+            logger.info("job_completed", job=name, latency_ms=(time.perf_counter() - start) * 1000, **result)
+        except Exception as e:
+            logger.error("job_failed", job=name, error=str(e))
+        await asyncio.sleep(interval_seconds)
+
+async def sweep_overdue() -> dict:
+    # Safe to run from every worker: the sweep skips rows another sweeper has locked
+    async with standalone_command_handlers() as handlers:
+        result = await handlers.sweep_overdue(date.today())
+    return {"marked": result.marked}
+
+async def refresh_receivables() -> dict:
+    async with AsyncSessionLocal() as session:
+        refreshed = await SQLAlchemyBalanceProjectionRepository(session).refresh_receivables()
+        await session.commit()
+    return {"refreshed": refreshed}
+
+async def snapshot_balances() -> dict:
+    # Checkpoint at the start of the month, one day late so payments still in flight at
+    # midnight have committed; reruns overwrite the same checkpoint
+    as_of = (date.today() - timedelta(days=1)).replace(day=1)
+    async with AsyncSessionLocal() as session:
+        taken = await SQLAlchemyBalanceProjectionRepository(session).take_snapshots(as_of)
+        await session.commit()
+    return {"as_of": as_of.isoformat(), "taken": taken}
+
+async def ensure_partitions() -> dict:
+    # There is no DEFAULT partition: rows dated past the last month created would be rejected
+    async with engine.begin() as conn:
+        created = await partitions.ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+    return {"created": len(created)}
+
+def start_scheduled_jobs() -> List[asyncio.Task]:
+    jobs = [
+        ("sweep_overdue", settings.OVERDUE_SWEEP_INTERVAL_SECONDS, sweep_overdue),
+        ("refresh_receivables", settings.RECEIVABLES_REFRESH_INTERVAL_SECONDS, refresh_receivables),
+        ("snapshot_balances", settings.BALANCE_SNAPSHOT_INTERVAL_SECONDS, snapshot_balances),
+        ("ensure_partitions", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, ensure_partitions),
+    ]
+    return [
+        asyncio.create_task(run_periodically(name, interval, job))
+        for name, interval, job in jobs if interval > 0
+    ]
@@ -63,3 +63,31 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                 request_id=req_id
             )
             raise e
+
+class LatencyHistogram:
+    """Cumulative latency histogram (Prometheus-style `le` buckets, milliseconds)."""
+    DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, buckets_ms: tuple = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.sum_ms += value_ms
+        for i, bound in enumerate(self.buckets_ms):
+            if value_ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> dict:
+        buckets = {}
+        running = 0
+        for bound, n in zip(self.buckets_ms, self.counts):
+            running += n
+            buckets[f"le_{bound}"] = running
+        buckets["le_inf"] = self.count
+        return {"count": self.count, "sum_ms": round(self.sum_ms, 3), "buckets": buckets}
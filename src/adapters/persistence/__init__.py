@@ -3,5 +3,9 @@ from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
-from .models_business import SchoolModel, StudentModel, InvoiceModel, PaymentModel
+from .models_business import SchoolModel, StudentModel, InvoiceModel, PaymentModel, BillingPeriodModel
 from .models_auth import UserModel
+from .models_projections import (
+    StudentBalanceModel, SchoolBalanceModel, DailyCollectionModel,
+    StudentBalanceSnapshotModel, SchoolBalanceSnapshotModel
+)
@@ -1,17 +1,81 @@
 import os
+import re
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
+from src.adapters.cache.invalidation import CacheInvalidationListener, subscriber_client
+from src.adapters.cache.local_cache import TwoTierCacheAdapter
 from src.adapters.cache.redis_adapter import RedisCacheAdapter
+from src.adapters.persistence.pool import engine_options
 from src.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
+DATABASE_REPLICA_URL = settings.DATABASE_REPLICA_URL
 REDIS_URL = settings.REDIS_URL
 
-engine = create_async_engine(DATABASE_URL)
+engine = create_async_engine(DATABASE_URL, **engine_options())
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
-cache_service = RedisCacheAdapter(REDIS_URL)
+# Read-only engine for query handlers; falls back to the primary when no replica is configured
+replica_engine = create_async_engine(DATABASE_REPLICA_URL, **engine_options()) if DATABASE_REPLICA_URL else engine
+ReplicaSessionLocal = async_sessionmaker(replica_engine, expire_on_commit=False)
+REPLICA_ENABLED = replica_engine is not engine
+
+# Holder installed per request by ConsistencyTokenMiddleware; the unit of work stores the
+# primary WAL position of its last commit in it (a mutable dict survives task boundaries).
+commit_token_var: ContextVar[Optional[dict]] = ContextVar("commit_token", default=None)
+
+_LSN_PATTERN = re.compile(r"^[0-9A-F]{1,8}/[0-9A-F]{1,8}$")
+
+redis_cache = RedisCacheAdapter(
+    REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+    invalidation_channel=settings.CACHE_INVALIDATION_CHANNEL if settings.CACHE_L1_ENABLED else None
+)
+cache_service = TwoTierCacheAdapter(
+    redis_cache,
+    max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    max_bytes=settings.CACHE_L1_MAX_BYTES,
+    ttl_seconds=settings.CACHE_L1_TTL_SECONDS,
+    version_ttl_seconds=settings.CACHE_L1_VERSION_TTL_SECONDS
+) if settings.CACHE_L1_ENABLED else redis_cache
+# Started by the app lifespan; keeps every worker's local cache in step with the others' writes
+cache_invalidation_listener = CacheInvalidationListener(
+    subscriber_client(REDIS_URL, settings.REDIS_SOCKET_CONNECT_TIMEOUT, settings.REDIS_HEALTH_CHECK_INTERVAL),
+    cache_service, settings.CACHE_INVALIDATION_CHANNEL
+) if settings.CACHE_L1_ENABLED else None
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def replica_caught_up(token: str) -> bool:
+    """True when the replica has replayed WAL at least up to the commit identified by token."""
+    if not _LSN_PATTERN.match(token.upper()):
+        return False
+    async with ReplicaSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn()) >= CAST(:token AS pg_lsn)"),
+            {"token": token}
+        )
+        return bool(result.scalar())
+
+async def read_sessionmaker(consistency_token: Optional[str] = None) -> async_sessionmaker:
+    # Read-your-writes: a client that sends back a commit token reads the primary until the replica catches up
+    if REPLICA_ENABLED and consistency_token and not await replica_caught_up(consistency_token):
+        return AsyncSessionLocal
+    return ReplicaSessionLocal
+
+def is_replica_session(session: AsyncSession) -> bool:
+    return REPLICA_ENABLED and session.bind is replica_engine
+
+async def get_read_db(consistency_token: Optional[str] = None):
+    session_factory = await read_sessionmaker(consistency_token)
+    async with session_factory() as session:
+        yield session
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Date, Numeric, Enum as SAEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Date, Numeric, Index, Enum as SAEnum, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from src.domain.enums import InvoiceStatus, Currency
@@ -6,6 +6,9 @@ from . import Base
 
 class SchoolModel(Base):
     __tablename__ = "schools"
+    __table_args__ = (
+        Index("ix_schools_created_at_id", "created_at", "id"),
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True)
     name = Column(String, nullable=False)
@@ -16,6 +19,10 @@ class SchoolModel(Base):
 
 class StudentModel(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        Index("ix_students_created_at_id", "created_at", "id"),
+        Index("ix_students_school_id_created_at_id", "school_id", "created_at", "id"),
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True)
     school_id = Column(PG_UUID(as_uuid=True), ForeignKey("schools.id"), nullable=False, index=True)
@@ -28,31 +35,72 @@ class StudentModel(Base):
 
 class InvoiceModel(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_issued_at_id", "issued_at", "id"),
+        Index("ix_invoices_student_id_issued_at_id", "student_id", "issued_at", "id"),
+        Index("ix_invoices_school_id_issued_at_id", "school_id", "issued_at", "id"),
+        Index(
+            "ix_invoices_open_due_date", "due_date",
+            postgresql_where=text("status IN ('PENDING', 'PARTIALLY_PAID')")
+        ),
+        Index(
+            "ix_invoices_overdue_issued_at_id", "issued_at", "id",
+            postgresql_where=text("status = 'OVERDUE'")
+        ),
+        # Monthly partitions, see src/adapters/persistence/partitions.py
+        {"postgresql_partition_by": "RANGE (issued_at)"},
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True)
     student_id = Column(PG_UUID(as_uuid=True), ForeignKey("students.id"), nullable=False, index=True)
     school_id = Column(PG_UUID(as_uuid=True), ForeignKey("schools.id"), nullable=False, index=True)
     
     amount_total = Column(Numeric(10, 2), nullable=False)
+    # Denormalized SUM(payments.amount), updated in the same transaction as each payment insert
+    amount_paid = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
     currency = Column(SAEnum(Currency), nullable=False)
     
-    issued_at = Column(DateTime, nullable=False)
+    # Partition key, hence part of the primary key
+    issued_at = Column(DateTime, primary_key=True)
     due_date = Column(Date, nullable=False)
     status = Column(SAEnum(InvoiceStatus), nullable=False, index=True)
     
     # Relationships
     student = relationship("StudentModel", back_populates="invoices")
-    payments = relationship("PaymentModel", back_populates="invoice")
+    payments = relationship(
+        "PaymentModel", back_populates="invoice",
+        primaryjoin="InvoiceModel.id == foreign(PaymentModel.invoice_id)"
+    )
 
 class PaymentModel(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (paid_at)"},
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True)
-    invoice_id = Column(PG_UUID(as_uuid=True), ForeignKey("invoices.id"), nullable=False, index=True)
+    # No foreign key: partitioned invoices have no unique index on id alone
+    invoice_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
     
     amount = Column(Numeric(10, 2), nullable=False)
     currency = Column(SAEnum(Currency), nullable=False) 
-    paid_at = Column(DateTime, nullable=False)
+    paid_at = Column(DateTime, primary_key=True, index=True)
     
     # Relationships
-    invoice = relationship("InvoiceModel", back_populates="payments")
+    invoice = relationship(
+        "InvoiceModel", back_populates="payments",
+        primaryjoin="InvoiceModel.id == foreign(PaymentModel.invoice_id)"
+    )
+
+class BillingPeriodModel(Base):
+    """Ledger of recurring invoices already generated, one row per student and period.
+
+    The primary key is what makes generation idempotent; invoice_id has no foreign key so the
+    ledger does not constrain how the invoices table is laid out.
+    """
+    __tablename__ = "billing_periods"
+    
+    student_id = Column(PG_UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    billing_period = Column(String(7), primary_key=True)
+    invoice_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,86 @@
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, String, Enum as SAEnum, table, column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from src.domain.enums import Currency
+from . import Base
+
+# Read-model tables maintained by the command handlers (CQRS projections).
+# One row per (owner, currency) so mixed-currency owners keep correct totals.
+
+class StudentBalanceModel(Base):
+    __tablename__ = "student_balances"
+    
+    student_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    currency = Column(SAEnum(Currency), primary_key=True)
+    school_id = Column(PG_UUID(as_uuid=True), nullable=False)
+    
+    invoice_count = Column(Integer, nullable=False, default=0)
+    total_invoiced = Column(Numeric(14, 2), nullable=False, default=0)
+    total_paid = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+class SchoolBalanceModel(Base):
+    __tablename__ = "school_balances"
+    
+    school_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    currency = Column(SAEnum(Currency), primary_key=True)
+    
+    invoice_count = Column(Integer, nullable=False, default=0)
+    total_invoiced = Column(Numeric(14, 2), nullable=False, default=0)
+    total_paid = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+class DailyCollectionModel(Base):
+    """Payments collected per school, UTC day and currency; kept in step by the payment commands."""
+    __tablename__ = "daily_collections"
+
+    school_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    currency = Column(SAEnum(Currency), primary_key=True)
+
+    payment_count = Column(Integer, nullable=False, default=0)
+    amount_collected = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+# Checkpoints for date-ranged statements: cumulative totals of everything issued/paid
+# strictly before `as_of`, so an opening balance never scans further back than one snapshot
+
+class StudentBalanceSnapshotModel(Base):
+    __tablename__ = "student_balance_snapshots"
+
+    student_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    as_of = Column(Date, primary_key=True)
+    currency = Column(SAEnum(Currency), primary_key=True)
+    school_id = Column(PG_UUID(as_uuid=True), nullable=False)
+
+    total_invoiced = Column(Numeric(14, 2), nullable=False)
+    total_paid = Column(Numeric(14, 2), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+class SchoolBalanceSnapshotModel(Base):
+    __tablename__ = "school_balance_snapshots"
+
+    school_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    as_of = Column(Date, primary_key=True)
+    currency = Column(SAEnum(Currency), primary_key=True)
+
+    total_invoiced = Column(Numeric(14, 2), nullable=False)
+    total_paid = Column(Numeric(14, 2), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+# Materialized view (see migration f5b8d3c61e27), declared outside Base.metadata so
+# create_all/autogenerate never treat it as a table. Refreshed, not written to.
+school_receivables = table(
+    "school_receivables",
+    column("school_id", PG_UUID(as_uuid=True)),
+    column("school_name", String),
+    column("school_created_at", DateTime),
+    column("currency", SAEnum(Currency)),
+    column("invoice_count", Integer),
+    column("total_invoiced", Numeric(14, 2)),
+    column("total_collected", Numeric(14, 2)),
+    column("total_outstanding", Numeric(14, 2)),
+    column("pending_count", Integer),
+    column("partially_paid_count", Integer),
+    column("paid_count", Integer),
+    column("overdue_count", Integer),
+)
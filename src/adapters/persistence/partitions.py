@@ -0,0 +1,102 @@
+"""Monthly range partitions of `invoices` (issued_at) and `payments` (paid_at).
+
+Migration b9e1d4c7a382 turns both tables into partitioned parents: the pre-existing
+rows live in one `<table>_history` partition, later rows in `<table>_YYYY_MM`.
+These helpers keep future months created ahead of time and detach old ones.
+"""
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.domain.enums import OPEN_INVOICE_STATUSES
+
+# Parent table -> partition key
+PARTITIONED_TABLES = {"invoices": "issued_at", "payments": "paid_at"}
+
+_MONTHLY = re.compile(r"^(?P<table>\w+)_(?P<year>\d{4})_(?P<month>\d{2})$")
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    month: Optional[date]  # None for the history partition
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[Partition]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+        ),
+        {"table": table}
+    )
+    partitions = []
+    for (name,) in result:
+        match = _MONTHLY.match(name)
+        month = date(int(match["year"]), int(match["month"]), 1) if match and match["table"] == table else None
+        partitions.append(Partition(table=table, name=name, month=month))
+    return partitions
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Create the monthly partitions missing up to `months_ahead` months past the current one.
+
+    Only months after the newest existing partition are created, so a new partition can
+    never overlap the history partition's range.
+    """
+    target = add_months((today or date.today()).replace(day=1), months_ahead)
+    created = []
+    for table in PARTITIONED_TABLES:
+        months = [p.month for p in await list_partitions(conn, table) if p.month]
+        if not months:
+            raise RuntimeError(f"{table} has no monthly partitions; is it partitioned?")
+        month = add_months(max(months), 1)
+        while month <= target:
+            name = partition_name(table, month)
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+            month = add_months(month, 1)
+    return created
+
+async def detach_partitions(conn: AsyncConnection, before: date) -> List[str]:
+    """Detach every monthly partition that ends on or before `before`, oldest first.
+
+    Detached partitions stay behind as plain tables to archive or drop. Invoice months
+    that still hold open invoices are kept, and so are payment months with payments of an
+    invoice that is still attached: payments only leave together with their invoices.
+    The `<table>_history` partitions are never detached. `conn` must be in autocommit
+    mode: DETACH ... CONCURRENTLY cannot run inside a transaction block.
+    """
+    open_statuses = ", ".join(f"'{s.value}'" for s in OPEN_INVOICE_STATUSES)
+    detached = []
+    # Invoices first: a payment month can only go once its invoices' months have
+    for table in PARTITIONED_TABLES:
+        for partition in await list_partitions(conn, table):
+            if partition.month is None or add_months(partition.month, 1) > before:
+                continue
+            if table == "invoices":
+                result = await conn.execute(text(
+                    f"SELECT EXISTS (SELECT 1 FROM {partition.name} WHERE status IN ({open_statuses}))"
+                ))
+            else:
+                result = await conn.execute(text(
+                    f"SELECT EXISTS (SELECT 1 FROM {partition.name} p JOIN invoices i ON i.id = p.invoice_id)"
+                ))
+            if result.scalar_one():
+                continue
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name} CONCURRENTLY"))
+            detached.append(partition.name)
+    return detached
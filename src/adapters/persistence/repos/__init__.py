@@ -3,11 +3,13 @@ from .school import SQLAlchemySchoolRepository
 from .student import SQLAlchemyStudentRepository
 from .invoice import SQLAlchemyInvoiceRepository
 from .statement import SQLAlchemyStatementRepository
+from .projections import SQLAlchemyBalanceProjectionRepository
 
 __all__ = [
     "SQLAlchemyUnitOfWork",
     "SQLAlchemySchoolRepository",
     "SQLAlchemyStudentRepository",
     "SQLAlchemyInvoiceRepository",
-    "SQLAlchemyStatementRepository"
+    "SQLAlchemyStatementRepository",
+    "SQLAlchemyBalanceProjectionRepository"
 ]
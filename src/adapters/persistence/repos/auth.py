@@ -11,21 +11,24 @@ class SQLAlchemyAuthRepository(AuthRepository):
         self.session = session
 
     async def get_by_email(self, email: str) -> Optional[User]:
-        query = select(UserModel).where(UserModel.email == email)
+        query = select(
+            UserModel.id, UserModel.email, UserModel.password_hash, UserModel.role,
+            UserModel.school_id, UserModel.student_id, UserModel.created_at
+        ).where(UserModel.email == email)
         result = await self.session.execute(query)
-        model = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not model:
+        if not row:
             return None
             
         return User(
-            id=model.id,
-            email=model.email,
-            password_hash=model.password_hash,
-            role=model.role,
-            school_id=model.school_id,
-            student_id=model.student_id,
-            created_at=model.created_at
+            id=row.id,
+            email=row.email,
+            password_hash=row.password_hash,
+            role=row.role,
+            school_id=row.school_id,
+            student_id=row.student_id,
+            created_at=row.created_at
         )
 
     async def save(self, user: User) -> None:
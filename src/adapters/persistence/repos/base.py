@@ -1,12 +1,38 @@
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.application.ports.repositories import UnitOfWork
+from src.adapters.persistence.db import REPLICA_ENABLED, commit_token_var
+from src.adapters.observability import logger
 
 class SQLAlchemyUnitOfWork(UnitOfWork):
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.committed = False
+        # Each transaction the session begins starts out uncommitted
+        event.listen(session.sync_session, "after_begin", self._on_begin)
+
+    def _on_begin(self, session, transaction, connection) -> None:
+        self.committed = False
         
     async def commit(self) -> None:
         await self.session.commit()
+        try:
+            await self._record_commit_token()
+        except Exception as e:
+            # The write is durable; without a token the client just reads eventually consistent
+            logger.warning("commit_token_failed", error=str(e))
+        finally:
+            # Set last: the token query begins a transaction of its own, which resets the flag
+            self.committed = True
         
     async def rollback(self) -> None:
         await self.session.rollback()
+        self.committed = False
+
+    async def _record_commit_token(self) -> None:
+        # Only worth the extra round trip when queries may be served by a lagging replica
+        holder = commit_token_var.get()
+        if not REPLICA_ENABLED or holder is None:
+            return
+        result = await self.session.execute(text("SELECT pg_current_wal_lsn()::text"))
+        holder["token"] = result.scalar()
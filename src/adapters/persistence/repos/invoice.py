@@ -1,31 +1,88 @@
-from typing import Optional, List
-from uuid import UUID
+from typing import Optional, List, Dict
+from uuid import UUID, uuid4
+from decimal import Decimal
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete as sqlalchemy_delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    select, update, insert, bindparam, func, case, cast, literal, true, tuple_, delete as sqlalchemy_delete
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql.expression import ColumnElement
 
-from src.application.ports.repositories import InvoiceRepository
+from src.application.ports.repositories import InvoiceRepository, AppliedPayment
+from src.application.pagination import PageCursor
 from src.domain.entities import Invoice, Payment
+from src.domain.enums import Currency, InvoiceStatus, OPEN_INVOICE_STATUSES, DUE_INVOICE_STATUSES
+from src.domain.exceptions import EntityNotFound, PaymentExceedsDueAmount
 from src.domain.value_objects import Money
-from src.adapters.persistence.models_business import InvoiceModel, PaymentModel
+from src.adapters.persistence.models_business import (
+    InvoiceModel, PaymentModel, StudentModel, BillingPeriodModel
+)
+
+# Column selects: rows map straight to domain objects without ORM instances. Every
+# repository reads this way; the ORM models are only used to build the statements.
+INVOICE_COLUMNS = (
+    InvoiceModel.id, InvoiceModel.student_id, InvoiceModel.school_id, InvoiceModel.amount_total,
+    InvoiceModel.amount_paid, InvoiceModel.currency, InvoiceModel.due_date, InvoiceModel.status,
+    InvoiceModel.issued_at
+)
+PAYMENT_COLUMNS = (
+    PaymentModel.id, PaymentModel.invoice_id, PaymentModel.amount, PaymentModel.currency, PaymentModel.paid_at
+)
+# Column order for COPY-based bulk inserts
+COPY_COLUMNS = [
+    "id", "student_id", "school_id", "amount_total", "amount_paid",
+    "currency", "issued_at", "due_date", "status"
+]
+PAYMENT_COPY_COLUMNS = ["id", "invoice_id", "amount", "currency", "paid_at"]
+
+def _status_in(statuses) -> ColumnElement:
+    # Rendered as literals, not bind parameters: the planner can only match the partial
+    # status indexes when it sees the values, and prepared statements would hide them
+    return InvoiceModel.status.in_(
+        bindparam("statuses", list(statuses), expanding=True, literal_execute=True, unique=True)
+    )
+
+def _to_payment(row) -> Payment:
+    return Payment(id=row.id, invoice_id=row.invoice_id, amount=Money(row.amount, row.currency), paid_at=row.paid_at)
+
+def _to_invoice(row, payments: Optional[List[Payment]] = None) -> Invoice:
+    return Invoice(
+        id=row.id,
+        student_id=row.student_id,
+        school_id=row.school_id,
+        amount=Money(row.amount_total, row.currency),
+        due_date=row.due_date,
+        status=row.status,
+        issued_at=row.issued_at,
+        payments=payments or [],
+        paid_amount=row.amount_paid
+    )
 
 class SQLAlchemyInvoiceRepository(InvoiceRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
         
     async def save(self, invoice: Invoice) -> None:
-        existing = await self.session.get(InvoiceModel, invoice.id)
+        existing = await self.session.get(InvoiceModel, (invoice.id, invoice.issued_at))
         if existing:
              existing.status = invoice.status
              
-             current_payment_ids = {p.id for p in existing.payments}
-             for p in invoice.payments:
-                 if p.id not in current_payment_ids:
-                     pm = PaymentModel(
-                         id=p.id, invoice_id=invoice.id, amount=p.amount.amount, 
-                         currency=p.amount.currency, paid_at=p.paid_at
-                     )
-                     self.session.add(pm)
+             ids_res = await self.session.execute(
+                 select(PaymentModel.id).where(PaymentModel.invoice_id == invoice.id)
+             )
+             current_payment_ids = set(ids_res.scalars())
+             new_payments = [p for p in invoice.payments if p.id not in current_payment_ids]
+             for p in new_payments:
+                 pm = PaymentModel(
+                     id=p.id, invoice_id=invoice.id, amount=p.amount.amount, 
+                     currency=p.amount.currency, paid_at=p.paid_at
+                 )
+                 self.session.add(pm)
+             if new_payments:
+                 # Increment in SQL so the balance stays consistent with the rows inserted in this flush
+                 delta = sum((p.amount.amount for p in new_payments), Decimal('0.00'))
+                 existing.amount_paid = InvoiceModel.amount_paid + delta
              await self.session.flush()
         else:
             model = InvoiceModel(
@@ -33,6 +90,7 @@ class SQLAlchemyInvoiceRepository(InvoiceRepository):
                 student_id=invoice.student_id,
                 school_id=invoice.school_id,
                 amount_total=invoice.amount.amount,
+                amount_paid=invoice.paid_amount,
                 currency=invoice.amount.currency,
                 due_date=invoice.due_date,
                 issued_at=invoice.issued_at,
@@ -48,71 +106,245 @@ class SQLAlchemyInvoiceRepository(InvoiceRepository):
             await self.session.flush()
 
     async def get_by_id(self, invoice_id: UUID) -> Optional[Invoice]:
-        query = select(InvoiceModel).where(InvoiceModel.id == invoice_id).execution_options(populate_existing=True)
-        query = query.options(selectinload(InvoiceModel.payments))
-        
-        result = await self.session.execute(query)
-        model = result.scalar_one_or_none()
-        
-        if not model:
+        result = await self.session.execute(select(*INVOICE_COLUMNS).where(InvoiceModel.id == invoice_id))
+        row = result.one_or_none()
+        if not row:
             return None
-            
-        payments = [
-            Payment(
-                id=p.id, invoice_id=p.invoice_id, 
-                amount=Money(p.amount, p.currency), paid_at=p.paid_at
-            ) for p in model.payments
-        ]
         
-        return Invoice(
-            id=model.id,
-            student_id=model.student_id,
-            school_id=model.school_id,
-            amount=Money(model.amount_total, model.currency),
-            due_date=model.due_date,
-            status=model.status,
-            issued_at=model.issued_at,
-            payments=payments
+        payments_res = await self.session.execute(
+            select(*PAYMENT_COLUMNS).where(PaymentModel.invoice_id == invoice_id)
         )
+        return _to_invoice(row, [_to_payment(p) for p in payments_res])
 
-    async def delete(self, invoice_id: UUID) -> None:
+    async def delete_unpaid(self, invoice_id: UUID, issued_at: datetime) -> bool:
+        # Payments have no foreign key to invoices (both tables are partitioned), so the
+        # guard lives in the DELETE itself: a payment committed concurrently bumps
+        # amount_paid, which Postgres re-checks on the locked row. issued_at prunes the
+        # scan to a single partition.
+        deleted = await self.session.execute(
+            sqlalchemy_delete(InvoiceModel)
+            .where(
+                InvoiceModel.id == invoice_id,
+                InvoiceModel.issued_at == issued_at,
+                InvoiceModel.amount_paid == 0,
+                ~select(PaymentModel.id).where(PaymentModel.invoice_id == invoice_id).exists()
+            )
+            .returning(InvoiceModel.id)
+        )
+        if deleted.scalar_one_or_none() is None:
+            return False
+        # Free the billing period so a deleted recurring invoice can be generated again
         await self.session.execute(
-            sqlalchemy_delete(InvoiceModel).where(InvoiceModel.id == invoice_id)
+            sqlalchemy_delete(BillingPeriodModel).where(BillingPeriodModel.invoice_id == invoice_id)
         )
+        return True
 
-    async def list(self, limit: int, offset: int, student_id: Optional[UUID] = None) -> tuple[List[Invoice], int]:
-        query = select(InvoiceModel)
+    async def list(
+        self, limit: int, offset: int, student_id: Optional[UUID] = None,
+        after: Optional[PageCursor] = None, with_total: bool = False,
+        status: Optional[InvoiceStatus] = None
+    ) -> tuple[List[Invoice], Optional[int]]:
+        query = select(*INVOICE_COLUMNS)
         count_query = select(func.count()).select_from(InvoiceModel)
         
         if student_id:
             query = query.where(InvoiceModel.student_id == student_id)
             count_query = count_query.where(InvoiceModel.student_id == student_id)
+        if status:
+            query = query.where(_status_in([status]))
+            count_query = count_query.where(_status_in([status]))
             
-        count_res = await self.session.execute(count_query)
-        total = count_res.scalar_one()
+        total = None
+        if with_total:
+            count_res = await self.session.execute(count_query)
+            total = count_res.scalar_one()
         
-        query = query.options(selectinload(InvoiceModel.payments)).limit(limit).offset(offset).order_by(InvoiceModel.issued_at.desc())
+        # Invoices have no created_at; issued_at is their creation timestamp
+        query = query.order_by(InvoiceModel.issued_at.desc(), InvoiceModel.id.desc()).limit(limit)
+        if after:
+            query = query.where(tuple_(InvoiceModel.issued_at, InvoiceModel.id) < tuple_(after.sort_key, after.id))
+        else:
+            query = query.offset(offset)
         
         result = await self.session.execute(query)
-        models = result.scalars().all()
+        # Payment history is not loaded; the balance comes from the amount_paid column
+        items = [_to_invoice(row) for row in result]
+        return items, total
+
+    async def apply_payment(self, invoice_id: UUID, amount: Decimal) -> AppliedPayment:
+        payment_id = uuid4()
+        paid_at = datetime.utcnow()
+        status_type = InvoiceModel.status.type
+        new_paid = InvoiceModel.amount_paid + amount
+        
+        # The guarded UPDATE takes the invoice row lock; a concurrent payment waits, then
+        # re-evaluates the guard against the committed balance, so overpayment is impossible.
+        # Payments only carry the invoice id, so this cannot prune by issued_at: it probes
+        # the (id, issued_at) index of every attached monthly partition. That is one index
+        # lookup per partition, bounded by detach_partitions, and accepted over making
+        # callers and bank files supply the issue date.
+        applied = (
+            update(InvoiceModel)
+            .where(InvoiceModel.id == invoice_id, new_paid <= InvoiceModel.amount_total)
+            .values(
+                amount_paid=new_paid,
+                status=case(
+                    (new_paid >= InvoiceModel.amount_total, cast(literal(InvoiceStatus.PAID.value), status_type)),
+                    (InvoiceModel.status == InvoiceStatus.OVERDUE, cast(literal(InvoiceStatus.OVERDUE.value), status_type)),
+                    else_=cast(literal(InvoiceStatus.PARTIALLY_PAID.value), status_type)
+                )
+            )
+            .returning(
+                InvoiceModel.id, InvoiceModel.student_id, InvoiceModel.school_id,
+                InvoiceModel.currency, InvoiceModel.status
+            )
+            .cte("applied")
+        )
+        inserted = (
+            insert(PaymentModel)
+            .from_select(
+                ["id", "invoice_id", "amount", "currency", "paid_at"],
+                select(literal(payment_id), applied.c.id, literal(amount), applied.c.currency, literal(paid_at))
+            )
+            .returning(PaymentModel.id)
+            .cte("inserted")
+        )
+        stmt = select(applied, inserted.c.id.label("payment_id")).select_from(applied.join(inserted, true()))
         
-        items = []
-        for model in models:
-             payments = [
-                Payment(
-                    id=p.id, invoice_id=p.invoice_id, 
-                    amount=Money(p.amount, p.currency), paid_at=p.paid_at
-                ) for p in model.payments
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row:
+            return AppliedPayment(
+                payment_id=row.payment_id, invoice_id=row.id, student_id=row.student_id,
+                school_id=row.school_id, amount=amount, currency=row.currency,
+                status=row.status, paid_at=paid_at
+            )
+        
+        # Only the failure path reads the invoice, to report why the guard rejected it
+        due_res = await self.session.execute(
+            select(InvoiceModel.amount_total - InvoiceModel.amount_paid).where(InvoiceModel.id == invoice_id)
+        )
+        due = due_res.scalar_one_or_none()
+        if due is None:
+            raise EntityNotFound(f"Invoice {invoice_id} not found")
+        raise PaymentExceedsDueAmount(f"Payment amount {amount} exceeds due amount {due}")
+
+    async def bulk_insert(self, invoices: List[Invoice]) -> None:
+        if not invoices:
+            return
+        # COPY on the session's own connection, so it shares the surrounding transaction
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            InvoiceModel.__tablename__,
+            columns=COPY_COLUMNS,
+            records=[
+                (
+                    invoice.id, invoice.student_id, invoice.school_id, invoice.amount.amount,
+                    invoice.paid_amount, invoice.amount.currency.value, invoice.issued_at,
+                    invoice.due_date, invoice.status.value
+                )
+                for invoice in invoices
             ]
-             items.append(Invoice(
-                id=model.id,
-                student_id=model.student_id,
-                school_id=model.school_id,
-                amount=Money(model.amount_total, model.currency),
-                due_date=model.due_date,
-                status=model.status,
-                issued_at=model.issued_at,
-                payments=payments
-            ))
-            
-        return items, total
+        )
+
+    async def mark_overdue(self, as_of: date, limit: int) -> List[tuple[UUID, UUID]]:
+        # The inner select walks ix_invoices_open_due_date; SKIP LOCKED leaves rows that a
+        # payment is holding to the next chunk instead of waiting on them
+        due = (
+            select(InvoiceModel.id)
+            .where(_status_in(DUE_INVOICE_STATUSES), InvoiceModel.due_date < as_of)
+            .order_by(InvoiceModel.due_date)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(InvoiceModel)
+            .where(InvoiceModel.id.in_(due), _status_in(DUE_INVOICE_STATUSES))
+            .values(status=InvoiceStatus.OVERDUE)
+            .returning(InvoiceModel.student_id, InvoiceModel.school_id)
+            .execution_options(synchronize_session=False)
+        )
+        return [(row.student_id, row.school_id) for row in result]
+
+    async def lock_open_invoices(self, invoice_ids: List[UUID]) -> Dict[UUID, Invoice]:
+        if not invoice_ids:
+            return {}
+        # Lock in id order so concurrent imports touching the same invoices cannot deadlock.
+        # Bank rows carry no issue date, so like apply_payment this probes every attached
+        # partition's (id, issued_at) index; record_payments prunes once issued_at is known.
+        result = await self.session.execute(
+            select(*INVOICE_COLUMNS)
+            .where(InvoiceModel.id.in_(invoice_ids), InvoiceModel.status.in_(OPEN_INVOICE_STATUSES))
+            .order_by(InvoiceModel.id)
+            .with_for_update()
+        )
+        return {row.id: _to_invoice(row) for row in result}
+
+    async def record_payments(self, invoices: List[Invoice], payments: List[Payment]) -> None:
+        if not payments:
+            return
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            PaymentModel.__tablename__,
+            columns=PAYMENT_COPY_COLUMNS,
+            records=[
+                (p.id, p.invoice_id, p.amount.amount, p.amount.currency.value, p.paid_at)
+                for p in payments
+            ]
+        )
+        # Absolute values are safe here: the rows are locked since lock_open_invoices.
+        # The full primary key lets each update prune to the invoice's own partition.
+        await self.session.execute(
+            update(InvoiceModel.__table__)
+            .where(InvoiceModel.id == bindparam("invoice_id"), InvoiceModel.issued_at == bindparam("invoice_issued_at"))
+            .values(amount_paid=bindparam("paid"), status=bindparam("new_status")),
+            [
+                {
+                    "invoice_id": invoice.id, "invoice_issued_at": invoice.issued_at,
+                    "paid": invoice.paid_amount, "new_status": invoice.status
+                }
+                for invoice in invoices
+            ]
+        )
+
+    async def generate_for_school(
+        self, school_id: UUID, billing_period: str, amount: Decimal, currency: Currency,
+        due_date: date, student_ids: Optional[List[UUID]] = None
+    ) -> List[UUID]:
+        now = datetime.utcnow()
+        targets = select(StudentModel.id.label("student_id")).where(StudentModel.school_id == school_id)
+        if student_ids is not None:
+            targets = targets.where(StudentModel.id.in_(student_ids))
+        targets = targets.cte("targets")
+        
+        # Claiming the period in the ledger first makes re-runs and concurrent runs no-ops
+        # for students that already have their invoice
+        claimed = (
+            pg_insert(BillingPeriodModel)
+            .from_select(
+                ["student_id", "billing_period", "invoice_id", "created_at"],
+                select(targets.c.student_id, literal(billing_period), func.gen_random_uuid(), literal(now))
+            )
+            .on_conflict_do_nothing(index_elements=["student_id", "billing_period"])
+            .returning(BillingPeriodModel.student_id, BillingPeriodModel.invoice_id)
+            .cte("claimed")
+        )
+        inserted = (
+            insert(InvoiceModel)
+            .from_select(
+                ["id", "student_id", "school_id", "amount_total", "amount_paid",
+                 "currency", "issued_at", "due_date", "status"],
+                select(
+                    claimed.c.invoice_id, claimed.c.student_id, literal(school_id), literal(amount),
+                    literal(Decimal("0.00")), literal(currency, InvoiceModel.currency.type), literal(now),
+                    literal(due_date), literal(InvoiceStatus.PENDING, InvoiceModel.status.type)
+                )
+            )
+            .returning(InvoiceModel.student_id)
+            .cte("inserted")
+        )
+        result = await self.session.execute(select(inserted.c.student_id))
+        return list(result.scalars())
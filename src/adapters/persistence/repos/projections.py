@@ -0,0 +1,261 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text, insert, literal, union_all, update, delete as sqlalchemy_delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.application.ports.projections import BalanceProjectionRepository, BalanceDelta
+from src.adapters.persistence import partitions
+from src.adapters.persistence.models_business import InvoiceModel, PaymentModel
+from src.adapters.persistence.models_projections import (
+    StudentBalanceModel, SchoolBalanceModel, DailyCollectionModel,
+    StudentBalanceSnapshotModel, SchoolBalanceSnapshotModel
+)
+
+UPSERT_CHUNK_SIZE = 2000
+# Arbitrary advisory lock keys owned by the receivables refresh and the snapshot job
+RECEIVABLES_REFRESH_LOCK = 720_017
+SNAPSHOT_LOCK = 720_019
+
+class SQLAlchemyBalanceProjectionRepository(BalanceProjectionRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, deltas: Iterable[BalanceDelta]) -> None:
+        # Fold deltas per key first: one upsert statement cannot touch the same row twice
+        students: dict = defaultdict(lambda: [0, Decimal("0"), Decimal("0")])
+        schools: dict = defaultdict(lambda: [0, Decimal("0"), Decimal("0")])
+        collections: dict = defaultdict(lambda: [0, Decimal("0")])
+        student_school = {}
+        for d in deltas:
+            student_school[d.student_id] = d.school_id
+            for acc in (students[(d.student_id, d.currency)], schools[(d.school_id, d.currency)]):
+                acc[0] += d.invoice_count
+                acc[1] += d.invoiced
+                acc[2] += d.paid
+            if d.paid_on is not None:
+                acc = collections[(d.school_id, d.paid_on, d.currency)]
+                acc[0] += 1 if d.paid > 0 else -1
+                acc[1] += d.paid
+        if not students:
+            return
+
+        now = datetime.utcnow()
+        # Sorted keys give concurrent writers the same lock order
+        student_rows = [
+            {
+                "student_id": student_id, "currency": currency, "school_id": student_school[student_id],
+                "invoice_count": acc[0], "total_invoiced": acc[1], "total_paid": acc[2], "updated_at": now
+            } for (student_id, currency), acc in sorted(students.items(), key=lambda kv: str(kv[0]))
+        ]
+        school_rows = [
+            {
+                "school_id": school_id, "currency": currency,
+                "invoice_count": acc[0], "total_invoiced": acc[1], "total_paid": acc[2], "updated_at": now
+            } for (school_id, currency), acc in sorted(schools.items(), key=lambda kv: str(kv[0]))
+        ]
+
+        # Chunked to stay under the driver's 32767 bind parameters per statement
+        for start in range(0, len(student_rows), UPSERT_CHUNK_SIZE):
+            chunk = student_rows[start:start + UPSERT_CHUNK_SIZE]
+            await self.session.execute(self._upsert(StudentBalanceModel, ["student_id", "currency"], chunk))
+        for start in range(0, len(school_rows), UPSERT_CHUNK_SIZE):
+            chunk = school_rows[start:start + UPSERT_CHUNK_SIZE]
+            await self.session.execute(self._upsert(SchoolBalanceModel, ["school_id", "currency"], chunk))
+
+        collection_rows = [
+            {
+                "school_id": school_id, "day": day, "currency": currency,
+                "payment_count": acc[0], "amount_collected": acc[1], "updated_at": now
+            } for (school_id, day, currency), acc in sorted(collections.items(), key=lambda kv: str(kv[0]))
+        ]
+        for start in range(0, len(collection_rows), UPSERT_CHUNK_SIZE):
+            chunk = collection_rows[start:start + UPSERT_CHUNK_SIZE]
+            stmt = pg_insert(DailyCollectionModel).values(chunk)
+            await self.session.execute(stmt.on_conflict_do_update(
+                index_elements=["school_id", "day", "currency"],
+                set_={
+                    "payment_count": DailyCollectionModel.payment_count + stmt.excluded.payment_count,
+                    "amount_collected": DailyCollectionModel.amount_collected + stmt.excluded.amount_collected,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            ))
+
+    @staticmethod
+    def _upsert(model, key_columns, rows):
+        stmt = pg_insert(model).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                "invoice_count": model.invoice_count + stmt.excluded.invoice_count,
+                "total_invoiced": model.total_invoiced + stmt.excluded.total_invoiced,
+                "total_paid": model.total_paid + stmt.excluded.total_paid,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+
+    async def remove_student(self, student_id: UUID) -> None:
+        for model in (StudentBalanceModel, StudentBalanceSnapshotModel):
+            await self.session.execute(sqlalchemy_delete(model).where(model.student_id == student_id))
+
+    async def remove_school(self, school_id: UUID) -> None:
+        for model in (SchoolBalanceModel, SchoolBalanceSnapshotModel, DailyCollectionModel):
+            await self.session.execute(sqlalchemy_delete(model).where(model.school_id == school_id))
+
+    async def rebuild(self) -> None:
+        # Writers block on their next upsert until this transaction commits, then apply
+        # their deltas on top of the rebuilt rows, so nothing is lost or double counted.
+        await self.session.execute(text("LOCK TABLE student_balances, school_balances IN EXCLUSIVE MODE"))
+        await self.session.execute(sqlalchemy_delete(StudentBalanceModel))
+        await self.session.execute(sqlalchemy_delete(SchoolBalanceModel))
+
+        now = func.timezone("utc", func.now())
+        await self.session.execute(
+            insert(StudentBalanceModel).from_select(
+                ["student_id", "currency", "school_id", "invoice_count", "total_invoiced", "total_paid", "updated_at"],
+                select(
+                    InvoiceModel.student_id, InvoiceModel.currency, InvoiceModel.school_id,
+                    func.count(), func.sum(InvoiceModel.amount_total), func.sum(InvoiceModel.amount_paid), now
+                ).group_by(InvoiceModel.student_id, InvoiceModel.school_id, InvoiceModel.currency)
+            )
+        )
+        await self.session.execute(
+            insert(SchoolBalanceModel).from_select(
+                ["school_id", "currency", "invoice_count", "total_invoiced", "total_paid", "updated_at"],
+                select(
+                    InvoiceModel.school_id, InvoiceModel.currency,
+                    func.count(), func.sum(InvoiceModel.amount_total), func.sum(InvoiceModel.amount_paid), now
+                ).group_by(InvoiceModel.school_id, InvoiceModel.currency)
+            )
+        )
+
+    async def rebuild_collections(self, start: Optional[date] = None, end: Optional[date] = None) -> None:
+        # Same locking argument as rebuild(): payment writers queue behind the lock and
+        # then apply their deltas on top of the regenerated days
+        await self.session.execute(text("LOCK TABLE daily_collections IN EXCLUSIVE MODE"))
+
+        # Payments of detached months are gone, so their days can't be regenerated: keep
+        # everything before the oldest attached month as last rolled up. The history
+        # partition's payments never change, so its days need no rebuild either.
+        attached = await partitions.list_partitions(await self.session.connection(), "payments")
+        months = [p.month for p in attached if p.month]
+        if months and (start is None or start < min(months)):
+            start = min(months)
+
+        day = func.date(PaymentModel.paid_at)
+        deleted = sqlalchemy_delete(DailyCollectionModel)
+        payments = (
+            select(
+                InvoiceModel.school_id, day, PaymentModel.currency,
+                func.count(), func.sum(PaymentModel.amount), func.timezone("utc", func.now())
+            )
+            .join(InvoiceModel, InvoiceModel.id == PaymentModel.invoice_id)
+            .group_by(InvoiceModel.school_id, day, PaymentModel.currency)
+        )
+        if start is not None:
+            deleted = deleted.where(DailyCollectionModel.day >= start)
+            payments = payments.where(PaymentModel.paid_at >= datetime.combine(start, time.min))
+        if end is not None:
+            deleted = deleted.where(DailyCollectionModel.day <= end)
+            payments = payments.where(PaymentModel.paid_at < datetime.combine(end + timedelta(days=1), time.min))
+
+        await self.session.execute(deleted)
+        await self.session.execute(
+            insert(DailyCollectionModel).from_select(
+                ["school_id", "day", "currency", "payment_count", "amount_collected", "updated_at"], payments
+            )
+        )
+
+    async def take_snapshots(self, as_of: date) -> bool:
+        locked = await self.session.execute(select(func.pg_try_advisory_xact_lock(SNAPSHOT_LOCK)))
+        if not locked.scalar_one():
+            return False
+
+        # Every owner is checkpointed on the same dates, so the previous snapshot date is global
+        # and each run only reads the invoices and payments since then
+        result = await self.session.execute(
+            select(func.max(StudentBalanceSnapshotModel.as_of)).where(StudentBalanceSnapshotModel.as_of < as_of)
+        )
+        previous = result.scalar_one()
+        end = datetime.combine(as_of, time.min)
+
+        snap = StudentBalanceSnapshotModel
+        parts = [
+            select(
+                InvoiceModel.student_id, InvoiceModel.currency, InvoiceModel.school_id,
+                InvoiceModel.amount_total.label("invoiced"), literal(Decimal("0")).label("paid")
+            ).where(InvoiceModel.issued_at < end),
+            select(
+                InvoiceModel.student_id, PaymentModel.currency, InvoiceModel.school_id,
+                literal(Decimal("0")), PaymentModel.amount
+            ).join(InvoiceModel, InvoiceModel.id == PaymentModel.invoice_id).where(PaymentModel.paid_at < end),
+        ]
+        if previous is not None:
+            start = datetime.combine(previous, time.min)
+            parts[0] = parts[0].where(InvoiceModel.issued_at >= start)
+            parts[1] = parts[1].where(PaymentModel.paid_at >= start)
+            parts.append(
+                select(snap.student_id, snap.currency, snap.school_id, snap.total_invoiced, snap.total_paid)
+                .where(snap.as_of == previous)
+            )
+        movements = union_all(*parts).subquery("movements")
+
+        now = func.timezone("utc", func.now())
+        student_rows = select(
+            movements.c.student_id, literal(as_of), movements.c.currency, movements.c.school_id,
+            func.sum(movements.c.invoiced), func.sum(movements.c.paid), now
+        ).group_by(movements.c.student_id, movements.c.currency, movements.c.school_id)
+        await self.session.execute(self._upsert_snapshot(
+            snap, ["student_id", "as_of", "currency", "school_id"], student_rows
+        ))
+
+        # School checkpoints are the sum of their students' at the same date
+        school_rows = select(
+            snap.school_id, snap.as_of, snap.currency,
+            func.sum(snap.total_invoiced), func.sum(snap.total_paid), now
+        ).where(snap.as_of == as_of).group_by(snap.school_id, snap.as_of, snap.currency)
+        await self.session.execute(self._upsert_snapshot(
+            SchoolBalanceSnapshotModel, ["school_id", "as_of", "currency"], school_rows
+        ))
+        return True
+
+    @staticmethod
+    def _upsert_snapshot(model, columns, rows):
+        # Re-taking a date overwrites it, so a rerun also repairs a snapshot
+        stmt = pg_insert(model).from_select(columns + ["total_invoiced", "total_paid", "created_at"], rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[c.name for c in model.__table__.primary_key],
+            set_={
+                "total_invoiced": stmt.excluded.total_invoiced,
+                "total_paid": stmt.excluded.total_paid,
+                "created_at": stmt.excluded.created_at,
+            }
+        )
+
+    async def adjust_snapshots(self, delta: BalanceDelta, effective_at: datetime) -> None:
+        # A snapshot at as_of covers everything strictly before midnight of as_of
+        after = effective_at.date()
+        for model, owner_column, owner_id in (
+            (StudentBalanceSnapshotModel, StudentBalanceSnapshotModel.student_id, delta.student_id),
+            (SchoolBalanceSnapshotModel, SchoolBalanceSnapshotModel.school_id, delta.school_id),
+        ):
+            await self.session.execute(
+                update(model)
+                .where(owner_column == owner_id, model.currency == delta.currency, model.as_of > after)
+                .values(
+                    total_invoiced=model.total_invoiced + delta.invoiced,
+                    total_paid=model.total_paid + delta.paid
+                )
+            )
+
+    async def refresh_receivables(self) -> bool:
+        # CONCURRENTLY keeps the dashboard readable during the refresh; the transaction-scoped
+        # advisory lock makes a second worker skip instead of queueing a redundant refresh
+        locked = await self.session.execute(select(func.pg_try_advisory_xact_lock(RECEIVABLES_REFRESH_LOCK)))
+        if not locked.scalar_one():
+            return False
+        await self.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY school_receivables"))
+        return True
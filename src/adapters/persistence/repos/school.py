@@ -1,12 +1,20 @@
 from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete as sqlalchemy_delete
+from sqlalchemy import select, func, tuple_, delete as sqlalchemy_delete
 
 from src.application.ports.repositories import SchoolRepository
+from src.application.pagination import PageCursor
 from src.domain.entities import School
 from src.adapters.persistence.models_business import SchoolModel
 
+# Read paths select plain columns (Core rows) and build domain objects directly,
+# skipping ORM instance construction and identity-map bookkeeping.
+SCHOOL_COLUMNS = (SchoolModel.id, SchoolModel.name, SchoolModel.created_at)
+
+def _to_school(row) -> School:
+    return School(id=row.id, name=row.name, created_at=row.created_at)
+
 class SQLAlchemySchoolRepository(SchoolRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -25,26 +33,29 @@ class SQLAlchemySchoolRepository(SchoolRepository):
             self.session.add(model)
         
     async def get_by_id(self, school_id: UUID) -> Optional[School]:
-        result = await self.session.execute(select(SchoolModel).where(SchoolModel.id == school_id))
-        model = result.scalar_one_or_none()
-        if not model:
-            return None
-        return School(id=model.id, name=model.name, created_at=model.created_at)
+        result = await self.session.execute(select(*SCHOOL_COLUMNS).where(SchoolModel.id == school_id))
+        row = result.one_or_none()
+        return _to_school(row) if row else None
 
     async def delete(self, school_id: UUID) -> None:
         await self.session.execute(
             sqlalchemy_delete(SchoolModel).where(SchoolModel.id == school_id)
         )
 
-    async def list(self, limit: int, offset: int) -> tuple[List[School], int]:
-        # Count
-        count_res = await self.session.execute(select(func.count()).select_from(SchoolModel))
-        total = count_res.scalar_one()
+    async def list(
+        self, limit: int, offset: int, after: Optional[PageCursor] = None, with_total: bool = False
+    ) -> tuple[List[School], Optional[int]]:
+        total = None
+        if with_total:
+            count_res = await self.session.execute(select(func.count()).select_from(SchoolModel))
+            total = count_res.scalar_one()
         
-        # Select
-        query = select(SchoolModel).limit(limit).offset(offset).order_by(SchoolModel.created_at.desc())
+        # Keyset on (created_at, id) walks ix_schools_created_at_id instead of skipping rows
+        query = select(*SCHOOL_COLUMNS).order_by(SchoolModel.created_at.desc(), SchoolModel.id.desc()).limit(limit)
+        if after:
+            query = query.where(tuple_(SchoolModel.created_at, SchoolModel.id) < tuple_(after.sort_key, after.id))
+        else:
+            query = query.offset(offset)
         result = await self.session.execute(query)
-        models = result.scalars().all()
-        
-        items = [School(id=m.id, name=m.name, created_at=m.created_at) for m in models]
+        items = [_to_school(row) for row in result]
         return items, total
@@ -1,88 +1,237 @@
-from typing import Optional
+from typing import Optional, List, AsyncIterator
 from uuid import UUID
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_, case, literal, null, true, type_coerce, Date, Integer
 
 from src.application.ports.repositories import StatementRepository
-from src.application.dtos import AccountStatementDTO, InvoiceDTO
+from src.application.pagination import PageCursor
+from src.application.dtos import (
+    AccountStatementDTO, InvoiceDTO, StatementSummaryDTO, CurrencyTotalDTO,
+    AgingReportDTO, AgingBucketsDTO, StudentAgingDTO, SchoolReceivablesDTO, ReceivablesTotalsDTO,
+    CollectionsSeriesDTO, DailyCollectionDTO, PeriodBalanceDTO, StatementPeriodDTO
+)
+from src.domain.enums import InvoiceStatus, OPEN_INVOICE_STATUSES
 from src.adapters.persistence.models_business import InvoiceModel, PaymentModel, StudentModel, SchoolModel
+from src.adapters.persistence.models_projections import (
+    StudentBalanceModel, SchoolBalanceModel, DailyCollectionModel,
+    StudentBalanceSnapshotModel, SchoolBalanceSnapshotModel, school_receivables
+)
 
 class SQLAlchemyStatementRepository(StatementRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_student_statement(self, student_id: UUID) -> Optional[AccountStatementDTO]:
-        # Check student exists
-        student_res = await self.session.execute(select(StudentModel).where(StudentModel.id == student_id))
-        if not student_res.scalar_one_or_none():
-            return None
-            
-        # Select explicit columns
+        return await self._full_statement(StudentModel.id, InvoiceModel.student_id, student_id)
+
+    async def get_school_statement(self, school_id: UUID) -> Optional[AccountStatementDTO]:
+        return await self._full_statement(SchoolModel.id, InvoiceModel.school_id, school_id)
+
+    async def _full_statement(
+        self, owner_id_column, invoice_owner_column, owner_id: UUID, issued_between: Optional[tuple] = None
+    ) -> Optional[AccountStatementDTO]:
+        # One round trip: the owner CTE doubles as the existence check (no row -> not found,
+        # one row with NULL invoice columns -> empty statement) and the window functions
+        # return the per-currency subtotals next to every invoice row.
+        owner = select(owner_id_column.label("id")).where(owner_id_column == owner_id).cte("owner")
+        join_clause = invoice_owner_column == owner.c.id
+        if issued_between:
+            join_clause &= (InvoiceModel.issued_at >= issued_between[0]) & (InvoiceModel.issued_at < issued_between[1])
+        by_currency = {"partition_by": InvoiceModel.currency}
         stmt = (
             select(
+                owner.c.id.label("owner_id"),
                 InvoiceModel.id,
                 InvoiceModel.amount_total,
                 InvoiceModel.currency,
                 InvoiceModel.status,
                 InvoiceModel.issued_at,
                 InvoiceModel.due_date,
-                func.coalesce(func.sum(PaymentModel.amount), 0).label("paid_amount")
-            )
-            .outerjoin(PaymentModel, InvoiceModel.id == PaymentModel.invoice_id)
-            .where(InvoiceModel.student_id == student_id)
-            .group_by(
-                InvoiceModel.id, 
-                InvoiceModel.amount_total, 
-                InvoiceModel.currency, 
-                InvoiceModel.status, 
-                InvoiceModel.issued_at, 
-                InvoiceModel.due_date
+                InvoiceModel.amount_paid,
+                func.count(InvoiceModel.id).over(**by_currency).label("currency_count"),
+                func.sum(InvoiceModel.amount_total).over(**by_currency).label("currency_invoiced"),
+                func.sum(InvoiceModel.amount_paid).over(**by_currency).label("currency_paid")
             )
+            .select_from(owner)
+            .outerjoin(InvoiceModel, join_clause)
+            .order_by(InvoiceModel.issued_at, InvoiceModel.id)
         )
         
         result = await self.session.execute(stmt)
         rows = result.all()
+        if not rows:
+            return None
         
         invoices_dto = []
-        total_due = Decimal(0)
-        
-        stmt_currency = "MIXED"
-        if rows:
-            stmt_currency = rows[0].currency.value
-
+        totals = {}
         for row in rows:
-            amount_total = row.amount_total
-            paid = row.paid_amount
-            due = amount_total - paid
-            
-            total_due += due
-            
+            if row.id is None:
+                continue
+            totals[row.currency] = CurrencyTotalDTO(
+                currency=row.currency,
+                invoice_count=row.currency_count,
+                total_invoiced=row.currency_invoiced,
+                total_paid=row.currency_paid,
+                total_due=row.currency_invoiced - row.currency_paid
+            )
             invoices_dto.append(InvoiceDTO(
                 id=row.id,
-                amount_total=amount_total,
-                amount_paid=paid,
-                amount_due=due,
+                amount_total=row.amount_total,
+                amount_paid=row.amount_paid,
+                amount_due=row.amount_total - row.amount_paid,
                 currency=row.currency,
                 status=row.status,
                 issued_at=row.issued_at,
                 due_date=row.due_date
             ))
-            
+        
+        # Amounts in different currencies don't add up: a MIXED statement has no total_due
+        single = next(iter(totals.values())) if len(totals) == 1 else None
+        if single:
+            currency = single.currency.value
+        else:
+            currency = "MIXED" if totals else None
         return AccountStatementDTO(
-            entity_id=student_id,
+            entity_id=owner_id,
             generated_at=datetime.utcnow(),
             invoices=invoices_dto,
-            total_due=total_due,
-            currency=stmt_currency
+            total_due=single.total_due if single else Decimal(0),
+            currency=currency,
+            invoice_count=len(invoices_dto),
+            totals=list(totals.values())
         )
 
-    async def get_school_statement(self, school_id: UUID) -> Optional[AccountStatementDTO]:
-        school_res = await self.session.execute(select(SchoolModel).where(SchoolModel.id == school_id))
-        if not school_res.scalar_one_or_none():
-             return None
+    async def get_student_period_statement(
+        self, student_id: UUID, start: date, end: date
+    ) -> Optional[AccountStatementDTO]:
+        return await self._period_statement(
+            StudentModel.id, InvoiceModel.student_id, StudentBalanceSnapshotModel.student_id,
+            self._student_payments, student_id, start, end
+        )
+
+    async def get_school_period_statement(
+        self, school_id: UUID, start: date, end: date
+    ) -> Optional[AccountStatementDTO]:
+        return await self._period_statement(
+            SchoolModel.id, InvoiceModel.school_id, SchoolBalanceSnapshotModel.school_id,
+            self._school_collections, school_id, start, end
+        )
+
+    async def _period_statement(
+        self, owner_id_column, invoice_owner_column, snapshot_owner_column, collected_between,
+        owner_id: UUID, start: date, end: date
+    ) -> Optional[AccountStatementDTO]:
+        period_start = datetime.combine(start, time.min)
+        period_end = datetime.combine(end + timedelta(days=1), time.min)
+        statement = await self._full_statement(
+            owner_id_column, invoice_owner_column, owner_id, issued_between=(period_start, period_end)
+        )
+        if statement is None:
+            return None
+
+        # Opening balance: nearest snapshot at or before `start`, plus what moved since it
+        snapshot_model = snapshot_owner_column.class_
+        latest = (
+            select(func.max(snapshot_model.as_of))
+            .where(snapshot_owner_column == owner_id, snapshot_model.as_of <= start)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            select(snapshot_model.as_of, snapshot_model.currency, snapshot_model.total_invoiced, snapshot_model.total_paid)
+            .where(snapshot_owner_column == owner_id, snapshot_model.as_of == latest)
+        )
+        opening: dict = {}
+        checkpoint = None
+        for row in result:
+            checkpoint = datetime.combine(row.as_of, time.min)
+            opening[row.currency] = row.total_invoiced - row.total_paid
 
+        invoiced_since = (
+            select(InvoiceModel.currency, func.sum(InvoiceModel.amount_total).label("amount"))
+            .where(invoice_owner_column == owner_id, InvoiceModel.issued_at < period_start)
+            .group_by(InvoiceModel.currency)
+        )
+        if checkpoint is not None:
+            invoiced_since = invoiced_since.where(InvoiceModel.issued_at >= checkpoint)
+        for row in await self.session.execute(invoiced_since):
+            opening[row.currency] = opening.get(row.currency, Decimal(0)) + row.amount
+        for currency, amount in (await collected_between(owner_id, checkpoint, period_start)).items():
+            opening[currency] = opening.get(currency, Decimal(0)) - amount
+
+        invoiced = {t.currency: t.total_invoiced for t in statement.totals}
+        collected = await collected_between(owner_id, period_start, period_end)
+        balances = []
+        for currency in sorted(set(opening) | set(invoiced) | set(collected), key=lambda c: c.value):
+            opening_balance = opening.get(currency, Decimal(0))
+            balances.append(PeriodBalanceDTO(
+                currency=currency,
+                opening_balance=opening_balance,
+                invoiced=invoiced.get(currency, Decimal(0)),
+                collected=collected.get(currency, Decimal(0)),
+                closing_balance=opening_balance + invoiced.get(currency, Decimal(0)) - collected.get(currency, Decimal(0))
+            ))
+        statement.period = StatementPeriodDTO(from_date=start, to_date=end, balances=balances)
+        return statement
+
+    async def _student_payments(self, student_id: UUID, since: Optional[datetime], until: datetime) -> dict:
+        # A student's invoices are few; payments are reached through them
+        stmt = (
+            select(PaymentModel.currency, func.sum(PaymentModel.amount).label("amount"))
+            .join(InvoiceModel, InvoiceModel.id == PaymentModel.invoice_id)
+            .where(InvoiceModel.student_id == student_id, PaymentModel.paid_at < until)
+            .group_by(PaymentModel.currency)
+        )
+        if since is not None:
+            stmt = stmt.where(PaymentModel.paid_at >= since)
+        result = await self.session.execute(stmt)
+        return {row.currency: row.amount for row in result}
+
+    async def _school_collections(self, school_id: UUID, since: Optional[datetime], until: datetime) -> dict:
+        # Schools read the daily rollup rather than every payment of every invoice
+        stmt = (
+            select(DailyCollectionModel.currency, func.sum(DailyCollectionModel.amount_collected).label("amount"))
+            .where(DailyCollectionModel.school_id == school_id, DailyCollectionModel.day < until.date())
+            .group_by(DailyCollectionModel.currency)
+        )
+        if since is not None:
+            stmt = stmt.where(DailyCollectionModel.day >= since.date())
+        result = await self.session.execute(stmt)
+        return {row.currency: row.amount for row in result}
+
+    async def get_student_summary(self, student_id: UUID) -> Optional[StatementSummaryDTO]:
+        # Owner row LEFT JOIN its projection rows: existence check and totals in one PK lookup
+        stmt = (
+            select(
+                StudentModel.id,
+                StudentBalanceModel.currency,
+                StudentBalanceModel.invoice_count,
+                StudentBalanceModel.total_invoiced,
+                StudentBalanceModel.total_paid
+            )
+            .outerjoin(StudentBalanceModel, StudentBalanceModel.student_id == StudentModel.id)
+            .where(StudentModel.id == student_id)
+        )
+        result = await self.session.execute(stmt)
+        return self._build_summary(student_id, result.all())
+
+    async def get_school_summary(self, school_id: UUID) -> Optional[StatementSummaryDTO]:
+        stmt = (
+            select(
+                SchoolModel.id,
+                SchoolBalanceModel.currency,
+                SchoolBalanceModel.invoice_count,
+                SchoolBalanceModel.total_invoiced,
+                SchoolBalanceModel.total_paid
+            )
+            .outerjoin(SchoolBalanceModel, SchoolBalanceModel.school_id == SchoolModel.id)
+            .where(SchoolModel.id == school_id)
+        )
+        result = await self.session.execute(stmt)
+        return self._build_summary(school_id, result.all())
+
+    async def stream_school_invoices(self, school_id: UUID, batch_size: int = 1000) -> AsyncIterator[List[InvoiceDTO]]:
         stmt = (
             select(
                 InvoiceModel.id,
@@ -91,52 +240,254 @@ class SQLAlchemyStatementRepository(StatementRepository):
                 InvoiceModel.status,
                 InvoiceModel.issued_at,
                 InvoiceModel.due_date,
-                func.coalesce(func.sum(PaymentModel.amount), 0).label("paid_amount")
+                InvoiceModel.amount_paid
             )
-            .outerjoin(PaymentModel, InvoiceModel.id == PaymentModel.invoice_id)
             .where(InvoiceModel.school_id == school_id)
-            .group_by(
-                InvoiceModel.id, 
-                InvoiceModel.amount_total, 
-                InvoiceModel.currency, 
-                InvoiceModel.status, 
-                InvoiceModel.issued_at, 
-                InvoiceModel.due_date
+            .order_by(InvoiceModel.issued_at, InvoiceModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        # Server-side cursor: only one batch of rows is held in memory at a time
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield [
+                InvoiceDTO(
+                    id=row.id,
+                    amount_total=row.amount_total,
+                    amount_paid=row.amount_paid,
+                    amount_due=row.amount_total - row.amount_paid,
+                    currency=row.currency,
+                    status=row.status,
+                    issued_at=row.issued_at,
+                    due_date=row.due_date
+                ) for row in rows
+            ]
+
+    async def list_student_invoices(
+        self, student_id: UUID, limit: int, after: Optional[PageCursor] = None
+    ) -> List[InvoiceDTO]:
+        return await self._invoice_page(InvoiceModel.student_id == student_id, limit, after)
+
+    async def list_school_invoices(
+        self, school_id: UUID, limit: int, after: Optional[PageCursor] = None
+    ) -> List[InvoiceDTO]:
+        return await self._invoice_page(InvoiceModel.school_id == school_id, limit, after)
+
+    async def _invoice_page(self, owner_clause, limit: int, after: Optional[PageCursor]) -> List[InvoiceDTO]:
+        # Newest first, keyset on the (owner, issued_at, id) indexes
+        stmt = (
+            select(
+                InvoiceModel.id,
+                InvoiceModel.amount_total,
+                InvoiceModel.currency,
+                InvoiceModel.status,
+                InvoiceModel.issued_at,
+                InvoiceModel.due_date,
+                InvoiceModel.amount_paid
             )
+            .where(owner_clause)
+            .order_by(InvoiceModel.issued_at.desc(), InvoiceModel.id.desc())
+            .limit(limit)
         )
+        if after:
+            stmt = stmt.where(tuple_(InvoiceModel.issued_at, InvoiceModel.id) < tuple_(after.sort_key, after.id))
         
         result = await self.session.execute(stmt)
-        rows = result.all()
-        
-        invoices_dto = []
-        total_due = Decimal(0)
-        
-        stmt_currency = "MIXED"
-        if rows:
-            stmt_currency = rows[0].currency.value
-
-        for row in rows:
-            amount_total = row.amount_total
-            paid = row.paid_amount
-            due = amount_total - paid
-            
-            total_due += due
-            
-            invoices_dto.append(InvoiceDTO(
+        return [
+            InvoiceDTO(
                 id=row.id,
-                amount_total=amount_total,
-                amount_paid=paid,
-                amount_due=due,
+                amount_total=row.amount_total,
+                amount_paid=row.amount_paid,
+                amount_due=row.amount_total - row.amount_paid,
                 currency=row.currency,
                 status=row.status,
                 issued_at=row.issued_at,
                 due_date=row.due_date
+            ) for row in result.all()
+        ]
+
+    async def get_student_aging(self, student_id: UUID, as_of: date) -> Optional[AgingReportDTO]:
+        rows = await self._aging_rows(StudentModel.id, InvoiceModel.student_id, student_id, as_of, by_student=False)
+        if not rows:
+            return None
+        return AgingReportDTO(
+            entity_id=student_id, as_of=as_of, generated_at=datetime.utcnow(), buckets=_pivot_aging(rows)
+        )
+
+    async def get_school_aging(self, school_id: UUID, as_of: date, by_student: bool = False) -> Optional[AgingReportDTO]:
+        rows = await self._aging_rows(SchoolModel.id, InvoiceModel.school_id, school_id, as_of, by_student)
+        if not rows:
+            return None
+        students = None
+        if by_student:
+            per_student: dict = {}
+            for row in rows:
+                if row.student_id is not None:
+                    per_student.setdefault(row.student_id, []).append(row)
+            students = [
+                StudentAgingDTO(student_id=student_id, buckets=_pivot_aging(student_rows))
+                for student_id, student_rows in per_student.items()
+            ]
+        return AgingReportDTO(
+            entity_id=school_id, as_of=as_of, generated_at=datetime.utcnow(),
+            buckets=_pivot_aging(rows), students=students
+        )
+
+    async def _aging_rows(self, owner_id_column, invoice_owner_column, owner_id: UUID, as_of: date, by_student: bool):
+        # Bucketing happens in a subquery so the GROUP BY refers to a plain column rather than
+        # repeating the CASE (and its bind parameters); only open, unpaid balances are read.
+        # Those are today's balances: as_of moves the bucketing date, it does not rewind payments
+        days_past_due = type_coerce(literal(as_of, Date) - InvoiceModel.due_date, Integer)
+        aged = (
+            select(
+                InvoiceModel.student_id,
+                InvoiceModel.currency,
+                case(
+                    (days_past_due <= 0, "current"),
+                    (days_past_due <= 30, "days_1_30"),
+                    (days_past_due <= 60, "days_31_60"),
+                    (days_past_due <= 90, "days_61_90"),
+                    else_="days_over_90"
+                ).label("bucket"),
+                (InvoiceModel.amount_total - InvoiceModel.amount_paid).label("due")
+            )
+            .where(
+                invoice_owner_column == owner_id,
+                InvoiceModel.status.in_(OPEN_INVOICE_STATUSES),
+                InvoiceModel.amount_paid < InvoiceModel.amount_total
+            )
+            .subquery("aged")
+        )
+        group = [aged.c.currency, aged.c.bucket] + ([aged.c.student_id] if by_student else [])
+        buckets = (
+            select(*group, func.count().label("invoice_count"), func.sum(aged.c.due).label("amount_due"))
+            .group_by(*group)
+            .subquery("buckets")
+        )
+        student_column = buckets.c.student_id if by_student else null().label("student_id")
+        # The owner CTE turns "no such owner" (no rows) apart from "nothing due" (one NULL row)
+        owner = select(owner_id_column.label("id")).where(owner_id_column == owner_id).cte("owner")
+        stmt = (
+            select(
+                owner.c.id, student_column, buckets.c.currency, buckets.c.bucket,
+                buckets.c.invoice_count, buckets.c.amount_due
+            )
+            .select_from(owner)
+            .outerjoin(buckets, true())
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_school_collections(self, school_id: UUID, start: date, end: date) -> Optional[CollectionsSeriesDTO]:
+        # Reads only the rollup: a PK range scan of at most (days x currencies) rows
+        owner = select(SchoolModel.id).where(SchoolModel.id == school_id).cte("owner")
+        stmt = (
+            select(
+                owner.c.id, DailyCollectionModel.day, DailyCollectionModel.currency,
+                DailyCollectionModel.payment_count, DailyCollectionModel.amount_collected
+            )
+            .select_from(owner)
+            .outerjoin(
+                DailyCollectionModel,
+                (DailyCollectionModel.school_id == owner.c.id)
+                & DailyCollectionModel.day.between(start, end)
+                & (DailyCollectionModel.payment_count != 0)
+            )
+            .order_by(DailyCollectionModel.day, DailyCollectionModel.currency)
+        )
+        result = await self.session.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return None
+        return CollectionsSeriesDTO(
+            school_id=school_id, from_date=start, to_date=end, generated_at=datetime.utcnow(),
+            points=[
+                DailyCollectionDTO(
+                    day=row.day, currency=row.currency,
+                    payment_count=row.payment_count, amount_collected=row.amount_collected
+                ) for row in rows if row.day is not None
+            ]
+        )
+
+    async def list_school_receivables(
+        self, limit: int, offset: int = 0, after: Optional[PageCursor] = None
+    ) -> List[SchoolReceivablesDTO]:
+        # Page over schools, not view rows, so a school's currencies never straddle two pages
+        mv = school_receivables
+        page = (
+            select(mv.c.school_created_at, mv.c.school_id)
+            .group_by(mv.c.school_created_at, mv.c.school_id)
+            .order_by(mv.c.school_created_at.desc(), mv.c.school_id.desc())
+            .limit(limit)
+        )
+        if after:
+            page = page.where(tuple_(mv.c.school_created_at, mv.c.school_id) < tuple_(after.sort_key, after.id))
+        else:
+            page = page.offset(offset)
+        page = page.subquery("page")
+
+        stmt = (
+            select(mv)
+            .join(page, (mv.c.school_created_at == page.c.school_created_at) & (mv.c.school_id == page.c.school_id))
+            .order_by(mv.c.school_created_at.desc(), mv.c.school_id.desc(), mv.c.currency)
+        )
+        result = await self.session.execute(stmt)
+
+        schools: dict = {}
+        for row in result:
+            school = schools.get(row.school_id)
+            if school is None:
+                school = schools[row.school_id] = SchoolReceivablesDTO(
+                    id=row.school_id, name=row.school_name, created_at=row.school_created_at, totals=[]
+                )
+            school.totals.append(ReceivablesTotalsDTO(
+                currency=row.currency,
+                invoice_count=row.invoice_count,
+                total_invoiced=row.total_invoiced,
+                total_collected=row.total_collected,
+                total_outstanding=row.total_outstanding,
+                status_counts={
+                    InvoiceStatus.PENDING: row.pending_count,
+                    InvoiceStatus.PARTIALLY_PAID: row.partially_paid_count,
+                    InvoiceStatus.PAID: row.paid_count,
+                    InvoiceStatus.OVERDUE: row.overdue_count,
+                }
             ))
-            
-        return AccountStatementDTO(
-             entity_id=school_id,
-             generated_at=datetime.utcnow(),
-             invoices=invoices_dto,
-             total_due=total_due,
-             currency=stmt_currency
+        return list(schools.values())
+
+    async def count_school_receivables(self) -> int:
+        result = await self.session.execute(
+            select(func.count(school_receivables.c.school_id.distinct()))
         )
+        return result.scalar_one()
+
+    @staticmethod
+    def _build_summary(entity_id: UUID, rows) -> Optional[StatementSummaryDTO]:
+        if not rows:
+            return None
+        totals = [
+            CurrencyTotalDTO(
+                currency=row.currency,
+                invoice_count=row.invoice_count,
+                total_invoiced=row.total_invoiced,
+                total_paid=row.total_paid,
+                total_due=row.total_invoiced - row.total_paid
+            ) for row in rows if row.currency is not None
+        ]
+        return StatementSummaryDTO(
+            entity_id=entity_id,
+            generated_at=datetime.utcnow(),
+            invoice_count=sum(t.invoice_count for t in totals),
+            totals=totals
+        )
+
+def _pivot_aging(rows) -> List[AgingBucketsDTO]:
+    per_currency: dict = {}
+    for row in rows:
+        if row.currency is None:
+            continue
+        buckets = per_currency.setdefault(row.currency, AgingBucketsDTO(currency=row.currency))
+        setattr(buckets, row.bucket, getattr(buckets, row.bucket) + row.amount_due)
+        buckets.invoice_count += row.invoice_count
+        buckets.total_due += row.amount_due
+    return list(per_currency.values())
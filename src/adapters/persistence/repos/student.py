@@ -1,12 +1,18 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete as sqlalchemy_delete
+from sqlalchemy import select, func, tuple_, delete as sqlalchemy_delete
 
 from src.application.ports.repositories import StudentRepository
+from src.application.pagination import PageCursor
 from src.domain.entities import Student
 from src.adapters.persistence.models_business import StudentModel
 
+STUDENT_COLUMNS = (StudentModel.id, StudentModel.school_id, StudentModel.name, StudentModel.created_at)
+
+def _to_student(row) -> Student:
+    return Student(id=row.id, school_id=row.school_id, name=row.name, created_at=row.created_at)
+
 class SQLAlchemyStudentRepository(StudentRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -26,37 +32,49 @@ class SQLAlchemyStudentRepository(StudentRepository):
             self.session.add(model)
         
     async def get_by_id(self, student_id: UUID) -> Optional[Student]:
-        result = await self.session.execute(select(StudentModel).where(StudentModel.id == student_id))
-        model = result.scalar_one_or_none()
-        if not model:
-            return None
-        return Student(id=model.id, school_id=model.school_id, name=model.name, created_at=model.created_at)
+        result = await self.session.execute(select(*STUDENT_COLUMNS).where(StudentModel.id == student_id))
+        row = result.one_or_none()
+        return _to_student(row) if row else None
 
     async def get_by_school(self, school_id: UUID) -> List[Student]:
         # Existing method
-        result = await self.session.execute(select(StudentModel).where(StudentModel.school_id == school_id))
-        models = result.scalars().all()
-        return [Student(id=m.id, school_id=m.school_id, name=m.name, created_at=m.created_at) for m in models]
+        result = await self.session.execute(select(*STUDENT_COLUMNS).where(StudentModel.school_id == school_id))
+        return [_to_student(row) for row in result]
+
+    async def get_school_ids(self, student_ids: List[UUID]) -> Dict[UUID, UUID]:
+        if not student_ids:
+            return {}
+        result = await self.session.execute(
+            select(StudentModel.id, StudentModel.school_id).where(StudentModel.id.in_(student_ids))
+        )
+        return {row.id: row.school_id for row in result}
 
     async def delete(self, student_id: UUID) -> None:
         await self.session.execute(
              sqlalchemy_delete(StudentModel).where(StudentModel.id == student_id)
         )
 
-    async def list(self, limit: int, offset: int, school_id: Optional[UUID] = None) -> tuple[List[Student], int]:
-        query = select(StudentModel)
+    async def list(
+        self, limit: int, offset: int, school_id: Optional[UUID] = None,
+        after: Optional[PageCursor] = None, with_total: bool = False
+    ) -> tuple[List[Student], Optional[int]]:
+        query = select(*STUDENT_COLUMNS)
         count_query = select(func.count()).select_from(StudentModel)
         
         if school_id:
             query = query.where(StudentModel.school_id == school_id)
             count_query = count_query.where(StudentModel.school_id == school_id)
             
-        count_res = await self.session.execute(count_query)
-        total = count_res.scalar_one()
+        total = None
+        if with_total:
+            count_res = await self.session.execute(count_query)
+            total = count_res.scalar_one()
         
-        query = query.limit(limit).offset(offset).order_by(StudentModel.created_at.desc())
+        query = query.order_by(StudentModel.created_at.desc(), StudentModel.id.desc()).limit(limit)
+        if after:
+            query = query.where(tuple_(StudentModel.created_at, StudentModel.id) < tuple_(after.sort_key, after.id))
+        else:
+            query = query.offset(offset)
         result = await self.session.execute(query)
-        models = result.scalars().all()
-        
-        items = [Student(id=m.id, school_id=m.school_id, name=m.name, created_at=m.created_at) for m in models]
+        items = [_to_student(row) for row in result]
         return items, total
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from typing import Optional
+
+from src.adapters.web.auth_handlers import get_current_active_admin
+from src.adapters.persistence.db import engine, replica_engine, REPLICA_ENABLED, cache_service, redis_cache
+from src.adapters.persistence.pool import pool_stats
+from src.adapters.web.handlers import get_query_handlers
+from src.application.dtos import PaginationParams, PaginatedResponse, SchoolReceivablesDTO
+from src.application.use_cases.queries import QueryHandlers
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/pools")
+async def get_pool_stats(current_user = Depends(get_current_active_admin)):
+    stats = {"postgres_primary": pool_stats(engine)}
+    if REPLICA_ENABLED:
+        stats["postgres_replica"] = pool_stats(replica_engine)
+    stats["redis"] = redis_cache.pool.stats()
+    if cache_service is not redis_cache:
+        stats["cache_l1"] = cache_service.stats()
+    return stats
+
+@router.get("/receivables", response_model=PaginatedResponse[SchoolReceivablesDTO])
+async def list_school_receivables(
+    limit: int = 10, offset: int = 0,
+    after: Optional[str] = None, include_total: bool = False,
+    current_user = Depends(get_current_active_admin),
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    params = PaginationParams(limit=limit, offset=offset, after=after, include_total=include_total)
+    return await handlers.list_school_receivables(params)
@@ -1,19 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from src.adapters.web.handlers import router as api_router
+from src.adapters.web.handlers import router as api_router, payment_batcher
 from src.adapters.web.auth_handlers import router as auth_router
+from src.adapters.web.admin_handlers import router as admin_router
 from src.adapters.observability import ObservabilityMiddleware
+from src.adapters.jobs import start_scheduled_jobs
+from src.adapters.persistence.db import cache_invalidation_listener
+from src.adapters.web.consistency import ConsistencyTokenMiddleware
 from src.domain.exceptions import DomainError
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jobs = start_scheduled_jobs()
+    if cache_invalidation_listener:
+        jobs.append(asyncio.create_task(cache_invalidation_listener.run()))
+    yield
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    # Don't drop payments that were accepted but not yet group-committed
+    if payment_batcher:
+        await payment_batcher.close()
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="School Payments API",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan
     )
 
     # Middleware
+    app.add_middleware(ConsistencyTokenMiddleware)
     app.add_middleware(ObservabilityMiddleware)
 
     # Exception Handlers
@@ -42,5 +63,6 @@ def create_app() -> FastAPI:
     # Routes
     app.include_router(auth_router)
     app.include_router(api_router)
+    app.include_router(admin_router)
     
     return app
@@ -0,0 +1,21 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+
+from src.adapters.persistence.db import commit_token_var
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+class ConsistencyTokenMiddleware(BaseHTTPMiddleware):
+    """Returns the primary commit position of a command as X-Consistency-Token.
+
+    Clients echo it on later reads to get read-your-writes while the replica lags.
+    """
+    async def dispatch(self, request: Request, call_next):
+        holder: dict = {}
+        commit_token_var.set(holder)
+        
+        response = await call_next(request)
+        
+        if holder.get("token"):
+            response.headers[CONSISTENCY_HEADER] = holder["token"]
+        return response
@@ -1,23 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from datetime import date, datetime
 from typing import List, Optional
 
 
 from src.application.dtos import (
     CreateSchoolCommand, CreateStudentCommand, 
     CreateInvoiceCommand, ProcessPaymentCommand,
-    SchoolDTO, StudentDTO, InvoiceDTO, AccountStatementDTO
-)
-from src.adapters.persistence.repos import (
-    SQLAlchemyUnitOfWork, 
-    SQLAlchemySchoolRepository, 
-    SQLAlchemyStudentRepository, 
-    SQLAlchemyInvoiceRepository,
-    SQLAlchemyStatementRepository
+    SchoolDTO, StudentDTO, InvoiceDTO, AccountStatementDTO, StatementSummaryDTO,
+    InvoiceImportReportDTO, PaymentImportReportDTO, GenerateSchoolInvoicesCommand, GeneratedInvoicesDTO,
+    AgingReportDTO, CollectionsSeriesDTO
 )
+from src.adapters.composition import build_command_handlers, build_query_handlers, standalone_command_handlers
 from src.adapters.web.auth_handlers import get_current_active_admin, get_current_user
 from src.adapters.cache.redis_adapter import RedisCacheAdapter
+from src.domain.enums import InvoiceStatus
 from src.domain.exceptions import EntityNotFound, BusinessRuleViolation
 from src.application.dtos import (
     PaginationParams, PaginatedResponse, UpdateSchoolCommand, UpdateStudentCommand
@@ -26,34 +26,42 @@ from src.application.use_cases.commands import CommandHandlers
 from src.application.use_cases.queries import QueryHandlers
 
 import os
-from src.adapters.persistence.db import get_db, REDIS_URL, cache_service
+from src.config import settings
+from src.adapters.persistence.db import (
+    get_db, get_read_db, read_sessionmaker, is_replica_session, REDIS_URL
+)
+from src.adapters.web.payment_batching import PaymentBatcher
+from src.adapters.imports.files import (
+    FORMATS as IMPORT_FORMATS, detect_format, iter_lines, parse_invoice_rows, parse_payment_rows
+)
 
 async def get_command_handlers(session: AsyncSession = Depends(get_db)):
-    uow = SQLAlchemyUnitOfWork(session)
-    school_repo = SQLAlchemySchoolRepository(session)
-    student_repo = SQLAlchemyStudentRepository(session)
-    invoice_repo = SQLAlchemyInvoiceRepository(session)
-    
-    return CommandHandlers(
-        uow=uow, 
-        school_repo=school_repo, 
-        student_repo=student_repo, 
-        invoice_repo=invoice_repo, 
-        cache=cache_service
-    )
+    return build_command_handlers(session)
 
-async def get_query_handlers(session: AsyncSession = Depends(get_db)):
-    statement_repo = SQLAlchemyStatementRepository(session)
-    school_repo = SQLAlchemySchoolRepository(session)
-    student_repo = SQLAlchemyStudentRepository(session)
-    invoice_repo = SQLAlchemyInvoiceRepository(session)
-    return QueryHandlers(
-        statement_repo=statement_repo, 
-        school_repo=school_repo, 
-        student_repo=student_repo, 
-        invoice_repo=invoice_repo, 
-        cache=cache_service
+payment_batcher: Optional[PaymentBatcher] = (
+    PaymentBatcher(
+        standalone_command_handlers,
+        max_size=settings.PAYMENT_BATCH_MAX_SIZE,
+        max_wait_ms=settings.PAYMENT_BATCH_MAX_WAIT_MS
     )
+    if settings.PAYMENT_BATCHING_ENABLED else None
+)
+
+# Header set on statements served stale-while-revalidate
+STALE_HEADER = "X-Statement-Stale"
+
+def mark_stale(response: Response, statement: AccountStatementDTO) -> AccountStatementDTO:
+    if statement.stale:
+        response.headers[STALE_HEADER] = "true"
+        response.headers["Age"] = str(max(int((datetime.utcnow() - statement.generated_at).total_seconds()), 0))
+    return statement
+
+async def get_query_db(x_consistency_token: Optional[str] = Header(None)):
+    async for session in get_read_db(x_consistency_token):
+        yield session
+
+async def get_query_handlers(session: AsyncSession = Depends(get_query_db)):
+    return build_query_handlers(session, on_replica=is_replica_session(session))
 
 
 router = APIRouter()
@@ -71,9 +79,10 @@ async def create_school(
 @router.get("/schools", response_model=PaginatedResponse[SchoolDTO])
 async def list_schools(
     limit: int = 10, offset: int = 0,
+    after: Optional[str] = None, include_total: bool = False,
     handlers: QueryHandlers = Depends(get_query_handlers)
 ):
-    params = PaginationParams(limit=limit, offset=offset)
+    params = PaginationParams(limit=limit, offset=offset, after=after, include_total=include_total)
     return await handlers.list_schools(params)
 
 @router.delete("/schools/{school_id}", status_code=204)
@@ -118,9 +127,10 @@ async def create_student(
 async def list_students(
     school_id: Optional[UUID] = None,
     limit: int = 10, offset: int = 0,
+    after: Optional[str] = None, include_total: bool = False,
     handlers: QueryHandlers = Depends(get_query_handlers)
 ):
-    params = PaginationParams(limit=limit, offset=offset)
+    params = PaginationParams(limit=limit, offset=offset, after=after, include_total=include_total)
     return await handlers.list_students(params, school_id)
 
 @router.delete("/students/{student_id}", status_code=204)
@@ -161,14 +171,42 @@ async def create_invoice(
     except EntityNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.post("/schools/{school_id}/invoices/generate", status_code=201, response_model=GeneratedInvoicesDTO)
+async def generate_school_invoices(
+    school_id: UUID,
+    cmd: GenerateSchoolInvoicesCommand,
+    current_user = Depends(get_current_active_admin),
+    handlers: CommandHandlers = Depends(get_command_handlers)
+):
+    """Bill every student of the school (or `student_ids`) once for the billing period."""
+    if school_id != cmd.school_id:
+        raise HTTPException(status_code=400, detail="ID mismatch")
+    try:
+        return await handlers.generate_school_invoices(cmd)
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/invoices/import", response_model=InvoiceImportReportDTO)
+async def import_invoices(
+    request: Request,
+    format: Optional[str] = None,
+    current_user = Depends(get_current_active_admin),
+    handlers: CommandHandlers = Depends(get_command_handlers)
+):
+    """Bulk-create invoices from a streamed CSV (header row) or NDJSON body."""
+    rows = parse_invoice_rows(iter_lines(request.stream()), _import_format(request, format))
+    return await handlers.import_invoices(rows)
+
 @router.get("/invoices", response_model=PaginatedResponse[InvoiceDTO])
 async def list_invoices(
     student_id: Optional[UUID] = None,
+    status: Optional[InvoiceStatus] = None,
     limit: int = 10, offset: int = 0,
+    after: Optional[str] = None, include_total: bool = False,
     handlers: QueryHandlers = Depends(get_query_handlers)
 ):
-    params = PaginationParams(limit=limit, offset=offset)
-    return await handlers.list_invoices(params, student_id)
+    params = PaginationParams(limit=limit, offset=offset, after=after, include_total=include_total)
+    return await handlers.list_invoices(params, student_id, status)
 
 @router.delete("/invoices/{invoice_id}", status_code=204)
 async def delete_invoice(
@@ -180,6 +218,8 @@ async def delete_invoice(
         await handlers.delete_invoice(invoice_id)
     except EntityNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except BusinessRuleViolation as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @router.post("/payments", status_code=201)
 async def process_payment(
@@ -188,30 +228,160 @@ async def process_payment(
     handlers: CommandHandlers = Depends(get_command_handlers)
 ):
     try:
-        payment_id = await handlers.process_payment(cmd)
+        if payment_batcher:
+            payment_id = await payment_batcher.submit(cmd)
+        else:
+            payment_id = await handlers.process_payment(cmd)
         return {"id": payment_id, "status": "processed"}
     except EntityNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except BusinessRuleViolation as e:
         raise HTTPException(status_code=409, detail=str(e))
 
+@router.post("/payments/import", response_model=PaymentImportReportDTO)
+async def import_payments(
+    request: Request,
+    format: Optional[str] = None,
+    current_user = Depends(get_current_active_admin),
+    handlers: CommandHandlers = Depends(get_command_handlers)
+):
+    """Reconcile a streamed bank file (CSV or NDJSON) against open invoices."""
+    rows = parse_payment_rows(iter_lines(request.stream()), _import_format(request, format))
+    return await handlers.import_payments(rows)
+
+def _import_format(request: Request, format: Optional[str]) -> str:
+    try:
+        fmt = format or detect_format(request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=415, detail=f"Unsupported import format: {fmt}")
+    return fmt
+
 @router.get("/students/{student_id}/account-statement", response_model=AccountStatementDTO)
 async def get_student_statement(
     student_id: UUID, 
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100), after: Optional[str] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    fresh: bool = False,
+    x_consistency_token: Optional[str] = Header(None),
     handlers: QueryHandlers = Depends(get_query_handlers)
 ):
+    # Read-your-writes: a stale statement would predate the write the token stands for
+    fresh = fresh or x_consistency_token is not None
     try:
-        return await handlers.get_student_account_statement(student_id)
+        if from_date or to_date:
+            if limit is not None or after:
+                raise HTTPException(status_code=400, detail="from/to cannot be combined with limit/after")
+            return mark_stale(response, await handlers.get_student_period_statement(student_id, from_date, to_date, fresh))
+        # Without limit/after the full statement is returned, as before
+        page = PaginationParams(limit=limit or 10, after=after) if (limit is not None or after) else None
+        return mark_stale(response, await handlers.get_student_account_statement(student_id, page, fresh))
     except EntityNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/schools/{school_id}/account-statement", response_model=AccountStatementDTO)
 async def get_school_statement(
     school_id: UUID, 
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100), after: Optional[str] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    fresh: bool = False,
+    x_consistency_token: Optional[str] = Header(None),
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    # Read-your-writes: a stale statement would predate the write the token stands for
+    fresh = fresh or x_consistency_token is not None
+    try:
+        if from_date or to_date:
+            if limit is not None or after:
+                raise HTTPException(status_code=400, detail="from/to cannot be combined with limit/after")
+            return mark_stale(response, await handlers.get_school_period_statement(school_id, from_date, to_date, fresh))
+        # Without limit/after the full statement is returned, as before
+        page = PaginationParams(limit=limit or 10, after=after) if (limit is not None or after) else None
+        return mark_stale(response, await handlers.get_school_account_statement(school_id, page, fresh))
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/schools/{school_id}/account-statement/stream")
+async def stream_school_statement(school_id: UUID, x_consistency_token: Optional[str] = Header(None)):
+    # Dependency sessions are closed before a streaming body runs, so the stream owns its session
+    session = (await read_sessionmaker(x_consistency_token))()
+    handlers = build_query_handlers(session, on_replica=is_replica_session(session))
+    try:
+        lines = await handlers.stream_school_account_statement(school_id)
+    except EntityNotFound as e:
+        await session.close()
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def body():
+        try:
+            async for chunk in lines:
+                yield chunk
+        finally:
+            await session.close()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+@router.get("/students/{student_id}/account-statement/summary", response_model=StatementSummaryDTO)
+async def get_student_statement_summary(
+    student_id: UUID, 
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    try:
+        return await handlers.get_student_statement_summary(student_id)
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/schools/{school_id}/account-statement/summary", response_model=StatementSummaryDTO)
+async def get_school_statement_summary(
+    school_id: UUID, 
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    try:
+        return await handlers.get_school_statement_summary(school_id)
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/students/{student_id}/aging", response_model=AgingReportDTO)
+async def get_student_aging(
+    student_id: UUID,
+    as_of: Optional[date] = None,
+    x_consistency_token: Optional[str] = Header(None),
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    try:
+        return await handlers.get_student_aging(student_id, as_of, fresh=x_consistency_token is not None)
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/schools/{school_id}/aging", response_model=AgingReportDTO)
+async def get_school_aging(
+    school_id: UUID,
+    as_of: Optional[date] = None, by_student: bool = False,
+    x_consistency_token: Optional[str] = Header(None),
+    handlers: QueryHandlers = Depends(get_query_handlers)
+):
+    try:
+        return await handlers.get_school_aging(school_id, as_of, by_student, fresh=x_consistency_token is not None)
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/schools/{school_id}/collections", response_model=CollectionsSeriesDTO)
+async def get_school_collections(
+    school_id: UUID,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    x_consistency_token: Optional[str] = Header(None),
     handlers: QueryHandlers = Depends(get_query_handlers)
 ):
     try:
-        return await handlers.get_school_account_statement(school_id)
+        return await handlers.get_school_collections(
+            school_id, from_date, to_date, fresh=x_consistency_token is not None
+        )
     except EntityNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
 
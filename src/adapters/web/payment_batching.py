@@ -0,0 +1,96 @@
+import asyncio
+from typing import AsyncContextManager, Callable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from src.application.dtos import ProcessPaymentCommand
+from src.application.use_cases.commands import CommandHandlers
+from src.adapters.persistence.db import commit_token_var
+from src.adapters.observability import logger
+
+HandlersFactory = Callable[[], AsyncContextManager[CommandHandlers]]
+
+class PaymentBatcher:
+    """Group-commits payments that arrive within a short window.
+
+    Callers await `submit` and get their own payment id or exception back, while the
+    batch shares one transaction, one commit and one round of cache invalidations.
+    """
+    def __init__(self, handlers_factory: HandlersFactory, max_size: int = 100, max_wait_ms: float = 5.0):
+        self.handlers_factory = handlers_factory
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[ProcessPaymentCommand, asyncio.Future, Optional[dict]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, cmd: ProcessPaymentCommand) -> UUID:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # The caller's consistency-token holder, filled in once the batch commits
+        self._pending.append((cmd, future, commit_token_var.get()))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    async def close(self) -> None:
+        """Flush whatever is pending and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[ProcessPaymentCommand, asyncio.Future, Optional[dict]]]) -> None:
+        holder: dict = {}
+        commit_token_var.set(holder)
+        cmds = [cmd for cmd, _, _ in batch]
+        handlers = None
+        results = None
+
+        try:
+            async with self.handlers_factory() as handlers:
+                results = await handlers.process_payment_batch(cmds)
+        except Exception as e:
+            if results is not None:
+                # Failed while releasing the session: the batch outcome is already known
+                logger.warning("payment_batch_cleanup_failed", size=len(batch), exc_info=True)
+            elif handlers is not None and handlers.uow.committed:
+                # The payments are durable; re-running them one by one would apply them twice
+                logger.error("payment_batch_failed_after_commit", size=len(batch), exc_info=True)
+                results = [e] * len(cmds)
+            else:
+                # An infrastructure error poisoned the shared transaction; isolate the items
+                # so one bad payment cannot fail the payments it happened to be batched with
+                logger.warning("payment_batch_failed", size=len(batch), exc_info=True)
+                results = [await self._run_single(cmd) for cmd in cmds]
+
+        for (_, future, caller_holder), result in zip(batch, results):
+            if caller_holder is not None and holder.get("token"):
+                caller_holder["token"] = holder["token"]
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_single(self, cmd: ProcessPaymentCommand):
+        try:
+            async with self.handlers_factory() as handlers:
+                return await handlers.process_payment(cmd)
+        except Exception as e:
+            return e
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Generic, TypeVar
+from typing import Dict, List, Optional, Generic, TypeVar, Literal
 from datetime import datetime, date
 from uuid import UUID
 from decimal import Decimal
@@ -11,12 +11,16 @@ T = TypeVar("T")
 class PaginationParams(BaseModel):
     limit: int = Field(10, ge=1, le=100)
     offset: int = Field(0, ge=0)
+    # Opaque keyset cursor; when present, offset is ignored
+    after: Optional[str] = None
+    include_total: bool = False
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 # --- Command DTOs ---
 
@@ -45,6 +49,62 @@ class ProcessPaymentCommand(BaseModel):
     invoice_id: UUID
     amount: Decimal
 
+class GenerateSchoolInvoicesCommand(BaseModel):
+    school_id: UUID
+    # YYYY-MM; at most one invoice per student and period is ever generated
+    billing_period: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+    amount: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+    currency: Currency
+    due_date: date
+    # Restrict generation to these students of the school; None bills every student
+    student_ids: Optional[List[UUID]] = None
+
+class InvoiceImportRow(BaseModel):
+    """One invoice from a bulk import file; `line` is its position in the source."""
+    line: int
+    student_id: UUID
+    amount: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+    currency: Currency
+    due_date: date
+
+class PaymentImportRow(BaseModel):
+    """One payment from a bank file, referencing the invoice it settles."""
+    line: int
+    invoice_id: UUID
+    amount: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+    currency: Currency
+    reference: Optional[str] = None
+
+class ImportRowErrorDTO(BaseModel):
+    line: int
+    error: str
+
+class GeneratedInvoicesDTO(BaseModel):
+    school_id: UUID
+    billing_period: str
+    # Students already billed for the period are skipped and not counted
+    created: int
+
+class OverdueSweepResultDTO(BaseModel):
+    as_of: date
+    marked: int
+
+class InvoiceImportReportDTO(BaseModel):
+    imported: int = 0
+    rejected: int = 0
+    # Capped; `rejected` is the full count
+    errors: List[ImportRowErrorDTO] = []
+
+class PaymentImportReportDTO(BaseModel):
+    applied: int = 0
+    # No open invoice with that id (unknown, deleted or already paid)
+    unmatched: int = 0
+    # Matched, but breaks a payment rule (overpayment, currency mismatch) or is malformed
+    rejected: int = 0
+    # Both lists are capped; the counters are the full totals
+    unmatched_rows: List[ImportRowErrorDTO] = []
+    errors: List[ImportRowErrorDTO] = []
+
 # --- Query Result DTOs ---
 
 class SchoolDTO(BaseModel):
@@ -68,9 +128,105 @@ class InvoiceDTO(BaseModel):
     issued_at: datetime
     due_date: date
 
+class CurrencyTotalDTO(BaseModel):
+    currency: Currency
+    invoice_count: int
+    total_invoiced: Decimal
+    total_paid: Decimal
+    total_due: Decimal
+
+class PeriodBalanceDTO(BaseModel):
+    """Balance owed in one currency: opening + invoiced - collected = closing."""
+    currency: Currency
+    opening_balance: Decimal
+    invoiced: Decimal
+    collected: Decimal
+    closing_balance: Decimal
+
+class StatementPeriodDTO(BaseModel):
+    from_date: date
+    to_date: date
+    balances: List[PeriodBalanceDTO]
+
 class AccountStatementDTO(BaseModel):
     entity_id: UUID
     generated_at: datetime
     invoices: List[InvoiceDTO]
+    # Due in `currency`; 0 when the statement is MIXED, where `totals` is the source of truth
     total_due: Decimal
-    currency: str
+    # None when the statement has no invoices
+    currency: Optional[str]
+    # Set on paginated statements: counts and totals cover all invoices, not just this page
+    invoice_count: Optional[int] = None
+    totals: List[CurrencyTotalDTO] = []
+    next_cursor: Optional[str] = None
+    # Set on date-ranged statements: invoices (and totals) are those issued in the period
+    period: Optional[StatementPeriodDTO] = None
+    # Served from the previous version while the current one is rebuilt; never serialized
+    stale: bool = Field(False, exclude=True)
+
+class StatementSummaryDTO(BaseModel):
+    entity_id: UUID
+    generated_at: datetime
+    invoice_count: int
+    totals: List[CurrencyTotalDTO]
+
+class AgingBucketsDTO(BaseModel):
+    """Open balance of one currency split by days past due."""
+    currency: Currency
+    invoice_count: int = 0
+    current: Decimal = Decimal("0")
+    days_1_30: Decimal = Decimal("0")
+    days_31_60: Decimal = Decimal("0")
+    days_61_90: Decimal = Decimal("0")
+    days_over_90: Decimal = Decimal("0")
+    total_due: Decimal = Decimal("0")
+
+class StudentAgingDTO(BaseModel):
+    student_id: UUID
+    buckets: List[AgingBucketsDTO]
+
+class AgingReportDTO(BaseModel):
+    entity_id: UUID
+    as_of: date
+    generated_at: datetime
+    buckets: List[AgingBucketsDTO]
+    # Per-student breakdown of a school report, only when requested
+    students: Optional[List[StudentAgingDTO]] = None
+
+class DailyCollectionDTO(BaseModel):
+    day: date
+    currency: Currency
+    payment_count: int
+    amount_collected: Decimal
+
+class CollectionsSeriesDTO(BaseModel):
+    """Payments collected per UTC day; days with no payments are omitted."""
+    school_id: UUID
+    from_date: date
+    to_date: date
+    generated_at: datetime
+    points: List[DailyCollectionDTO]
+
+class ReceivablesTotalsDTO(BaseModel):
+    currency: Currency
+    invoice_count: int
+    total_invoiced: Decimal
+    total_collected: Decimal
+    total_outstanding: Decimal
+    status_counts: Dict[InvoiceStatus, int]
+
+class SchoolReceivablesDTO(BaseModel):
+    """One school's row of the admin receivables dashboard, as of the last view refresh."""
+    id: UUID
+    name: str
+    created_at: datetime
+    totals: List[ReceivablesTotalsDTO]
+
+class StatementStreamTrailerDTO(BaseModel):
+    """Last line of a streamed statement; totals cover exactly the rows streamed before it."""
+    type: Literal["summary"] = "summary"
+    entity_id: UUID
+    generated_at: datetime
+    invoice_count: int
+    totals: List[CurrencyTotalDTO]
@@ -0,0 +1,39 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from src.domain.exceptions import InvalidCursor
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Keyset position: the (sort key, id) pair of the last row of a page."""
+    sort_key: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        raw = json.dumps({"k": self.sort_key.isoformat(), "id": str(self.id)})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(sort_key=datetime.fromisoformat(data["k"]), id=UUID(data["id"]))
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidCursor(f"Invalid pagination cursor: {token}") from e
+
+def decode_cursor(token: Optional[str]) -> Optional[PageCursor]:
+    return PageCursor.decode(token) if token else None
+
+def next_cursor(items: Sequence[T], limit: int, sort_key: Callable[[T], datetime]) -> Optional[str]:
+    # A short page means there is nothing after it
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return PageCursor(sort_key=sort_key(last), id=last.id).encode()
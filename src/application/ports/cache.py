@@ -1,5 +1,19 @@
+import uuid
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Keys wrap `key_prefix` in braces, a Redis Cluster hash tag: a prefix's version counter and
+# every value cached under it land in the same slot, so one script can touch both
+def version_key(key_prefix: str) -> str:
+    """`{<key_prefix>}:version`, the counter bumped to invalidate everything under `key_prefix`."""
+    return f"{{{key_prefix}}}:version"
+
+def versioned_key(key_prefix: str, report: str, version: int, suffix: str = "") -> str:
+    """`{<key_prefix>}:<report>:v<version><suffix>`, invalidated by bumping `key_prefix`'s version."""
+    return f"{{{key_prefix}}}:{report}:v{version}{suffix}"
 
 class CacheService(ABC):
     @abstractmethod
@@ -17,7 +31,59 @@ class CacheService(ABC):
         """Increment version counter for invalidation implementation."""
         ...
         
+    @abstractmethod
+    async def increment_versions(self, key_prefixes: List[str]) -> None:
+        """Increment several version counters in one round trip."""
+        ...
+
     @abstractmethod
     async def get_version(self, key_prefix: str) -> int:
         """Get current version for key prefix."""
         ...
+
+    async def get_model(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Retrieve a cached DTO; an entry that no longer parses is treated as a miss.
+
+        Returned instances may be shared with other readers and must not be mutated.
+        """
+        return self._parse_model(await self.get(key), model)
+
+    @staticmethod
+    def _parse_model(cached: Optional[str], model: Type[ModelT]) -> Optional[ModelT]:
+        if not cached:
+            return None
+        try:
+            return model.model_validate_json(cached)
+        except ValueError:
+            return None
+
+    async def set_model(self, key: str, value: BaseModel, ttl_seconds: int) -> None:
+        """Cache a DTO with TTL."""
+        await self.set(key, value.model_dump_json(), ttl_seconds=ttl_seconds)
+
+    async def get_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, model: Type[ModelT]
+    ) -> Tuple[int, Optional[ModelT]]:
+        """Resolve `key_prefix`'s current version and read the DTO cached under its versioned_key.
+
+        Implementations should do both in a single round trip.
+        """
+        version = await self.get_version(key_prefix)
+        return version, await self.get_model(versioned_key(key_prefix, report, version, suffix), model)
+
+    async def set_versioned_model(
+        self, key_prefix: str, report: str, suffix: str, version: int, value: BaseModel, ttl_seconds: int
+    ) -> None:
+        """Cache a DTO under its versioned_key; skipped if `key_prefix` has moved past `version` since."""
+        await self.set_model(versioned_key(key_prefix, report, version, suffix), value, ttl_seconds=ttl_seconds)
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Try to take a short-lived lock shared by every instance; returns a token, or None if held.
+
+        Without a shared store there is nobody to exclude, so the lock is always granted.
+        """
+        return uuid.uuid4().hex
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock taken with acquire_lock, unless it expired and was taken by someone else."""
+        return None
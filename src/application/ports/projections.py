@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+from src.domain.enums import Currency
+
+@dataclass(frozen=True)
+class BalanceDelta:
+    """Signed change to the balances of one student (and its school) in one currency.
+
+    A delta with `paid_on` is one payment (or, when `paid` is negative, its reversal) and
+    also moves the school's daily collections for that UTC day.
+    """
+    student_id: UUID
+    school_id: UUID
+    currency: Currency
+    invoice_count: int = 0
+    invoiced: Decimal = Decimal("0")
+    paid: Decimal = Decimal("0")
+    paid_on: Optional[date] = None
+
+class BalanceProjectionRepository(ABC):
+    @abstractmethod
+    async def apply(self, deltas: Iterable[BalanceDelta]) -> None:
+        """Apply deltas to the student and school projections within the current transaction."""
+        ...
+
+    @abstractmethod
+    async def remove_student(self, student_id: UUID) -> None: ...
+
+    @abstractmethod
+    async def remove_school(self, school_id: UUID) -> None: ...
+
+    @abstractmethod
+    async def rebuild(self) -> None:
+        """Regenerate every projection row from the write tables."""
+        ...
+
+    @abstractmethod
+    async def rebuild_collections(self, start: Optional[date] = None, end: Optional[date] = None) -> None:
+        """Regenerate the daily collections of [start, end] (default: every day) from the payments table.
+
+        Days before the oldest attached monthly payments partition are never touched: their
+        payments may have been detached for archiving.
+        """
+        ...
+
+    @abstractmethod
+    async def take_snapshots(self, as_of: date) -> bool:
+        """Checkpoint every student's and school's totals before `as_of`, building on the previous
+        checkpoint; False if another session is already taking snapshots."""
+        ...
+
+    @abstractmethod
+    async def adjust_snapshots(self, delta: BalanceDelta, effective_at: datetime) -> None:
+        """Apply `delta` to the snapshots taken after `effective_at`, when history behind them changes."""
+        ...
+
+    @abstractmethod
+    async def refresh_receivables(self) -> bool:
+        """Refresh the cross-school receivables view; False if another session is already refreshing it."""
+        ...
@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, List, Dict, AsyncIterator
 from uuid import UUID
-from src.domain.entities import School, Student, Invoice
+from src.domain.entities import School, Student, Invoice, Payment
+from src.domain.enums import Currency, InvoiceStatus
+from src.application.pagination import PageCursor
 
 class SchoolRepository(ABC):
     @abstractmethod
@@ -11,7 +16,9 @@ class SchoolRepository(ABC):
     @abstractmethod
     async def delete(self, school_id: UUID) -> None: ...
     @abstractmethod
-    async def list(self, limit: int, offset: int) -> tuple[List[School], int]: ...
+    async def list(
+        self, limit: int, offset: int, after: Optional[PageCursor] = None, with_total: bool = False
+    ) -> tuple[List[School], Optional[int]]: ...
 
 class StudentRepository(ABC):
     @abstractmethod
@@ -23,7 +30,26 @@ class StudentRepository(ABC):
     @abstractmethod
     async def delete(self, student_id: UUID) -> None: ...
     @abstractmethod
-    async def list(self, limit: int, offset: int, school_id: Optional[UUID] = None) -> tuple[List[Student], int]: ...
+    async def list(
+        self, limit: int, offset: int, school_id: Optional[UUID] = None,
+        after: Optional[PageCursor] = None, with_total: bool = False
+    ) -> tuple[List[Student], Optional[int]]: ...
+    @abstractmethod
+    async def get_school_ids(self, student_ids: List[UUID]) -> Dict[UUID, UUID]:
+        """Map each existing student id to its school id; unknown ids are left out."""
+        ...
+
+@dataclass(frozen=True)
+class AppliedPayment:
+    """Outcome of an atomically applied payment, enough to update projections and caches."""
+    payment_id: UUID
+    invoice_id: UUID
+    student_id: UUID
+    school_id: UUID
+    amount: Decimal
+    currency: Currency
+    status: InvoiceStatus
+    paid_at: datetime
 
 class InvoiceRepository(ABC):
     @abstractmethod
@@ -31,17 +57,75 @@ class InvoiceRepository(ABC):
     @abstractmethod
     async def get_by_id(self, invoice_id: UUID) -> Optional[Invoice]: ...
     @abstractmethod
-    async def delete(self, invoice_id: UUID) -> None: ...
+    async def delete_unpaid(self, invoice_id: UUID, issued_at: datetime) -> bool:
+        """Delete the invoice only if nothing has been paid on it; False when it was kept."""
+        ...
+    @abstractmethod
+    async def list(
+        self, limit: int, offset: int, student_id: Optional[UUID] = None,
+        after: Optional[PageCursor] = None, with_total: bool = False,
+        status: Optional[InvoiceStatus] = None
+    ) -> tuple[List[Invoice], Optional[int]]: ...
+    @abstractmethod
+    async def apply_payment(self, invoice_id: UUID, amount: Decimal) -> AppliedPayment:
+        """Insert a payment and update the invoice balance/status in one guarded statement.
+
+        Raises EntityNotFound for an unknown invoice and PaymentExceedsDueAmount when the
+        amount is larger than the balance due at the time the statement runs. Looked up
+        by id alone, so on a partitioned table every attached partition is probed.
+        """
+        ...
+    @abstractmethod
+    async def bulk_insert(self, invoices: List[Invoice]) -> None:
+        """Insert new invoices without payments in one round trip."""
+        ...
+    @abstractmethod
+    async def generate_for_school(
+        self, school_id: UUID, billing_period: str, amount: Decimal, currency: Currency,
+        due_date: date, student_ids: Optional[List[UUID]] = None
+    ) -> List[UUID]:
+        """Create one PENDING invoice per student of the school not yet billed for the period.
+
+        Returns the ids of the students that were billed.
+        """
+        ...
+    @abstractmethod
+    async def mark_overdue(self, as_of: date, limit: int) -> List[tuple[UUID, UUID]]:
+        """Flip up to `limit` PENDING/PARTIALLY_PAID invoices due before `as_of` to OVERDUE.
+
+        Rows locked by other transactions are skipped. Returns (student_id, school_id) per
+        updated invoice; fewer than `limit` rows means nothing is left to sweep.
+        """
+        ...
+    @abstractmethod
+    async def lock_open_invoices(self, invoice_ids: List[UUID]) -> Dict[UUID, Invoice]:
+        """Load and row-lock the open invoices among `invoice_ids`, keyed by id.
+
+        Payment history is not loaded; paid_amount carries the current balance. Looked up
+        by id alone, so on a partitioned table every attached partition is probed.
+        """
+        ...
     @abstractmethod
-    async def list(self, limit: int, offset: int, student_id: Optional[UUID] = None) -> tuple[List[Invoice], int]: ...
+    async def record_payments(self, invoices: List[Invoice], payments: List[Payment]) -> None:
+        """Persist new payments and the resulting invoice balances/statuses in bulk.
+
+        The invoices must have been locked with lock_open_invoices in the same transaction.
+        """
+        ...
 
 class UnitOfWork(ABC):
+    # Set once commit() has made the transaction durable, even if a later step of it failed
+    committed: bool = False
+
     @abstractmethod
     async def commit(self) -> None: ...
     @abstractmethod
     async def rollback(self) -> None: ...
 
-from src.application.dtos import AccountStatementDTO
+from src.application.dtos import (
+    AccountStatementDTO, StatementSummaryDTO, InvoiceDTO, AgingReportDTO, SchoolReceivablesDTO,
+    CollectionsSeriesDTO
+)
 
 class StatementRepository(ABC):
     @abstractmethod
@@ -49,3 +133,64 @@ class StatementRepository(ABC):
     
     @abstractmethod
     async def get_school_statement(self, school_id: UUID) -> Optional[AccountStatementDTO]: ...
+
+    @abstractmethod
+    async def get_student_period_statement(
+        self, student_id: UUID, start: date, end: date
+    ) -> Optional[AccountStatementDTO]:
+        """Invoices issued in [start, end] with opening/closing balances built from the nearest snapshot."""
+        ...
+
+    @abstractmethod
+    async def get_school_period_statement(
+        self, school_id: UUID, start: date, end: date
+    ) -> Optional[AccountStatementDTO]: ...
+
+    @abstractmethod
+    async def get_student_summary(self, student_id: UUID) -> Optional[StatementSummaryDTO]: ...
+
+    @abstractmethod
+    async def get_school_summary(self, school_id: UUID) -> Optional[StatementSummaryDTO]: ...
+
+    @abstractmethod
+    def stream_school_invoices(self, school_id: UUID, batch_size: int = 1000) -> AsyncIterator[List[InvoiceDTO]]:
+        """Yield the school's invoices in batches from a server-side cursor."""
+        ...
+
+    @abstractmethod
+    async def list_student_invoices(
+        self, student_id: UUID, limit: int, after: Optional[PageCursor] = None
+    ) -> List[InvoiceDTO]: ...
+
+    @abstractmethod
+    async def list_school_invoices(
+        self, school_id: UUID, limit: int, after: Optional[PageCursor] = None
+    ) -> List[InvoiceDTO]: ...
+
+    @abstractmethod
+    async def get_student_aging(self, student_id: UUID, as_of: date) -> Optional[AgingReportDTO]:
+        """Current open balances bucketed by days past due at `as_of`; None if the student does not exist.
+
+        Not a historical report: balances are today's, only the bucketing date moves.
+        """
+        ...
+
+    @abstractmethod
+    async def get_school_aging(self, school_id: UUID, as_of: date, by_student: bool = False) -> Optional[AgingReportDTO]:
+        """Like get_student_aging for a whole school, optionally with a per-student breakdown."""
+        ...
+
+    @abstractmethod
+    async def get_school_collections(self, school_id: UUID, start: date, end: date) -> Optional[CollectionsSeriesDTO]:
+        """Daily collections of [start, end] from the rollup table; None if the school does not exist."""
+        ...
+
+    @abstractmethod
+    async def list_school_receivables(
+        self, limit: int, offset: int = 0, after: Optional[PageCursor] = None
+    ) -> List[SchoolReceivablesDTO]:
+        """Page through per-school receivables, newest school first, as of the last refresh."""
+        ...
+
+    @abstractmethod
+    async def count_school_receivables(self) -> int: ...
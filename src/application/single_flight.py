@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# Result handed to waiters when the running call was cancelled rather than finished
+_ABANDONED = object()
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution within this process.
+
+    Callers arriving while a call is in flight await its outcome (result or exception)
+    instead of running their own. If that call is cancelled, one of the waiters takes over.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while key in self._calls:
+            # Shielded: a waiter being cancelled must not cancel the shared call
+            result = await asyncio.shield(self._calls[key])
+            if result is not _ABANDONED:
+                return result
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except Exception as e:
+            call.set_exception(e)
+            call.exception()  # retrieved: no "never retrieved" warning when nobody waited
+            raise
+        except BaseException:
+            call.set_result(_ABANDONED)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -2,21 +2,29 @@ from src.application.ports.repositories import (
     SchoolRepository, StudentRepository, InvoiceRepository, UnitOfWork
 )
 from src.application.ports.cache import CacheService
+from src.application.ports.projections import BalanceProjectionRepository
 from .school import SchoolCommandsMixin
 from .student import StudentCommandsMixin
 from .invoice import InvoiceCommandsMixin
+from .invoice_import import InvoiceImportCommandsMixin
+from .payment_import import PaymentImportCommandsMixin
 
-class CommandHandlers(SchoolCommandsMixin, StudentCommandsMixin, InvoiceCommandsMixin):
+class CommandHandlers(
+    SchoolCommandsMixin, StudentCommandsMixin, InvoiceCommandsMixin,
+    InvoiceImportCommandsMixin, PaymentImportCommandsMixin
+):
     def __init__(
         self,
         uow: UnitOfWork,
         school_repo: SchoolRepository,
         student_repo: StudentRepository,
         invoice_repo: InvoiceRepository,
+        projection_repo: BalanceProjectionRepository,
         cache: CacheService
     ):
         self.uow = uow
         self.school_repo = school_repo
         self.student_repo = student_repo
         self.invoice_repo = invoice_repo
+        self.projection_repo = projection_repo
         self.cache = cache
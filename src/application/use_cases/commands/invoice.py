@@ -1,10 +1,17 @@
+from datetime import date
+from typing import List, Union
 from uuid import UUID
 from src.application.dtos import (
-    CreateInvoiceCommand, ProcessPaymentCommand, InvoiceDTO
+    CreateInvoiceCommand, ProcessPaymentCommand, InvoiceDTO,
+    GenerateSchoolInvoicesCommand, GeneratedInvoicesDTO, OverdueSweepResultDTO
 )
+from src.application.ports.projections import BalanceDelta
+from src.application.ports.repositories import AppliedPayment
 from src.domain.entities import Invoice
 from src.domain.value_objects import Money
-from src.domain.exceptions import EntityNotFound
+from src.domain.exceptions import EntityNotFound, BusinessRuleViolation, DomainError, OperationNotAllowed
+
+OVERDUE_SWEEP_CHUNK_SIZE = 1000
 
 class InvoiceCommandsMixin:
     async def create_invoice(self, cmd: CreateInvoiceCommand) -> InvoiceDTO:
@@ -21,11 +28,14 @@ class InvoiceCommandsMixin:
         )
         
         await self.invoice_repo.save(invoice)
+        await self.projection_repo.apply([BalanceDelta(
+            student_id=invoice.student_id, school_id=invoice.school_id, currency=invoice.amount.currency,
+            invoice_count=1, invoiced=invoice.amount.amount
+        )])
         await self.uow.commit()
         
         # Invalidate Student and School cache
-        await self.cache.increment_version(f"student:{student.id}")
-        await self.cache.increment_version(f"school:{student.school_id}")
+        await self.cache.increment_versions([f"student:{student.id}", f"school:{student.school_id}"])
         
         return InvoiceDTO(
             id=invoice.id,
@@ -38,32 +48,133 @@ class InvoiceCommandsMixin:
             due_date=invoice.due_date
         )
 
-    async def process_payment(self, cmd: ProcessPaymentCommand) -> UUID:
-        invoice = await self.invoice_repo.get_by_id(cmd.invoice_id)
-        if not invoice:
-            raise EntityNotFound(f"Invoice {cmd.invoice_id} not found")
+    async def generate_school_invoices(self, cmd: GenerateSchoolInvoicesCommand) -> GeneratedInvoicesDTO:
+        school = await self.school_repo.get_by_id(cmd.school_id)
+        if not school:
+            raise EntityNotFound(f"School {cmd.school_id} not found")
         
-        # Currency check typically happens here or inside domain if we pass Money object
-        money = Money(amount=cmd.amount, currency=invoice.amount.currency)
-        payment = invoice.register_payment(money)
+        # One INSERT ... SELECT from students; no per-student lookups
+        billed = await self.invoice_repo.generate_for_school(
+            school_id=cmd.school_id, billing_period=cmd.billing_period, amount=cmd.amount,
+            currency=cmd.currency, due_date=cmd.due_date, student_ids=cmd.student_ids
+        )
+        if billed:
+            await self.projection_repo.apply([
+                BalanceDelta(
+                    student_id=student_id, school_id=cmd.school_id, currency=cmd.currency,
+                    invoice_count=1, invoiced=cmd.amount
+                )
+                for student_id in billed
+            ])
+        await self.uow.commit()
+        
+        if billed:
+            await self.cache.increment_versions(
+                [f"school:{cmd.school_id}"] + [f"student:{student_id}" for student_id in billed]
+            )
         
-        # Invoice Repo save usually implies saving aggregate including payments
-        await self.invoice_repo.save(invoice) 
+        return GeneratedInvoicesDTO(school_id=cmd.school_id, billing_period=cmd.billing_period, created=len(billed))
+
+    async def sweep_overdue(self, as_of: date, chunk_size: int = OVERDUE_SWEEP_CHUNK_SIZE) -> OverdueSweepResultDTO:
+        """Mark PENDING/PARTIALLY_PAID invoices due before `as_of` as OVERDUE.
+
+        Works in short committed chunks so row locks are never held for the whole sweep.
+        """
+        marked = 0
+        prefixes: dict = {}
+        try:
+            while True:
+                owners = await self.invoice_repo.mark_overdue(as_of, chunk_size)
+                await self.uow.commit()
+                marked += len(owners)
+                for student_id, school_id in owners:
+                    prefixes[f"student:{student_id}"] = None
+                    prefixes[f"school:{school_id}"] = None
+                if len(owners) < chunk_size:
+                    break
+        finally:
+            # Only students and schools that actually had an invoice flipped
+            if prefixes:
+                await self.cache.increment_versions(list(prefixes))
+        
+        return OverdueSweepResultDTO(as_of=as_of, marked=marked)
+
+    async def process_payment(self, cmd: ProcessPaymentCommand) -> UUID:
+        applied = await self._apply_payment(cmd)
+        await self.projection_repo.apply([_paid_delta(applied)])
         await self.uow.commit()
         
         # Invalidate Student and School cache
-        await self.cache.increment_version(f"student:{invoice.student_id}")
-        await self.cache.increment_version(f"school:{invoice.school_id}")
+        await self.cache.increment_versions([f"student:{applied.student_id}", f"school:{applied.school_id}"])
+        
+        return applied.payment_id
+
+    async def process_payment_batch(self, cmds: List[ProcessPaymentCommand]) -> List[Union[UUID, DomainError]]:
+        """Apply several payments in one transaction; results line up with `cmds`.
+
+        Business rule failures are returned in place of the payment id and do not affect the
+        rest of the batch. Any other error propagates and the whole transaction is discarded.
+        """
+        results: List[Union[UUID, DomainError]] = [None] * len(cmds)
+        applied_payments: List[AppliedPayment] = []
+        
+        # Lock invoices in a stable order so concurrent batches cannot deadlock
+        for index in sorted(range(len(cmds)), key=lambda i: str(cmds[i].invoice_id)):
+            try:
+                applied = await self._apply_payment(cmds[index])
+            except DomainError as e:
+                results[index] = e
+                continue
+            applied_payments.append(applied)
+            results[index] = applied.payment_id
+        
+        if not applied_payments:
+            return results
+        
+        await self.projection_repo.apply([_paid_delta(applied) for applied in applied_payments])
+        await self.uow.commit()
+        
+        # One invalidation per touched student/school rather than per payment
+        prefixes = dict.fromkeys(
+            prefix
+            for applied in applied_payments
+            for prefix in (f"student:{applied.student_id}", f"school:{applied.school_id}")
+        )
+        await self.cache.increment_versions(list(prefixes))
         
-        return payment.id
+        return results
+
+    async def _apply_payment(self, cmd: ProcessPaymentCommand) -> AppliedPayment:
+        if cmd.amount <= 0:
+            raise BusinessRuleViolation("Payment amount must be positive")
+        
+        # Balance check, payment insert and status change happen in one guarded statement,
+        # so the invoice and its payment history are never loaded on the hot path
+        return await self.invoice_repo.apply_payment(cmd.invoice_id, cmd.amount)
 
     async def delete_invoice(self, invoice_id: UUID) -> None:
         invoice = await self.invoice_repo.get_by_id(invoice_id)
         if not invoice:
             raise EntityNotFound(f"Invoice {invoice_id} not found")
-            
-        await self.invoice_repo.delete(invoice_id)
+        # Checked again atomically by the delete, in case a payment lands in between
+        if invoice.payments or invoice.paid_amount > 0 or not await self.invoice_repo.delete_unpaid(
+            invoice_id, invoice.issued_at
+        ):
+            raise OperationNotAllowed(f"Invoice {invoice_id} has payments and cannot be deleted")
+
+        delta = BalanceDelta(
+            student_id=invoice.student_id, school_id=invoice.school_id, currency=invoice.amount.currency,
+            invoice_count=-1, invoiced=-invoice.amount.amount, paid=-invoice.paid_amount
+        )
+        await self.projection_repo.apply([delta])
+        # Balance snapshots taken since the invoice was issued still count it
+        await self.projection_repo.adjust_snapshots(delta, invoice.issued_at)
         await self.uow.commit()
         
-        await self.cache.increment_version(f"student:{invoice.student_id}")
-        await self.cache.increment_version(f"school:{invoice.school_id}")
+        await self.cache.increment_versions([f"student:{invoice.student_id}", f"school:{invoice.school_id}"])
+
+def _paid_delta(applied: AppliedPayment) -> BalanceDelta:
+    return BalanceDelta(
+        student_id=applied.student_id, school_id=applied.school_id, currency=applied.currency,
+        paid=applied.amount, paid_on=applied.paid_at.date()
+    )
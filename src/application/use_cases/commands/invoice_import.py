@@ -0,0 +1,79 @@
+from typing import AsyncIterator, List, Union
+from src.application.dtos import InvoiceImportRow, ImportRowErrorDTO, InvoiceImportReportDTO
+from src.application.ports.projections import BalanceDelta
+from src.domain.entities import Invoice
+from src.domain.value_objects import Money
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+class InvoiceImportCommandsMixin:
+    async def import_invoices(
+        self, rows: AsyncIterator[Union[InvoiceImportRow, ImportRowErrorDTO]], batch_size: int = IMPORT_BATCH_SIZE
+    ) -> InvoiceImportReportDTO:
+        """Bulk-create invoices from an already parsed stream.
+
+        Each batch is validated with one student lookup, inserted in one round trip and
+        committed on its own, so a bad row never rolls back the rows around it.
+        """
+        report = InvoiceImportReportDTO()
+        prefixes: dict = {}
+        batch: List[InvoiceImportRow] = []
+
+        try:
+            async for row in rows:
+                if isinstance(row, ImportRowErrorDTO):
+                    self._reject_import_row(report, row)
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    await self._import_invoice_batch(batch, report, prefixes)
+                    batch = []
+            if batch:
+                await self._import_invoice_batch(batch, report, prefixes)
+        finally:
+            # Committed batches stay committed, so invalidate them even if a later one failed
+            await self.cache.increment_versions(list(prefixes))
+
+        return report
+
+    async def _import_invoice_batch(
+        self, batch: List[InvoiceImportRow], report: InvoiceImportReportDTO, prefixes: dict
+    ) -> None:
+        school_ids = await self.student_repo.get_school_ids(list({row.student_id for row in batch}))
+
+        invoices: List[Invoice] = []
+        for row in batch:
+            school_id = school_ids.get(row.student_id)
+            if school_id is None:
+                self._reject_import_row(report, ImportRowErrorDTO(line=row.line, error=f"Student {row.student_id} not found"))
+                continue
+            invoices.append(Invoice.create(
+                student_id=row.student_id,
+                school_id=school_id,
+                amount=Money(amount=row.amount, currency=row.currency),
+                due_date=row.due_date
+            ))
+        if not invoices:
+            return
+
+        await self.invoice_repo.bulk_insert(invoices)
+        await self.projection_repo.apply([
+            BalanceDelta(
+                student_id=invoice.student_id, school_id=invoice.school_id, currency=invoice.amount.currency,
+                invoice_count=1, invoiced=invoice.amount.amount
+            )
+            for invoice in invoices
+        ])
+        await self.uow.commit()
+
+        report.imported += len(invoices)
+        for invoice in invoices:
+            prefixes[f"student:{invoice.student_id}"] = None
+            prefixes[f"school:{invoice.school_id}"] = None
+
+    @staticmethod
+    def _reject_import_row(report: InvoiceImportReportDTO, error: ImportRowErrorDTO) -> None:
+        report.rejected += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(error)
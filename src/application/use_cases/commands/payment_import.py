@@ -0,0 +1,91 @@
+from typing import AsyncIterator, Dict, List, Union
+from uuid import UUID
+from src.application.dtos import PaymentImportRow, ImportRowErrorDTO, PaymentImportReportDTO
+from src.application.ports.projections import BalanceDelta
+from src.domain.entities import Invoice, Payment
+from src.domain.exceptions import BusinessRuleViolation
+from src.domain.value_objects import Money
+from .invoice_import import IMPORT_BATCH_SIZE, MAX_REPORTED_ERRORS
+
+class PaymentImportCommandsMixin:
+    async def import_payments(
+        self, rows: AsyncIterator[Union[PaymentImportRow, ImportRowErrorDTO]], batch_size: int = IMPORT_BATCH_SIZE
+    ) -> PaymentImportReportDTO:
+        """Reconcile a bank file against open invoices.
+
+        Each batch locks its open invoices with one query, matches rows through an id-keyed
+        index, applies the domain payment rules in memory and persists in bulk.
+        """
+        report = PaymentImportReportDTO()
+        prefixes: dict = {}
+        batch: List[PaymentImportRow] = []
+
+        try:
+            async for row in rows:
+                if isinstance(row, ImportRowErrorDTO):
+                    report.rejected += 1
+                    _report_row(report.errors, row)
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    await self._import_payment_batch(batch, report, prefixes)
+                    batch = []
+            if batch:
+                await self._import_payment_batch(batch, report, prefixes)
+        finally:
+            await self.cache.increment_versions(list(prefixes))
+
+        return report
+
+    async def _import_payment_batch(
+        self, batch: List[PaymentImportRow], report: PaymentImportReportDTO, prefixes: dict
+    ) -> None:
+        index: Dict[UUID, Invoice] = await self.invoice_repo.lock_open_invoices(
+            list({row.invoice_id for row in batch})
+        )
+
+        touched: Dict[UUID, Invoice] = {}
+        payments: List[Payment] = []
+        for row in batch:
+            invoice = index.get(row.invoice_id)
+            if invoice is None:
+                report.unmatched += 1
+                _report_row(report.unmatched_rows, _row_error(row, f"No open invoice {row.invoice_id}"))
+                continue
+            try:
+                # Rows for the same invoice see each other's effect through the shared entity
+                payments.append(invoice.register_payment(Money(amount=row.amount, currency=row.currency)))
+            except (BusinessRuleViolation, ValueError) as e:
+                report.rejected += 1
+                _report_row(report.errors, _row_error(row, str(e)))
+                continue
+            touched[invoice.id] = invoice
+
+        if not payments:
+            # Nothing to write, but the FOR UPDATE locks must not outlive the batch
+            await self.uow.rollback()
+            return
+
+        await self.invoice_repo.record_payments(list(touched.values()), payments)
+        await self.projection_repo.apply([
+            BalanceDelta(
+                student_id=index[p.invoice_id].student_id, school_id=index[p.invoice_id].school_id,
+                currency=p.amount.currency, paid=p.amount.amount, paid_on=p.paid_at.date()
+            )
+            for p in payments
+        ])
+        await self.uow.commit()
+
+        report.applied += len(payments)
+        for invoice in touched.values():
+            prefixes[f"student:{invoice.student_id}"] = None
+            prefixes[f"school:{invoice.school_id}"] = None
+
+def _row_error(row: PaymentImportRow, error: str) -> ImportRowErrorDTO:
+    if row.reference:
+        error = f"{error} (reference {row.reference})"
+    return ImportRowErrorDTO(line=row.line, error=error)
+
+def _report_row(rows: List[ImportRowErrorDTO], error: ImportRowErrorDTO) -> None:
+    if len(rows) < MAX_REPORTED_ERRORS:
+        rows.append(error)
@@ -28,5 +28,6 @@ class SchoolCommandsMixin:
              raise EntityNotFound(f"School {school_id} not found")
         
         await self.school_repo.delete(school_id)
+        await self.projection_repo.remove_school(school_id)
         await self.uow.commit()
         await self.cache.increment_version(f"school:{school_id}")
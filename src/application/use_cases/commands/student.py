@@ -42,6 +42,7 @@ class StudentCommandsMixin:
             raise EntityNotFound(f"Student {student_id} not found")
         
         await self.student_repo.delete(student_id)
+        await self.projection_repo.remove_student(student_id)
         await self.uow.commit()
         # Invalidate
         await self.cache.increment_version(f"student:{student_id}")
@@ -1,3 +1,4 @@
+from typing import Any, Awaitable, Callable, Optional
 from src.application.ports.repositories import (
     StatementRepository, SchoolRepository, StudentRepository, InvoiceRepository
 )
@@ -5,18 +6,34 @@ from src.application.ports.cache import CacheService
 from .school import SchoolQueriesMixin
 from .student import StudentQueriesMixin
 from .invoice import InvoiceQueriesMixin
+from .statement import StatementQueriesMixin
+from .aging import AgingQueriesMixin
+from .collections import CollectionsQueriesMixin
 
-class QueryHandlers(SchoolQueriesMixin, StudentQueriesMixin, InvoiceQueriesMixin):
+class QueryHandlers(
+    SchoolQueriesMixin, StudentQueriesMixin, InvoiceQueriesMixin, StatementQueriesMixin, AgingQueriesMixin,
+    CollectionsQueriesMixin
+):
     def __init__(
         self,
         statement_repo: StatementRepository,
         school_repo: SchoolRepository,
         student_repo: StudentRepository,
         invoice_repo: InvoiceRepository,
-        cache: CacheService
+        cache: CacheService,
+        stale_seconds: int = 0,
+        revalidate: Optional[Callable[[Callable[[Any], Awaitable[None]]], None]] = None,
+        on_primary: Optional[Callable[[Callable[[Any], Awaitable[Any]]], Awaitable[Any]]] = None
     ):
         self.statement_repo = statement_repo
         self.school_repo = school_repo
         self.student_repo = student_repo
         self.invoice_repo = invoice_repo
         self.cache = cache
+        # Stale-while-revalidate window for statements; `revalidate` runs the given work after
+        # the response, with handlers of its own (see StatementQueriesMixin)
+        self.stale_seconds = stale_seconds
+        self.revalidate = revalidate
+        # Set when these handlers read a replica: runs the given work with handlers on the
+        # primary and returns its result; cache entries are only built there
+        self.on_primary = on_primary
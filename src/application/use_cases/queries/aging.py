@@ -0,0 +1,47 @@
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+from src.application.dtos import AgingReportDTO
+from src.domain.exceptions import EntityNotFound, InvalidDateRange
+
+# Buckets only move when a payment/invoice lands (version bump) or the day changes (as_of in the key)
+AGING_TTL_SECONDS = 300
+
+class AgingQueriesMixin:
+    @staticmethod
+    def _resolve_as_of(as_of: Optional[date]) -> date:
+        """Default to today (UTC) and refuse past dates.
+
+        Buckets age today's open balances: invoices paid since a past date are no longer
+        open, so a past as_of would look historical without being so. Future dates are fine.
+        """
+        today = datetime.utcnow().date()
+        if as_of and as_of < today:
+            raise InvalidDateRange(f"as_of ({as_of}) is in the past; aging covers current balances only")
+        return as_of or today
+
+    async def get_student_aging(
+        self, student_id: UUID, as_of: Optional[date] = None, fresh: bool = False
+    ) -> AgingReportDTO:
+        as_of = self._resolve_as_of(as_of)
+        report = await self._cached_report(
+            f"student:{student_id}", "aging", f":{as_of.isoformat()}", AgingReportDTO,
+            lambda queries: queries.statement_repo.get_student_aging(student_id, as_of), AGING_TTL_SECONDS, fresh
+        )
+        if not report:
+            raise EntityNotFound(f"Student {student_id} not found")
+        return report
+
+    async def get_school_aging(
+        self, school_id: UUID, as_of: Optional[date] = None, by_student: bool = False, fresh: bool = False
+    ) -> AgingReportDTO:
+        as_of = self._resolve_as_of(as_of)
+        suffix = f":{as_of.isoformat()}" + (":students" if by_student else "")
+        report = await self._cached_report(
+            f"school:{school_id}", "aging", suffix, AgingReportDTO,
+            lambda queries: queries.statement_repo.get_school_aging(school_id, as_of, by_student),
+            AGING_TTL_SECONDS, fresh
+        )
+        if not report:
+            raise EntityNotFound(f"School {school_id} not found")
+        return report
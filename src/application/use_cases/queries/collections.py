@@ -0,0 +1,23 @@
+from datetime import date
+from typing import Optional
+from uuid import UUID
+from src.application.dtos import CollectionsSeriesDTO
+from src.domain.exceptions import EntityNotFound
+
+# Every payment bumps the school version, so a cached series is never behind the rollup
+COLLECTIONS_TTL_SECONDS = 300
+DEFAULT_COLLECTIONS_DAYS = 30
+
+class CollectionsQueriesMixin:
+    async def get_school_collections(
+        self, school_id: UUID, start: Optional[date] = None, end: Optional[date] = None, fresh: bool = False
+    ) -> CollectionsSeriesDTO:
+        start, end = self._resolve_range(start, end, DEFAULT_COLLECTIONS_DAYS)
+        series = await self._cached_report(
+            f"school:{school_id}", "collections", f":{start.isoformat()}:{end.isoformat()}", CollectionsSeriesDTO,
+            lambda queries: queries.statement_repo.get_school_collections(school_id, start, end),
+            COLLECTIONS_TTL_SECONDS, fresh
+        )
+        if not series:
+            raise EntityNotFound(f"School {school_id} not found")
+        return series
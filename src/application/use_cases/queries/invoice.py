@@ -3,10 +3,17 @@ from uuid import UUID
 from src.application.dtos import (
     PaginationParams, PaginatedResponse, InvoiceDTO
 )
+from src.application.pagination import decode_cursor, next_cursor
+from src.domain.enums import InvoiceStatus
 
 class InvoiceQueriesMixin:
-    async def list_invoices(self, params: PaginationParams, student_id: Optional[UUID] = None) -> PaginatedResponse[InvoiceDTO]:
-        items, total = await self.invoice_repo.list(limit=params.limit, offset=params.offset, student_id=student_id)
+    async def list_invoices(
+        self, params: PaginationParams, student_id: Optional[UUID] = None, status: Optional[InvoiceStatus] = None
+    ) -> PaginatedResponse[InvoiceDTO]:
+        items, total = await self.invoice_repo.list(
+            limit=params.limit, offset=params.offset, student_id=student_id,
+            after=decode_cursor(params.after), with_total=params.include_total, status=status
+        )
         dtos = [
             InvoiceDTO(
                 id=i.id,
@@ -19,4 +26,7 @@ class InvoiceQueriesMixin:
                 due_date=i.due_date
             ) for i in items
         ]
-        return PaginatedResponse(items=dtos, total=total, limit=params.limit, offset=params.offset)
+        return PaginatedResponse(
+            items=dtos, total=total, limit=params.limit, offset=params.offset,
+            next_cursor=next_cursor(items, params.limit, lambda i: i.issued_at)
+        )
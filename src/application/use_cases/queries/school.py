@@ -1,32 +1,111 @@
-from typing import Optional
+from typing import Optional, AsyncIterator
 from uuid import UUID
-import json
+from decimal import Decimal
+from datetime import date, datetime
 from src.application.dtos import (
-    PaginationParams, PaginatedResponse, SchoolDTO, AccountStatementDTO
+    PaginationParams, PaginatedResponse, SchoolDTO, AccountStatementDTO, StatementSummaryDTO,
+    StatementStreamTrailerDTO, CurrencyTotalDTO, SchoolReceivablesDTO
 )
+from src.application.pagination import decode_cursor, next_cursor
 from src.domain.exceptions import EntityNotFound
+from .statement import DEFAULT_PERIOD_DAYS
 
 class SchoolQueriesMixin:
     async def list_schools(self, params: PaginationParams) -> PaginatedResponse[SchoolDTO]:
-        items, total = await self.school_repo.list(limit=params.limit, offset=params.offset)
+        items, total = await self.school_repo.list(
+            limit=params.limit, offset=params.offset,
+            after=decode_cursor(params.after), with_total=params.include_total
+        )
         dtos = [SchoolDTO(id=i.id, name=i.name, created_at=i.created_at) for i in items]
-        return PaginatedResponse(items=dtos, total=total, limit=params.limit, offset=params.offset)
+        return PaginatedResponse(
+            items=dtos, total=total, limit=params.limit, offset=params.offset,
+            next_cursor=next_cursor(items, params.limit, lambda i: i.created_at)
+        )
 
-    async def get_school_account_statement(self, school_id: UUID) -> AccountStatementDTO:
-        version = await self.cache.get_version(f"school:{school_id}")
-        cache_key = f"school:{school_id}:statement:v{version}"
+    async def list_school_receivables(self, params: PaginationParams) -> PaginatedResponse[SchoolReceivablesDTO]:
+        # Read straight from the materialized view: as fresh as its last refresh, no cache needed
+        after = decode_cursor(params.after)
+        items = await self.statement_repo.list_school_receivables(
+            limit=params.limit, offset=params.offset, after=after
+        )
+        total = await self.statement_repo.count_school_receivables() if params.include_total else None
+        return PaginatedResponse(
+            items=items, total=total, limit=params.limit, offset=params.offset,
+            next_cursor=next_cursor(items, params.limit, lambda i: i.created_at)
+        )
+
+    async def get_school_account_statement(
+        self, school_id: UUID, page: Optional[PaginationParams] = None, fresh: bool = False
+    ) -> AccountStatementDTO:
+        if page:
+            build = lambda queries: queries._build_school_statement_page(school_id, page)
+        else:
+            build = lambda queries: queries.statement_repo.get_school_statement(school_id)
         
-        cached_data = await self.cache.get(cache_key)
-        if cached_data:
-            try:
-                data_dict = json.loads(cached_data)
-                return AccountStatementDTO(**data_dict)
-            except Exception:
-                pass
-
-        statement = await self.statement_repo.get_school_statement(school_id)
+        statement = await self._cached_statement(f"school:{school_id}", page, build, fresh)
         if not statement:
-             raise EntityNotFound(f"School {school_id} not found or no statement available")
+            raise EntityNotFound(f"School {school_id} not found or no statement available")
+        return statement
 
-        await self.cache.set(cache_key, statement.model_dump_json(), ttl_seconds=60)
+    async def get_school_period_statement(
+        self, school_id: UUID, start: Optional[date] = None, end: Optional[date] = None, fresh: bool = False
+    ) -> AccountStatementDTO:
+        start, end = self._resolve_range(start, end, DEFAULT_PERIOD_DAYS)
+        statement = await self._cached_period_statement(
+            f"school:{school_id}", start, end,
+            lambda queries: queries.statement_repo.get_school_period_statement(school_id, start, end), fresh
+        )
+        if not statement:
+            raise EntityNotFound(f"School {school_id} not found")
         return statement
+
+    async def _build_school_statement_page(self, school_id: UUID, page: PaginationParams) -> Optional[AccountStatementDTO]:
+        summary = await self.statement_repo.get_school_summary(school_id)
+        if not summary:
+            return None
+        invoices = await self.statement_repo.list_school_invoices(
+            school_id, limit=page.limit, after=decode_cursor(page.after)
+        )
+        return self._page_statement(summary, invoices, page)
+
+    async def get_school_statement_summary(self, school_id: UUID) -> StatementSummaryDTO:
+        # Served from the projection tables; a PK lookup regardless of history size
+        summary = await self.statement_repo.get_school_summary(school_id)
+        if not summary:
+            raise EntityNotFound(f"School {school_id} not found")
+        return summary
+
+    async def stream_school_account_statement(self, school_id: UUID) -> AsyncIterator[str]:
+        """Check the school exists, then return an NDJSON line iterator (invoices, then a summary trailer)."""
+        school = await self.school_repo.get_by_id(school_id)
+        if not school:
+            raise EntityNotFound(f"School {school_id} not found")
+        return self._school_statement_ndjson(school_id)
+
+    async def _school_statement_ndjson(self, school_id: UUID) -> AsyncIterator[str]:
+        # Running totals per currency keep memory flat; no cache, the payload is never materialized
+        totals: dict = {}
+        async for batch in self.statement_repo.stream_school_invoices(school_id):
+            lines = []
+            for invoice in batch:
+                acc = totals.setdefault(invoice.currency, [0, Decimal(0), Decimal(0)])
+                acc[0] += 1
+                acc[1] += invoice.amount_total
+                acc[2] += invoice.amount_paid
+                lines.append(invoice.model_dump_json())
+            if lines:
+                yield "\n".join(lines) + "\n"
+
+        currency_totals = [
+            CurrencyTotalDTO(
+                currency=currency, invoice_count=count, total_invoiced=invoiced,
+                total_paid=paid, total_due=invoiced - paid
+            ) for currency, (count, invoiced, paid) in totals.items()
+        ]
+        trailer = StatementStreamTrailerDTO(
+            entity_id=school_id,
+            generated_at=datetime.utcnow(),
+            invoice_count=sum(t.invoice_count for t in currency_totals),
+            totals=currency_totals
+        )
+        yield trailer.model_dump_json() + "\n"
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from typing import Any, Optional, Awaitable, Callable, Dict, List, Tuple, Type, TypeVar
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pydantic import BaseModel
+from src.application.dtos import (
+    PaginationParams, AccountStatementDTO, StatementSummaryDTO, InvoiceDTO
+)
+from src.application.pagination import next_cursor
+from src.application.ports.cache import versioned_key
+from src.application.single_flight import SingleFlight
+from src.domain.exceptions import InvalidDateRange
+
+STATEMENT_TTL_SECONDS = 60
+# Upper bound on from/to ranges, so a ranged read stays a bounded index scan
+MAX_RANGE_DAYS = 366
+# Period covered by a ranged statement given only `to`
+DEFAULT_PERIOD_DAYS = 30
+# Cross-instance rebuild lock: held at most this long, so a crashed builder can't wedge a key
+REBUILD_LOCK_MS = 5000
+# How long an instance that lost the lock polls the cache for the winner's result before building itself
+REBUILD_WAIT_SECONDS = 1.0
+REBUILD_POLL_SECONDS = 0.05
+
+ReportT = TypeVar("ReportT", bound=BaseModel)
+# Builds a report with the given query handlers: the request's, or ones on the primary
+ReportBuild = Callable[[Any], Awaitable[Optional[ReportT]]]
+StatementBuild = Callable[[Any], Awaitable[Optional[AccountStatementDTO]]]
+
+# Statement keys with a background rebuild pending in this process, until when
+_revalidating: Dict[str, float] = {}
+
+def last_report_key(key_prefix: str, report: str, suffix: str = "") -> str:
+    """Latest report built for `key_prefix`, whatever its version: what stale reads are served from."""
+    return f"{key_prefix}:{report}:last{suffix}"
+
+class StatementQueriesMixin:
+    """Versioned cache-aside shared by the student and school statement queries.
+
+    With `stale_seconds` set (and a `revalidate` runner), statements are served
+    stale-while-revalidate: every rebuilt statement is also kept under
+    `{key_prefix}:statement:last{suffix}` for `stale_seconds`, and a miss on the current
+    version returns that copy, flagged `stale`, while the current one is rebuilt in the
+    background.
+
+    Callers passing `fresh=True` (read-your-writes) bypass the cache altogether: an entry
+    for the current version may have been built by a reader that did not see their write.
+    Handlers reading a replica (`on_primary` set) build cache entries through handlers
+    on the primary, so a lagging replica never fills the versioned cache.
+    """
+
+    # Per process, not per handler instance: concurrent requests share their rebuilds
+    _rebuilds = SingleFlight()
+
+    async def _cached_statement(
+        self, key_prefix: str, page: Optional[PaginationParams], build: StatementBuild, fresh: bool = False
+    ) -> Optional[AccountStatementDTO]:
+        # Each page lives under its own key, invalidated by the same version bump
+        suffix = f":l{page.limit}:{page.after or 'first'}" if page else ""
+        return await self._cached_statement_report(key_prefix, suffix, build, fresh)
+
+    async def _cached_period_statement(
+        self, key_prefix: str, start: date, end: date, build: StatementBuild, fresh: bool = False
+    ) -> Optional[AccountStatementDTO]:
+        suffix = f":{start.isoformat()}:{end.isoformat()}"
+        return await self._cached_statement_report(key_prefix, suffix, build, fresh)
+
+    async def _cached_statement_report(
+        self, key_prefix: str, suffix: str, build: StatementBuild, fresh: bool
+    ) -> Optional[AccountStatementDTO]:
+        if fresh:
+            return await build(self)
+        stale_seconds = self.stale_seconds if self.revalidate else 0
+        version, cached = await self.cache.get_versioned_model(key_prefix, "statement", suffix, AccountStatementDTO)
+        if cached:
+            return cached
+
+        if stale_seconds:
+            last = await self.cache.get_model(last_report_key(key_prefix, "statement", suffix), AccountStatementDTO)
+            if last:
+                self._revalidate_statement(key_prefix, suffix, version, build)
+                return last.model_copy(update={"stale": True})
+
+        return await self._rebuild_once(
+            key_prefix, "statement", suffix, version, AccountStatementDTO,
+            build, STATEMENT_TTL_SECONDS, last_ttl_seconds=stale_seconds
+        )
+
+    def _revalidate_statement(self, key_prefix: str, suffix: str, version: int, build: StatementBuild) -> None:
+        cache_key = versioned_key(key_prefix, "statement", version, suffix)
+        now = time.monotonic()
+        if _revalidating.get(cache_key, 0) > now:
+            return
+        # Expires on its own, in case the runner fails before the work even starts
+        _revalidating[cache_key] = now + REBUILD_LOCK_MS / 1000
+
+        async def work(queries: "StatementQueriesMixin") -> None:
+            try:
+                await queries._rebuild_once(
+                    key_prefix, "statement", suffix, version, AccountStatementDTO,
+                    build, STATEMENT_TTL_SECONDS, last_ttl_seconds=self.stale_seconds
+                )
+            finally:
+                _revalidating.pop(cache_key, None)
+
+        self.revalidate(work)
+
+    async def _cached_report(
+        self, key_prefix: str, report: str, suffix: str, model: Type[ReportT],
+        build: ReportBuild, ttl_seconds: int, fresh: bool = False
+    ) -> Optional[ReportT]:
+        """Cache-aside under `{key_prefix}:{report}:v{version}{suffix}`, invalidated by version bumps."""
+        if fresh:
+            return await build(self)
+        version, cached = await self.cache.get_versioned_model(key_prefix, report, suffix, model)
+        if cached:
+            return cached
+        return await self._rebuild_once(key_prefix, report, suffix, version, model, build, ttl_seconds)
+
+    async def _rebuild_once(
+        self, key_prefix: str, report: str, suffix: str, version: int, model: Type[ReportT],
+        build: ReportBuild, ttl_seconds: int, last_ttl_seconds: int = 0
+    ) -> Optional[ReportT]:
+        if self.on_primary:
+            # The version may already count a write the replica has not replayed
+            return await self.on_primary(lambda queries: queries._rebuild_once(
+                key_prefix, report, suffix, version, model, build, ttl_seconds, last_ttl_seconds
+            ))
+        # Misses right after a bump arrive together: one build per key, not one per request
+        cache_key = versioned_key(key_prefix, report, version, suffix)
+        return await self._rebuilds.do(
+            cache_key,
+            lambda: self._rebuild(
+                key_prefix, report, suffix, version, model, lambda: build(self), ttl_seconds, last_ttl_seconds
+            )
+        )
+
+    async def _rebuild(
+        self, key_prefix: str, report: str, suffix: str, version: int, model: Type[ReportT],
+        build: Callable[[], Awaitable[Optional[ReportT]]], ttl_seconds: int, last_ttl_seconds: int
+    ) -> Optional[ReportT]:
+        cache_key = versioned_key(key_prefix, report, version, suffix)
+        lock_key = f"{cache_key}:rebuild"
+        token = await self.cache.acquire_lock(lock_key, REBUILD_LOCK_MS)
+        if token is None:
+            # Another instance is building it; its result usually lands well within the wait
+            cached = await self._wait_for_rebuild(cache_key, model)
+            if cached:
+                return cached
+        try:
+            result = await build()
+            if result:
+                await self.cache.set_versioned_model(key_prefix, report, suffix, version, result, ttl_seconds=ttl_seconds)
+                if last_ttl_seconds:
+                    await self.cache.set_model(last_report_key(key_prefix, report, suffix), result, ttl_seconds=last_ttl_seconds)
+            return result
+        finally:
+            if token:
+                await self.cache.release_lock(lock_key, token)
+
+    async def _wait_for_rebuild(self, cache_key: str, model: Type[ReportT]) -> Optional[ReportT]:
+        deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(REBUILD_POLL_SECONDS)
+            cached = await self.cache.get_model(cache_key, model)
+            if cached:
+                return cached
+        return None
+
+    @staticmethod
+    def _resolve_range(start: Optional[date], end: Optional[date], default_days: int) -> Tuple[date, date]:
+        """Fill in a missing from/to (`to` defaults to today) and reject reversed or oversized ranges."""
+        end = end or date.today()
+        start = start or end - timedelta(days=default_days - 1)
+        if start > end:
+            raise InvalidDateRange(f"from ({start}) is after to ({end})")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise InvalidDateRange(f"Date range is limited to {MAX_RANGE_DAYS} days")
+        return start, end
+
+    @staticmethod
+    def _page_statement(
+        summary: StatementSummaryDTO, invoices: List[InvoiceDTO], page: PaginationParams
+    ) -> AccountStatementDTO:
+        # Totals come from the summary aggregate, never from summing the page
+        totals = summary.totals
+        single = totals[0] if len(totals) == 1 else None
+        if single:
+            currency = single.currency.value
+        else:
+            currency = "MIXED" if totals else None
+        return AccountStatementDTO(
+            entity_id=summary.entity_id,
+            generated_at=datetime.utcnow(),
+            invoices=invoices,
+            total_due=single.total_due if single else Decimal(0),
+            currency=currency,
+            invoice_count=summary.invoice_count,
+            totals=totals,
+            next_cursor=next_cursor(invoices, page.limit, lambda i: i.issued_at)
+        )
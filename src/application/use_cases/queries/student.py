@@ -1,33 +1,62 @@
 from typing import Optional
 from uuid import UUID
-import json
+from datetime import date
 from src.application.dtos import (
-    PaginationParams, PaginatedResponse, StudentDTO, AccountStatementDTO
+    PaginationParams, PaginatedResponse, StudentDTO, AccountStatementDTO, StatementSummaryDTO
 )
+from src.application.pagination import decode_cursor, next_cursor
 from src.domain.exceptions import EntityNotFound
+from .statement import DEFAULT_PERIOD_DAYS
 
 class StudentQueriesMixin:
     async def list_students(self, params: PaginationParams, school_id: Optional[UUID] = None) -> PaginatedResponse[StudentDTO]:
-        items, total = await self.student_repo.list(limit=params.limit, offset=params.offset, school_id=school_id)
+        items, total = await self.student_repo.list(
+            limit=params.limit, offset=params.offset, school_id=school_id,
+            after=decode_cursor(params.after), with_total=params.include_total
+        )
         dtos = [StudentDTO(id=i.id, school_id=i.school_id, name=i.name, created_at=i.created_at) for i in items]
-        return PaginatedResponse(items=dtos, total=total, limit=params.limit, offset=params.offset)
+        return PaginatedResponse(
+            items=dtos, total=total, limit=params.limit, offset=params.offset,
+            next_cursor=next_cursor(items, params.limit, lambda i: i.created_at)
+        )
 
-    async def get_student_account_statement(self, student_id: UUID) -> AccountStatementDTO:
-        version = await self.cache.get_version(f"student:{student_id}")
-        cache_key = f"student:{student_id}:statement:v{version}"
+    async def get_student_account_statement(
+        self, student_id: UUID, page: Optional[PaginationParams] = None, fresh: bool = False
+    ) -> AccountStatementDTO:
+        if page:
+            build = lambda queries: queries._build_student_statement_page(student_id, page)
+        else:
+            build = lambda queries: queries.statement_repo.get_student_statement(student_id)
         
-        cached_data = await self.cache.get(cache_key)
-        if cached_data:
-            try:
-                data_dict = json.loads(cached_data)
-                return AccountStatementDTO(**data_dict)
-            except Exception:
-                pass
-
-        statement = await self.statement_repo.get_student_statement(student_id)
+        statement = await self._cached_statement(f"student:{student_id}", page, build, fresh)
         if not statement:
             raise EntityNotFound(f"Student {student_id} not found or no statement available")
+        return statement
 
-        await self.cache.set(cache_key, statement.model_dump_json(), ttl_seconds=60)
-        
+    async def get_student_period_statement(
+        self, student_id: UUID, start: Optional[date] = None, end: Optional[date] = None, fresh: bool = False
+    ) -> AccountStatementDTO:
+        start, end = self._resolve_range(start, end, DEFAULT_PERIOD_DAYS)
+        statement = await self._cached_period_statement(
+            f"student:{student_id}", start, end,
+            lambda queries: queries.statement_repo.get_student_period_statement(student_id, start, end), fresh
+        )
+        if not statement:
+            raise EntityNotFound(f"Student {student_id} not found")
         return statement
+
+    async def _build_student_statement_page(self, student_id: UUID, page: PaginationParams) -> Optional[AccountStatementDTO]:
+        summary = await self.statement_repo.get_student_summary(student_id)
+        if not summary:
+            return None
+        invoices = await self.statement_repo.list_student_invoices(
+            student_id, limit=page.limit, after=decode_cursor(page.after)
+        )
+        return self._page_statement(summary, invoices, page)
+
+    async def get_student_statement_summary(self, student_id: UUID) -> StatementSummaryDTO:
+        # Served from the projection tables; a PK lookup regardless of history size
+        summary = await self.statement_repo.get_student_summary(student_id)
+        if not summary:
+            raise EntityNotFound(f"Student {student_id} not found")
+        return summary
@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+from datetime import date
+
+from src.config import settings
+from src.adapters.persistence import partitions
+from src.adapters.persistence.db import AsyncSessionLocal, engine
+from src.adapters.persistence.repos import SQLAlchemyBalanceProjectionRepository
+from src.adapters.imports.files import FORMATS, detect_format, iter_file_lines, parse_invoice_rows, parse_payment_rows
+from src.adapters.composition import build_command_handlers
+from src.application.use_cases.commands.invoice import OVERDUE_SWEEP_CHUNK_SIZE
+from src.application.use_cases.commands.invoice_import import IMPORT_BATCH_SIZE
+
+async def rebuild_projections(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        await SQLAlchemyBalanceProjectionRepository(session).rebuild()
+        await session.commit()
+    print("Balance projections rebuilt.")
+
+async def backfill_collections(args: argparse.Namespace) -> None:
+    start = date.fromisoformat(args.start) if args.start else None
+    end = date.fromisoformat(args.end) if args.end else None
+    async with AsyncSessionLocal() as session:
+        await SQLAlchemyBalanceProjectionRepository(session).rebuild_collections(start, end)
+        await session.commit()
+    print(f"Daily collections rebuilt ({start or 'beginning'} to {end or 'latest'}).")
+
+async def snapshot_balances(args: argparse.Namespace) -> None:
+    as_of = date.fromisoformat(args.as_of) if args.as_of else date.today().replace(day=1)
+    if as_of > date.today():
+        raise SystemExit("--as-of cannot be in the future")
+    async with AsyncSessionLocal() as session:
+        taken = await SQLAlchemyBalanceProjectionRepository(session).take_snapshots(as_of)
+        await session.commit()
+    print(f"Balance snapshots taken as of {as_of}." if taken else "Snapshots are already being taken; skipped.")
+
+async def refresh_receivables(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        refreshed = await SQLAlchemyBalanceProjectionRepository(session).refresh_receivables()
+        await session.commit()
+    print("Receivables view refreshed." if refreshed else "Receivables view is already being refreshed; skipped.")
+
+async def ensure_partitions(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        created = await partitions.ensure_partitions(conn, args.months_ahead)
+    print(f"Created partitions: {', '.join(created)}." if created else "All partitions already exist.")
+
+async def detach_partitions(args: argparse.Namespace) -> None:
+    before = date.fromisoformat(args.before)
+    if before > date.today().replace(day=1):
+        raise SystemExit("--before cannot be later than the start of the current month")
+    # DETACH ... CONCURRENTLY refuses to run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        detached = await partitions.detach_partitions(conn, before)
+    print(f"Detached partitions: {', '.join(detached)}." if detached else "No partitions to detach.")
+
+async def import_invoices(args: argparse.Namespace) -> None:
+    fmt = args.format or detect_format(filename=args.path)
+    async with AsyncSessionLocal() as session:
+        with open(args.path, encoding="utf-8", errors="replace", newline="") as source:
+            rows = parse_invoice_rows(iter_file_lines(source), fmt)
+            report = await build_command_handlers(session).import_invoices(rows, batch_size=args.batch_size)
+    print(f"Imported {report.imported} invoices, rejected {report.rejected}.")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+
+async def import_payments(args: argparse.Namespace) -> None:
+    fmt = args.format or detect_format(filename=args.path)
+    async with AsyncSessionLocal() as session:
+        with open(args.path, encoding="utf-8", errors="replace", newline="") as source:
+            rows = parse_payment_rows(iter_file_lines(source), fmt)
+            report = await build_command_handlers(session).import_payments(rows, batch_size=args.batch_size)
+    print(f"Applied {report.applied} payments, unmatched {report.unmatched}, rejected {report.rejected}.")
+    for row in report.unmatched_rows:
+        print(f"  line {row.line}: unmatched: {row.error}")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+
+async def sweep_overdue(args: argparse.Namespace) -> None:
+    as_of = date.fromisoformat(args.as_of) if args.as_of else date.today()
+    async with AsyncSessionLocal() as session:
+        result = await build_command_handlers(session).sweep_overdue(as_of, chunk_size=args.chunk_size)
+    print(f"Marked {result.marked} invoices overdue (due before {result.as_of}).")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="School Payments maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-projections", help="Regenerate the statement read-model tables")
+    rebuild.set_defaults(func=rebuild_projections)
+
+    backfill = commands.add_parser("backfill-collections", help="Regenerate the daily collections rollup from payments")
+    backfill.add_argument("--from", dest="start", help="ISO date of the first day to rebuild (default: all history)")
+    backfill.add_argument("--to", dest="end", help="ISO date of the last day to rebuild (default: no limit)")
+    backfill.set_defaults(func=backfill_collections)
+
+    snapshots = commands.add_parser("snapshot-balances", help="Checkpoint student and school balances for ranged statements")
+    snapshots.add_argument("--as-of", help="ISO date; totals before it are checkpointed (default: first day of this month)")
+    snapshots.set_defaults(func=snapshot_balances)
+
+    receivables = commands.add_parser("refresh-receivables", help="Refresh the cross-school receivables view")
+    receivables.set_defaults(func=refresh_receivables)
+
+    ensure = commands.add_parser("ensure-partitions", help="Create the upcoming monthly invoice and payment partitions")
+    ensure.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    ensure.set_defaults(func=ensure_partitions)
+
+    detach = commands.add_parser("detach-partitions", help="Detach monthly invoice and payment partitions for archiving")
+    detach.add_argument(
+        "--before", required=True,
+        help="ISO date; monthly partitions ending on or before it are detached, except invoice months with open "
+             "invoices and payment months of invoices still attached. The *_history partitions are never detachable"
+    )
+    detach.set_defaults(func=detach_partitions)
+
+    importer = commands.add_parser("import-invoices", help="Bulk-create invoices from a CSV or NDJSON file")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    importer.set_defaults(func=import_invoices)
+
+    payments = commands.add_parser("import-payments", help="Reconcile a bank file (CSV or NDJSON) against open invoices")
+    payments.add_argument("path")
+    payments.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    payments.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    payments.set_defaults(func=import_payments)
+
+    sweep = commands.add_parser("sweep-overdue", help="Mark open invoices past their due date as OVERDUE")
+    sweep.add_argument("--as-of", help="ISO date; invoices due before it are swept (default: today)")
+    sweep.add_argument("--chunk-size", type=int, default=OVERDUE_SWEEP_CHUNK_SIZE)
+    sweep.set_defaults(func=sweep_overdue)
+
+    return parser
+
+def main() -> None:
+    args = build_parser().parse_args()
+    asyncio.run(args.func(args))
+
+if __name__ == "__main__":
+    main()
@@ -50,13 +50,12 @@ class Invoice:
     status: InvoiceStatus
     issued_at: datetime = field(default_factory=datetime.utcnow)
     payments: List[Payment] = field(default_factory=list)
+    # Running total of payments, persisted as invoices.amount_paid so reads never sum the history
+    paid_amount: Decimal = Decimal('0.00')
 
     @property
     def amount_paid(self) -> Money:
-        total = Decimal('0.00')
-        for p in self.payments:
-            total += p.amount.amount
-        return Money(amount=total, currency=self.amount.currency)
+        return Money(amount=self.paid_amount, currency=self.amount.currency)
 
     @property
     def amount_due(self) -> Money:
@@ -89,6 +88,7 @@ class Invoice:
 
         payment = Payment.create(invoice_id=self.id, amount=amount)
         self.payments.append(payment)
+        self.paid_amount += amount.amount
         
         self._update_status()
         return payment
@@ -98,6 +98,8 @@ class Invoice:
         if paid.amount >= self.amount.amount:
             self.status = InvoiceStatus.PAID
         elif paid.amount > 0:
-            self.status = InvoiceStatus.PARTIALLY_PAID
+            # A partial payment does not bring an overdue invoice back into terms
+            if self.status != InvoiceStatus.OVERDUE:
+                self.status = InvoiceStatus.PARTIALLY_PAID
         else:
             self.status = InvoiceStatus.PENDING
@@ -6,6 +6,11 @@ class InvoiceStatus(str, Enum):
     PAID = "PAID"
     OVERDUE = "OVERDUE"
 
+# Invoices that can still receive payments
+OPEN_INVOICE_STATUSES = (InvoiceStatus.PENDING, InvoiceStatus.PARTIALLY_PAID, InvoiceStatus.OVERDUE)
+# Open invoices that become OVERDUE once their due date has passed
+DUE_INVOICE_STATUSES = (InvoiceStatus.PENDING, InvoiceStatus.PARTIALLY_PAID)
+
 class Currency(str, Enum):
     USD = "USD"
     EUR = "EUR"
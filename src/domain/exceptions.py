@@ -29,3 +29,11 @@ class InvalidInvoiceStateTransition(BusinessRuleViolation):
 class OperationNotAllowed(BusinessRuleViolation):
     """Raised when an operation is not allowed on the current state."""
     pass
+
+class InvalidCursor(DomainError):
+    """Raised when a pagination cursor cannot be decoded."""
+    pass
+
+class InvalidDateRange(DomainError):
+    """Raised when a requested date range is reversed or longer than allowed."""
+    pass
@@ -2,15 +2,23 @@ import pytest
 import pytest_asyncio
 import os
 from httpx import AsyncClient
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from src.adapters.persistence.db import DATABASE_URL
 from src.main import app
-from src.adapters.web.handlers import get_db
+from src.adapters.web.handlers import get_db, get_query_db
 from src.adapters.persistence import Base
 
 @pytest_asyncio.fixture(scope="session")
 async def engine():
     engine = create_async_engine(DATABASE_URL)
+    # DB-backed tests skip rather than fail where no Postgres is running
+    try:
+        async with engine.connect():
+            pass
+    except (OSError, SQLAlchemyError) as e:
+        await engine.dispose()
+        pytest.skip(f"database not reachable: {e}")
     yield engine
     await engine.dispose()
 
@@ -29,6 +37,7 @@ async def async_client(session):
         yield session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_query_db] = override_get_db
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
     app.dependency_overrides.clear()
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import uuid4
+
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from src.adapters.cache.invalidation import CacheInvalidationListener
+from src.adapters.cache.local_cache import LRUCache, TwoTierCacheAdapter
+from src.adapters.resilience.circuit_breaker import CircuitBreaker, CircuitState
+from src.application.dtos import AccountStatementDTO
+from src.application.ports.cache import version_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_statement() -> AccountStatementDTO:
+    return AccountStatementDTO(
+        entity_id=uuid4(), generated_at=datetime.utcnow(), invoices=[], total_due=Decimal("0"), currency="USD"
+    )
+
+def make_two_tier(clock: FakeClock) -> TwoTierCacheAdapter:
+    remote = AsyncMock()
+    remote.circuit_breaker = CircuitBreaker()
+    return TwoTierCacheAdapter(remote, max_entries=10, ttl_seconds=30, version_ttl_seconds=1, clock=clock)
+
+def test_lru_cache_evicts_least_recently_used_and_expires():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=2, clock=clock)
+    cache.set("a", 1, ttl_seconds=10)
+    cache.set("b", 2, ttl_seconds=10)
+    cache.get("a")
+    cache.set("c", 3, ttl_seconds=10)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.get("a", allow_expired=True) == 1
+    assert cache.stats() == {
+        "entries": 2, "max_entries": 2, "bytes": 128, "max_bytes": None, "hits": 4, "misses": 2, "evictions": 1
+    }
+
+def test_lru_cache_evicts_to_stay_within_its_byte_budget():
+    cache = LRUCache(max_entries=10, max_bytes=100, clock=FakeClock())
+    cache.set("a", "x", ttl_seconds=10, size=40)
+    cache.set("b", "x", ttl_seconds=10, size=40)
+    cache.set("a", "x", ttl_seconds=10, size=30)
+    cache.set("c", "x", ttl_seconds=10, size=40)
+
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 70
+
+    # Larger than the whole budget: not cached, and nothing else is evicted for it
+    cache.set("d", "x", ttl_seconds=10, size=101)
+    assert cache.get("d") is None
+    assert cache.stats()["entries"] == 2
+
+    # Models are charged their JSON length
+    statement = make_statement()
+    cache = LRUCache(max_entries=10, clock=FakeClock())
+    cache.set("s", statement, ttl_seconds=10)
+    assert cache.stats()["bytes"] == len(statement.model_dump_json())
+
+@pytest.mark.asyncio
+async def test_two_tier_serves_hot_statements_without_redis():
+    clock = FakeClock()
+    cache = make_two_tier(clock)
+    statement = make_statement()
+    cache.remote.get_model.return_value = statement
+
+    first = await cache.get_model("student:1:statement:v3", AccountStatementDTO)
+    second = await cache.get_model("student:1:statement:v3", AccountStatementDTO)
+
+    assert first is second is statement
+    cache.remote.get_model.assert_awaited_once()
+
+    await cache.set_model("student:2:statement:v1", statement, ttl_seconds=60)
+    assert await cache.get_model("student:2:statement:v1", AccountStatementDTO) is statement
+    cache.remote.set_model.assert_awaited_once_with("student:2:statement:v1", statement, 60)
+
+@pytest.mark.asyncio
+async def test_two_tier_versions_expire_and_local_bumps_apply_at_once():
+    clock = FakeClock()
+    cache = make_two_tier(clock)
+    cache.listening = True
+    cache.remote.get_version.side_effect = [3, 4, 5]
+
+    assert await cache.get_version("student:1") == 3
+    assert await cache.get_version("student:1") == 3
+    clock.now = 1
+    assert await cache.get_version("student:1") == 4
+
+    await cache.increment_versions(["student:1"])
+    assert await cache.get_version("student:1") == 5
+    cache.remote.increment_versions.assert_awaited_once_with(["student:1"])
+
+@pytest.mark.asyncio
+async def test_two_tier_keeps_serving_locally_while_redis_circuit_is_open():
+    clock = FakeClock()
+    cache = make_two_tier(clock)
+    statement = make_statement()
+    cache.listening = True
+    cache.remote.get_version.return_value = 3
+    await cache.get_version("student:1")
+    await cache.set_model("student:1:statement:v3", statement, ttl_seconds=60)
+
+    cache.remote.circuit_breaker.state = CircuitState.OPEN
+    clock.now = 5
+    cache.remote.get_version.reset_mock()
+
+    assert await cache.get_version("student:1") == 3
+    assert await cache.get_model("student:1:statement:v3", AccountStatementDTO) is statement
+    assert await cache.get_model("student:2:statement:v1", AccountStatementDTO) is None
+    cache.remote.get_version.assert_not_awaited()
+    cache.remote.get_model.assert_not_awaited()
+
+class FakePubSub:
+    """In-process stand-in for a Redis subscription: feed it messages or a dropped connection.
+
+    Like a real connection, a read blocking past `socket_timeout` raises TimeoutError.
+    """
+
+    def __init__(self, broker: "FakeBroker"):
+        self.broker = broker
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.broker.subscribers.append(self)
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0):
+        socket_timeout = self.broker.socket_timeout
+        wait = timeout if socket_timeout is None or (timeout is not None and timeout < socket_timeout) else None
+        try:
+            item = await asyncio.wait_for(self.queue.get(), wait if wait is not None else socket_timeout)
+        except asyncio.TimeoutError:
+            if wait is None:
+                raise RedisTimeoutError("Timeout reading from socket")
+            return None
+        if isinstance(item, Exception):
+            raise item
+        return {"type": "message", "data": item}
+
+    async def aclose(self) -> None:
+        self.broker.subscribers.remove(self)
+
+class FakeBroker:
+    def __init__(self, socket_timeout: Optional[float] = None):
+        self.subscribers = []
+        self.socket_timeout = socket_timeout
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> FakePubSub:
+        return FakePubSub(self)
+
+    def publish(self, data) -> None:
+        for subscriber in self.subscribers:
+            subscriber.queue.put_nowait(data)
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+@pytest.mark.asyncio
+async def test_two_tier_does_not_hold_versions_without_invalidations():
+    cache = make_two_tier(FakeClock())
+    cache.remote.get_version.side_effect = [3, 4]
+
+    assert await cache.get_version("student:1") == 3
+    assert await cache.get_version("student:1") == 4
+
+@pytest.mark.asyncio
+async def test_invalidation_listener_evicts_published_prefixes_and_flushes_on_reconnect():
+    cache = make_two_tier(FakeClock())
+    broker = FakeBroker()
+    listener = CacheInvalidationListener(broker, cache, "cache:invalidations", retry_seconds=0)
+    task = asyncio.create_task(listener.run())
+    try:
+        await wait_for(lambda: cache.listening)
+        cache.remote.get_version.return_value = 3
+        await cache.get_version("student:1")
+        await cache.get_version("school:1")
+        await cache.set_model("school:1:statement:v3", make_statement(), ttl_seconds=60)
+
+        broker.publish(json.dumps(["student:1"]))
+        await wait_for(lambda: cache.local.get(version_key("student:1")) is None)
+        assert cache.local.get(version_key("school:1")) == 3
+
+        broker.publish(RedisConnectionError("connection reset"))
+        await wait_for(lambda: not cache.listening)
+        # Bumps missed while disconnected are unknown: the resubscribed cache starts empty
+        await wait_for(lambda: cache.listening)
+        assert cache.local.stats()["entries"] == 0
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+@pytest.mark.asyncio
+async def test_two_tier_versioned_lookup_takes_one_remote_call_then_none():
+    cache = make_two_tier(FakeClock())
+    cache.listening = True
+    statement = make_statement()
+    cache.remote.get_versioned_model.return_value = (3, statement)
+
+    first = await cache.get_versioned_model("student:1", "statement", ":l10:first", AccountStatementDTO)
+    second = await cache.get_versioned_model("student:1", "statement", ":l10:first", AccountStatementDTO)
+
+    assert first == second == (3, statement)
+    cache.remote.get_versioned_model.assert_awaited_once_with("student:1", "statement", ":l10:first", AccountStatementDTO)
+    cache.remote.get_version.assert_not_awaited()
+    cache.remote.get_model.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_two_tier_rebuild_locks_are_shared_through_redis():
+    cache = make_two_tier(FakeClock())
+    cache.remote.acquire_lock.return_value = None
+
+    assert await cache.acquire_lock("student:1:statement:v3:rebuild", 5000) is None
+    await cache.release_lock("student:1:statement:v3:rebuild", "token")
+
+    cache.remote.acquire_lock.assert_awaited_once_with("student:1:statement:v3:rebuild", 5000)
+    cache.remote.release_lock.assert_awaited_once_with("student:1:statement:v3:rebuild", "token")
+
+@pytest.mark.asyncio
+async def test_invalidation_listener_stays_subscribed_on_a_quiet_channel():
+    cache = make_two_tier(FakeClock())
+    broker = FakeBroker(socket_timeout=0.02)
+    listener = CacheInvalidationListener(broker, cache, "cache:invalidations", retry_seconds=0, poll_seconds=0.01)
+    task = asyncio.create_task(listener.run())
+    try:
+        await wait_for(lambda: cache.listening)
+        cache.remote.get_version.return_value = 3
+        await cache.get_version("student:1")
+
+        # Idle for several socket timeouts: no disconnect, no flush
+        await asyncio.sleep(0.1)
+        assert cache.listening
+        assert cache.local.get(version_key("student:1")) == 3
+        assert len(broker.subscribers) == 1
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+@pytest.mark.asyncio
+async def test_two_tier_never_caches_under_the_fallback_version_while_redis_is_down():
+    cache = make_two_tier(FakeClock())
+    cache.remote.circuit_breaker.state = CircuitState.OPEN
+    # What RedisCacheAdapter answers with its circuit open
+    cache.remote.get_versioned_model.return_value = (0, None)
+    before, after = make_statement(), make_statement()
+
+    await cache.increment_versions(["student:1"])
+    version, cached = await cache.get_versioned_model("student:1", "statement", "", AccountStatementDTO)
+    assert cached is None
+    await cache.set_versioned_model("student:1", "statement", "", version, before, ttl_seconds=60)
+
+    await cache.increment_versions(["student:1"])
+    version, cached = await cache.get_versioned_model("student:1", "statement", "", AccountStatementDTO)
+    assert cached is None
+    await cache.set_versioned_model("student:1", "statement", "", version, after, ttl_seconds=60)
+    assert cache.local.stats()["entries"] == 0
+
+@pytest.mark.asyncio
+async def test_two_tier_stops_serving_a_known_version_after_a_write_during_an_outage():
+    cache = make_two_tier(FakeClock())
+    cache.listening = True
+    statement = make_statement()
+    cache.remote.get_versioned_model.return_value = (3, statement)
+    await cache.get_versioned_model("student:1", "statement", "", AccountStatementDTO)
+
+    cache.remote.circuit_breaker.state = CircuitState.OPEN
+    cache.remote.get_versioned_model.return_value = (0, None)
+    assert await cache.get_versioned_model("student:1", "statement", "", AccountStatementDTO) == (3, statement)
+
+    await cache.increment_versions(["student:1"])
+    assert await cache.get_versioned_model("student:1", "statement", "", AccountStatementDTO) == (0, None)
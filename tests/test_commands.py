@@ -1,10 +1,242 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from uuid import uuid4
+from contextlib import asynccontextmanager
+from uuid import UUID, uuid4
+from decimal import Decimal
 from datetime import date as dt_date, datetime
 
 from src.application.use_cases.commands import CommandHandlers
-from src.application.dtos import CreateInvoiceCommand, CreateStudentCommand
+from src.application.dtos import (
+    CreateInvoiceCommand, CreateStudentCommand, ProcessPaymentCommand, GenerateSchoolInvoicesCommand
+)
+from src.application.ports.repositories import AppliedPayment
 from src.domain.entities import Student, School, Invoice
 from src.domain.value_objects import Money
-from src.domain.enums import Currency
+from src.domain.enums import Currency, InvoiceStatus
+from src.domain.exceptions import PaymentExceedsDueAmount, BusinessRuleViolation
+from src.adapters.web.payment_batching import PaymentBatcher
+
+def make_command_handlers(invoice_repo) -> CommandHandlers:
+    return CommandHandlers(
+        uow=AsyncMock(), school_repo=AsyncMock(), student_repo=AsyncMock(),
+        invoice_repo=invoice_repo, projection_repo=AsyncMock(), cache=AsyncMock()
+    )
+
+def applied_for(invoice_id, amount, student_id, school_id) -> AppliedPayment:
+    return AppliedPayment(
+        payment_id=uuid4(), invoice_id=invoice_id, student_id=student_id, school_id=school_id,
+        amount=amount, currency=Currency.USD, status=InvoiceStatus.PARTIALLY_PAID, paid_at=datetime.utcnow()
+    )
+
+@pytest.mark.asyncio
+async def test_payment_batch_isolates_failures_and_dedups_invalidations():
+    student_id, school_id = uuid4(), uuid4()
+    rejected_invoice = uuid4()
+
+    async def apply_payment(invoice_id, amount):
+        if invoice_id == rejected_invoice:
+            raise PaymentExceedsDueAmount("too much")
+        return applied_for(invoice_id, amount, student_id, school_id)
+
+    invoice_repo = AsyncMock()
+    invoice_repo.apply_payment.side_effect = apply_payment
+    handlers = make_command_handlers(invoice_repo)
+    cmds = [
+        ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal("10.00")),
+        ProcessPaymentCommand(invoice_id=rejected_invoice, amount=Decimal("10.00")),
+        ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal("5.00")),
+    ]
+
+    results = await handlers.process_payment_batch(cmds)
+
+    assert isinstance(results[1], PaymentExceedsDueAmount)
+    assert all(isinstance(r, UUID) for r in (results[0], results[2]))
+    handlers.uow.commit.assert_awaited_once()
+    deltas = handlers.projection_repo.apply.await_args.args[0]
+    assert sum(d.paid for d in deltas) == Decimal("15.00")
+    # Each payment also lands in the daily collections rollup for its UTC day
+    assert {d.paid_on for d in deltas} == {datetime.utcnow().date()}
+    invalidated = handlers.cache.increment_versions.await_args.args[0]
+    assert invalidated == [f"student:{student_id}", f"school:{school_id}"]
+
+@pytest.mark.asyncio
+async def test_payment_batcher_group_commits_and_returns_each_result():
+    batches = []
+    handlers = MagicMock()
+
+    async def process_payment_batch(cmds):
+        batches.append(len(cmds))
+        return [uuid4() if cmd.amount > 0 else BusinessRuleViolation("bad") for cmd in cmds]
+
+    handlers.process_payment_batch = process_payment_batch
+
+    @asynccontextmanager
+    async def factory():
+        yield handlers
+
+    batcher = PaymentBatcher(factory, max_size=3, max_wait_ms=50)
+    results = await asyncio.gather(
+        *(batcher.submit(ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal(a))) for a in ("1", "0", "2", "3")),
+        return_exceptions=True
+    )
+
+    assert batches == [3, 1]
+    assert isinstance(results[1], BusinessRuleViolation)
+    assert sum(1 for r in results if not isinstance(r, BaseException)) == 3
+
+@pytest.mark.asyncio
+async def test_payment_batcher_falls_back_to_single_payments_on_batch_error():
+    handlers = MagicMock()
+    handlers.uow.committed = False
+    handlers.process_payment_batch = AsyncMock(side_effect=RuntimeError("connection lost"))
+    handlers.process_payment = AsyncMock(side_effect=lambda cmd: cmd.invoice_id)
+
+    @asynccontextmanager
+    async def factory():
+        yield handlers
+
+    batcher = PaymentBatcher(factory, max_size=2, max_wait_ms=50)
+    cmds = [ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal("1")) for _ in range(2)]
+    results = await asyncio.gather(*(batcher.submit(cmd) for cmd in cmds))
+
+    assert results == [cmd.invoice_id for cmd in cmds]
+    assert handlers.process_payment.await_count == 2
+
+@pytest.mark.asyncio
+async def test_payment_batcher_never_reapplies_a_committed_batch():
+    handlers = MagicMock()
+    handlers.uow.committed = False
+    handlers.process_payment = AsyncMock(side_effect=lambda cmd: cmd.invoice_id)
+
+    async def commit_then_fail(cmds):
+        handlers.uow.committed = True
+        raise RuntimeError("connection lost after COMMIT")
+
+    handlers.process_payment_batch = AsyncMock(side_effect=commit_then_fail)
+
+    @asynccontextmanager
+    async def factory():
+        yield handlers
+
+    batcher = PaymentBatcher(factory, max_size=2, max_wait_ms=50)
+    cmds = [ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal("1")) for _ in range(2)]
+    results = await asyncio.gather(*(batcher.submit(cmd) for cmd in cmds), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    handlers.process_payment.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_payment_batcher_keeps_results_when_closing_the_session_fails():
+    handlers = MagicMock()
+    handlers.uow.committed = True
+    handlers.process_payment_batch = AsyncMock(side_effect=lambda cmds: [cmd.invoice_id for cmd in cmds])
+    handlers.process_payment = AsyncMock()
+
+    @asynccontextmanager
+    async def factory():
+        yield handlers
+        raise RuntimeError("close failed")
+
+    batcher = PaymentBatcher(factory, max_size=2, max_wait_ms=50)
+    cmds = [ProcessPaymentCommand(invoice_id=uuid4(), amount=Decimal("1")) for _ in range(2)]
+    results = await asyncio.gather(*(batcher.submit(cmd) for cmd in cmds))
+
+    assert results == [cmd.invoice_id for cmd in cmds]
+    handlers.process_payment.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_generate_school_invoices_bumps_versions_in_one_call():
+    school = School.create(name="Springfield")
+    billed = [uuid4(), uuid4()]
+    handlers = make_command_handlers(AsyncMock())
+    handlers.school_repo.get_by_id.return_value = school
+    handlers.invoice_repo.generate_for_school.return_value = billed
+
+    result = await handlers.generate_school_invoices(GenerateSchoolInvoicesCommand(
+        school_id=school.id, billing_period="2026-03", amount=Decimal("250.00"),
+        currency=Currency.USD, due_date=dt_date(2026, 3, 10)
+    ))
+
+    assert result.created == 2
+    deltas = handlers.projection_repo.apply.await_args.args[0]
+    assert {d.student_id for d in deltas} == set(billed)
+    handlers.cache.increment_versions.assert_awaited_once_with(
+        [f"school:{school.id}"] + [f"student:{s}" for s in billed]
+    )
+
+@pytest.mark.asyncio
+async def test_generate_school_invoices_rerun_is_a_no_op():
+    handlers = make_command_handlers(AsyncMock())
+    handlers.school_repo.get_by_id.return_value = School.create(name="Springfield")
+    handlers.invoice_repo.generate_for_school.return_value = []
+
+    result = await handlers.generate_school_invoices(GenerateSchoolInvoicesCommand(
+        school_id=uuid4(), billing_period="2026-03", amount=Decimal("250.00"),
+        currency=Currency.USD, due_date=dt_date(2026, 3, 10)
+    ))
+
+    assert result.created == 0
+    handlers.projection_repo.apply.assert_not_awaited()
+    handlers.cache.increment_versions.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_sweep_overdue_commits_per_chunk_and_invalidates_touched_owners():
+    student_a, student_b, school_id = uuid4(), uuid4(), uuid4()
+    handlers = make_command_handlers(AsyncMock())
+    handlers.invoice_repo.mark_overdue.side_effect = [
+        [(student_a, school_id), (student_a, school_id)],
+        [(student_b, school_id)],
+    ]
+
+    result = await handlers.sweep_overdue(dt_date(2026, 3, 1), chunk_size=2)
+
+    assert result.marked == 3
+    assert handlers.uow.commit.await_count == 2
+    handlers.cache.increment_versions.assert_awaited_once_with(
+        [f"student:{student_a}", f"school:{school_id}", f"student:{student_b}"]
+    )
+
+@pytest.mark.asyncio
+async def test_delete_invoice_reverses_it_in_later_snapshots():
+    invoice = Invoice.create(uuid4(), uuid4(), Money(Decimal("120.00"), Currency.USD), dt_date(2026, 3, 1))
+    invoice.issued_at = datetime(2026, 1, 15, 9, 30)
+    invoice_repo = AsyncMock()
+    invoice_repo.get_by_id.return_value = invoice
+    handlers = make_command_handlers(invoice_repo)
+
+    await handlers.delete_invoice(invoice.id)
+
+    delta, effective_at = handlers.projection_repo.adjust_snapshots.await_args.args
+    assert (delta.invoice_count, delta.invoiced) == (-1, Decimal("-120.00"))
+    assert effective_at == invoice.issued_at
+    handlers.uow.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_delete_invoice_refuses_invoices_with_payments():
+    invoice = Invoice.create(uuid4(), uuid4(), Money(Decimal("120.00"), Currency.USD), dt_date(2026, 3, 1))
+    invoice.paid_amount = Decimal("20.00")
+    invoice_repo = AsyncMock()
+    invoice_repo.get_by_id.return_value = invoice
+    handlers = make_command_handlers(invoice_repo)
+
+    with pytest.raises(BusinessRuleViolation):
+        await handlers.delete_invoice(invoice.id)
+
+    invoice_repo.delete_unpaid.assert_not_awaited()
+    handlers.uow.commit.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_delete_invoice_refuses_when_a_payment_lands_before_the_delete():
+    invoice = Invoice.create(uuid4(), uuid4(), Money(Decimal("120.00"), Currency.USD), dt_date(2026, 3, 1))
+    invoice_repo = AsyncMock()
+    invoice_repo.get_by_id.return_value = invoice
+    invoice_repo.delete_unpaid.return_value = False
+    handlers = make_command_handlers(invoice_repo)
+
+    with pytest.raises(BusinessRuleViolation):
+        await handlers.delete_invoice(invoice.id)
+
+    invoice_repo.delete_unpaid.assert_awaited_once_with(invoice.id, invoice.issued_at)
+    handlers.projection_repo.apply.assert_not_awaited()
+    handlers.uow.commit.assert_not_awaited()
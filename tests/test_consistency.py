@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.adapters.persistence import db
+from src.adapters.persistence.repos import SQLAlchemyUnitOfWork
+from src.adapters.web.consistency import CONSISTENCY_HEADER, ConsistencyTokenMiddleware
+
+@pytest.mark.parametrize("token, valid", [
+    ("0/16B3748", True),
+    ("16/B374D848", True),
+    ("FFFFFFFF/FFFFFFFF", True),
+    ("0/", False),
+    ("1/2/3", False),
+    ("123456789/0", False),
+    ("0/16B3748'; SELECT 1", False),
+])
+def test_lsn_pattern_accepts_only_pg_lsn_text(token, valid):
+    assert bool(db._LSN_PATTERN.match(token)) is valid
+
+@pytest.mark.asyncio
+async def test_malformed_token_is_not_sent_to_the_replica(monkeypatch):
+    def no_session():
+        raise AssertionError("replica queried")
+    monkeypatch.setattr(db, "ReplicaSessionLocal", no_session)
+
+    assert await db.replica_caught_up("not-an-lsn") is False
+
+@pytest.mark.asyncio
+async def test_read_sessionmaker_uses_the_primary_until_the_replica_catches_up(monkeypatch):
+    caught_up = AsyncMock(return_value=False)
+    monkeypatch.setattr(db, "REPLICA_ENABLED", True)
+    monkeypatch.setattr(db, "replica_caught_up", caught_up)
+
+    assert await db.read_sessionmaker("0/16B3748") is db.AsyncSessionLocal
+    caught_up.return_value = True
+    assert await db.read_sessionmaker("0/16B3748") is db.ReplicaSessionLocal
+    # No token: nothing to wait for, and no lag check
+    assert await db.read_sessionmaker(None) is db.ReplicaSessionLocal
+    assert caught_up.await_count == 2
+
+@pytest.mark.asyncio
+async def test_middleware_echoes_the_commit_token_of_a_command():
+    app = FastAPI()
+    app.add_middleware(ConsistencyTokenMiddleware)
+
+    @app.post("/command")
+    async def command():
+        # What SQLAlchemyUnitOfWork.commit does when a replica is configured
+        db.commit_token_var.get()["token"] = "0/16B3748"
+        return {}
+
+    @app.get("/query")
+    async def query():
+        return {}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        written = await client.post("/command")
+        read = await client.get("/query")
+
+    assert written.headers[CONSISTENCY_HEADER] == "0/16B3748"
+    assert CONSISTENCY_HEADER not in read.headers
+
+@pytest.mark.asyncio
+async def test_unit_of_work_committed_flag_resets_when_a_transaction_begins():
+    session = AsyncSession()
+    session.commit = AsyncMock()
+    uow = SQLAlchemyUnitOfWork(session)
+    assert uow.committed is False
+
+    await uow.commit()
+    assert uow.committed is True
+
+    # What the session does on the next statement after the commit
+    session.sync_session.dispatch.after_begin(session.sync_session, None, None)
+    assert uow.committed is False
@@ -63,3 +63,31 @@ def test_currency_mismatch():
     
     with pytest.raises(ValueError):
         invoice.register_payment(Money(Decimal("100.00"), Currency.EUR))
+
+def test_persisted_paid_amount_counts_towards_balance():
+    # Invoices loaded from storage carry the running balance without the payment history
+    amount = Money(Decimal("100.00"), Currency.USD)
+    invoice = Invoice.create(uuid4(), uuid4(), amount, date.today())
+    invoice.paid_amount = Decimal("70.00")
+    
+    assert invoice.amount_due.amount == Decimal("30.00")
+    with pytest.raises(PaymentExceedsDueAmount):
+        invoice.register_payment(Money(Decimal("40.00"), Currency.USD))
+    
+    invoice.register_payment(Money(Decimal("30.00"), Currency.USD))
+    assert invoice.status == InvoiceStatus.PAID
+    assert invoice.paid_amount == Decimal("100.00")
+
+def test_partial_payment_keeps_overdue_status():
+    invoice = Invoice.create(
+        student_id=uuid4(), school_id=uuid4(),
+        amount=Money(Decimal("100.00"), Currency.USD),
+        due_date=date.today() - timedelta(days=10)
+    )
+    invoice.status = InvoiceStatus.OVERDUE
+
+    invoice.register_payment(Money(Decimal("30.00"), Currency.USD))
+    assert invoice.status == InvoiceStatus.OVERDUE
+
+    invoice.register_payment(Money(Decimal("70.00"), Currency.USD))
+    assert invoice.status == InvoiceStatus.PAID
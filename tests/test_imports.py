@@ -0,0 +1,150 @@
+import pytest
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from decimal import Decimal
+from datetime import date
+
+from src.application.use_cases.commands import CommandHandlers
+from src.application.dtos import ImportRowErrorDTO, InvoiceImportRow, PaymentImportRow
+from src.adapters.imports.files import iter_lines, parse_invoice_rows, parse_payment_rows
+from src.domain.entities import Invoice
+from src.domain.enums import Currency, InvoiceStatus
+from src.domain.value_objects import Money
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+async def collect(rows):
+    return [row async for row in rows]
+
+@pytest.mark.asyncio
+async def test_csv_rows_are_parsed_across_chunk_boundaries_with_row_errors():
+    student_id = uuid4()
+    body = (
+        f"student_id,amount,currency,due_date\n{student_id},100.00,USD,2026-03-01\n"
+        f"{student_id},-5,USD,2026-03-01\nnot-a-uuid,10,EUR,2026-03-01\n"
+    ).encode()
+
+    rows = await collect(parse_invoice_rows(iter_lines(chunks(body[:30], body[30:70], body[70:])), "csv"))
+
+    assert isinstance(rows[0], InvoiceImportRow)
+    assert rows[0].line == 2 and rows[0].amount == Decimal("100.00")
+    assert [type(r) for r in rows[1:]] == [ImportRowErrorDTO, ImportRowErrorDTO]
+    assert [r.line for r in rows[1:]] == [3, 4]
+
+@pytest.mark.asyncio
+async def test_csv_without_required_columns_stops_at_header():
+    rows = await collect(parse_invoice_rows(iter_lines(chunks(b"student_id,amount\nx,1\n")), "csv"))
+
+    assert len(rows) == 1
+    assert "currency" in rows[0].error
+
+@pytest.mark.asyncio
+async def test_ndjson_rejects_malformed_lines():
+    good = f'{{"student_id": "{uuid4()}", "amount": "12.50", "currency": "EUR", "due_date": "2026-03-01"}}'
+    rows = await collect(parse_invoice_rows(iter_lines(chunks(f"{good}\n{{broken\n".encode())), "ndjson"))
+
+    assert isinstance(rows[0], InvoiceImportRow)
+    assert isinstance(rows[1], ImportRowErrorDTO) and rows[1].line == 2
+
+def make_command_handlers(student_repo=None, invoice_repo=None) -> CommandHandlers:
+    return CommandHandlers(
+        uow=AsyncMock(), school_repo=AsyncMock(), student_repo=student_repo or AsyncMock(),
+        invoice_repo=invoice_repo or AsyncMock(), projection_repo=AsyncMock(), cache=AsyncMock()
+    )
+
+@pytest.mark.asyncio
+async def test_import_invoices_batches_inserts_and_invalidates_once():
+    known_student, school_id, unknown_student = uuid4(), uuid4(), uuid4()
+    student_repo = AsyncMock()
+    student_repo.get_school_ids.side_effect = lambda ids: {known_student: school_id} if known_student in ids else {}
+    handlers = make_command_handlers(student_repo=student_repo)
+
+    async def rows():
+        for line in range(1, 6):
+            yield InvoiceImportRow(line=line, student_id=known_student, amount="10.00", currency="USD", due_date="2026-03-01")
+        yield InvoiceImportRow(line=6, student_id=unknown_student, amount="10.00", currency="USD", due_date="2026-03-01")
+        yield ImportRowErrorDTO(line=7, error="bad row")
+
+    report = await handlers.import_invoices(rows(), batch_size=2)
+
+    assert report.imported == 5
+    assert report.rejected == 2
+    assert {e.line for e in report.errors} == {6, 7}
+    assert handlers.invoice_repo.bulk_insert.await_count == 3
+    assert handlers.uow.commit.await_count == 3
+    invalidated = handlers.cache.increment_versions.await_args.args[0]
+    assert invalidated == [f"student:{known_student}", f"school:{school_id}"]
+
+@pytest.mark.asyncio
+async def test_invalid_utf8_rejects_the_line_not_the_file():
+    good = f"{uuid4()},10.00,USD,2026-03-01\n".encode()
+    body = b"student_id,amount,currency,due_date\n" + good + b"\xff\xfe,1,USD,2026-03-01\n" + good
+
+    rows = await collect(parse_invoice_rows(iter_lines(chunks(body)), "csv"))
+
+    assert [type(row) for row in rows] == [InvoiceImportRow, ImportRowErrorDTO, InvoiceImportRow]
+    assert rows[1].line == 3 and "UTF-8" in rows[1].error
+
+    # A multi-byte character cut between two chunks is still valid
+    body = f"invoice_id,amount,currency,reference\n{uuid4()},1,EUR,caf\u00e9\n".encode()
+    split = body.index("\u00e9".encode()) + 1
+    rows = await collect(parse_payment_rows(iter_lines(chunks(body[:split], body[split:])), "csv"))
+    assert rows[0].reference == "caf\u00e9"
+
+@pytest.mark.asyncio
+async def test_payment_rows_accept_optional_reference():
+    body = f"invoice_id,amount,currency\n{uuid4()},25.00,USD\n".encode()
+    rows = await collect(parse_payment_rows(iter_lines(chunks(body)), "csv"))
+
+    assert isinstance(rows[0], PaymentImportRow)
+    assert rows[0].reference is None
+
+@pytest.mark.asyncio
+async def test_import_payments_matches_open_invoices_and_enforces_due_amount():
+    invoice = Invoice.create(
+        student_id=uuid4(), school_id=uuid4(), amount=Money(Decimal("100.00"), Currency.USD), due_date=date.today()
+    )
+    invoice_repo = AsyncMock()
+    invoice_repo.lock_open_invoices.side_effect = lambda ids: {invoice.id: invoice} if invoice.id in ids else {}
+    handlers = make_command_handlers(invoice_repo=invoice_repo)
+
+    def row(line, invoice_id, amount, currency="USD"):
+        return PaymentImportRow(line=line, invoice_id=invoice_id, amount=amount, currency=currency, reference=f"TX{line}")
+
+    async def rows():
+        yield row(1, invoice.id, "60.00")
+        yield row(2, invoice.id, "60.00")  # would overpay after line 1
+        yield row(3, invoice.id, "10.00", "EUR")
+        yield row(4, uuid4(), "5.00")
+        yield row(5, invoice.id, "40.00")
+
+    report = await handlers.import_payments(rows())
+
+    assert (report.applied, report.unmatched, report.rejected) == (2, 1, 2)
+    assert report.unmatched_rows[0].line == 4 and "TX4" in report.unmatched_rows[0].error
+    assert {e.line for e in report.errors} == {2, 3}
+    invoice_repo.lock_open_invoices.assert_awaited_once()
+    touched, payments = invoice_repo.record_payments.await_args.args
+    assert touched == [invoice] and len(payments) == 2
+    assert invoice.status == InvoiceStatus.PAID
+    handlers.uow.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_import_payments_releases_locks_when_nothing_in_a_batch_matches():
+    invoice_repo = AsyncMock()
+    invoice_repo.lock_open_invoices.return_value = {}
+    handlers = make_command_handlers(invoice_repo=invoice_repo)
+
+    async def rows():
+        for line in (1, 2, 3):
+            yield PaymentImportRow(line=line, invoice_id=uuid4(), amount="5.00", currency="USD")
+
+    report = await handlers.import_payments(rows(), batch_size=2)
+
+    assert report.unmatched == 3
+    # Each batch ends its transaction before the next rows stream in
+    assert handlers.uow.rollback.await_count == 2
+    handlers.uow.commit.assert_not_awaited()
+    invoice_repo.record_payments.assert_not_awaited()
@@ -0,0 +1,12 @@
+from src.adapters.observability import LatencyHistogram
+
+def test_latency_histogram_cumulative_buckets():
+    hist = LatencyHistogram(buckets_ms=(1, 10, 100))
+    for value in (0.5, 3, 7, 50, 2000):
+        hist.observe(value)
+    
+    snap = hist.snapshot()
+    
+    assert snap["count"] == 5
+    assert snap["buckets"] == {"le_1": 1, "le_10": 3, "le_100": 4, "le_inf": 5}
+    assert snap["sum_ms"] == 2060.5
@@ -0,0 +1,36 @@
+import pytest
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import uuid4, UUID
+
+from src.application.pagination import PageCursor, decode_cursor, next_cursor
+from src.domain.exceptions import InvalidCursor
+
+@dataclass
+class Row:
+    id: UUID
+    created_at: datetime
+
+def test_cursor_round_trip():
+    cursor = PageCursor(sort_key=datetime(2026, 1, 10, 12, 30, 15, 123456), id=uuid4())
+    
+    token = cursor.encode()
+    
+    assert "=" not in token
+    assert PageCursor.decode(token) == cursor
+
+def test_invalid_cursor_raises():
+    with pytest.raises(InvalidCursor):
+        PageCursor.decode("not-a-cursor")
+
+def test_decode_cursor_none():
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+def test_next_cursor_only_on_full_page():
+    rows = [Row(id=uuid4(), created_at=datetime(2026, 1, d)) for d in (3, 2, 1)]
+    
+    assert next_cursor(rows[:2], 3, lambda r: r.created_at) is None
+    
+    token = next_cursor(rows, 3, lambda r: r.created_at)
+    assert PageCursor.decode(token) == PageCursor(sort_key=rows[-1].created_at, id=rows[-1].id)
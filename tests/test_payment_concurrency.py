@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.adapters.persistence.db import DATABASE_URL
+from src.adapters.persistence.models_business import InvoiceModel, PaymentModel
+from src.adapters.persistence.repos import (
+    SQLAlchemyUnitOfWork, SQLAlchemySchoolRepository, SQLAlchemyStudentRepository,
+    SQLAlchemyInvoiceRepository, SQLAlchemyBalanceProjectionRepository
+)
+from src.application.use_cases.commands import CommandHandlers
+from src.application.dtos import (
+    CreateSchoolCommand, CreateStudentCommand, CreateInvoiceCommand, ProcessPaymentCommand
+)
+from src.domain.enums import Currency, InvoiceStatus
+from src.domain.exceptions import PaymentExceedsDueAmount
+
+CONCURRENT_PAYMENTS = 300
+
+def make_handlers(session) -> CommandHandlers:
+    return CommandHandlers(
+        uow=SQLAlchemyUnitOfWork(session),
+        school_repo=SQLAlchemySchoolRepository(session),
+        student_repo=SQLAlchemyStudentRepository(session),
+        invoice_repo=SQLAlchemyInvoiceRepository(session),
+        projection_repo=SQLAlchemyBalanceProjectionRepository(session),
+        cache=AsyncMock()
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("engine")  # skips when no database is reachable
+async def test_concurrent_payments_never_overpay():
+    # Each payment runs on its own connection so the row lock is actually contended
+    engine = create_async_engine(DATABASE_URL, pool_size=50, max_overflow=0, pool_timeout=60)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with sessions() as session:
+            handlers = make_handlers(session)
+            school = await handlers.create_school(CreateSchoolCommand(name="Concurrency School"))
+            student = await handlers.create_student(CreateStudentCommand(school_id=school.id, name="Payer"))
+            invoice = await handlers.create_invoice(CreateInvoiceCommand(
+                student_id=student.id, amount=Decimal("100.00"), currency=Currency.USD, due_date=date(2030, 1, 1)
+            ))
+
+        async def pay():
+            async with sessions() as session:
+                return await make_handlers(session).process_payment(
+                    ProcessPaymentCommand(invoice_id=invoice.id, amount=Decimal("1.00"))
+                )
+
+        results = await asyncio.gather(*(pay() for _ in range(CONCURRENT_PAYMENTS)), return_exceptions=True)
+
+        succeeded = [r for r in results if not isinstance(r, BaseException)]
+        rejected = [r for r in results if isinstance(r, PaymentExceedsDueAmount)]
+        assert len(succeeded) == 100
+        assert len(rejected) == CONCURRENT_PAYMENTS - 100
+
+        async with sessions() as session:
+            row = (await session.execute(
+                select(InvoiceModel.amount_paid, InvoiceModel.status).where(InvoiceModel.id == invoice.id)
+            )).one()
+            payments = (await session.execute(
+                select(PaymentModel.id).where(PaymentModel.invoice_id == invoice.id)
+            )).all()
+        assert row.amount_paid == Decimal("100.00")
+        assert row.status == InvoiceStatus.PAID
+        assert len(payments) == 100
+    finally:
+        await engine.dispose()
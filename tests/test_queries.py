@@ -0,0 +1,458 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from decimal import Decimal
+from datetime import date, datetime
+
+from src.application.use_cases.queries import QueryHandlers
+from src.application.dtos import InvoiceDTO
+from src.application.ports.cache import CacheService, versioned_key
+from src.application.single_flight import SingleFlight
+from src.domain.entities import School
+from src.domain.enums import Currency, InvoiceStatus
+from src.domain.exceptions import EntityNotFound
+
+def make_invoice(total: str, paid: str, currency: Currency = Currency.USD) -> InvoiceDTO:
+    return InvoiceDTO(
+        id=uuid4(), amount_total=Decimal(total), amount_paid=Decimal(paid),
+        amount_due=Decimal(total) - Decimal(paid), currency=currency,
+        status=InvoiceStatus.PENDING, issued_at=datetime.utcnow(), due_date=date.today()
+    )
+
+def stored_key(cache) -> str:
+    key_prefix, report, suffix, version = cache.set_versioned_model.call_args.args[:4]
+    return versioned_key(key_prefix, report, version, suffix)
+
+def make_handlers(statement_repo=None, school_repo=None) -> QueryHandlers:
+    return QueryHandlers(
+        statement_repo=statement_repo or MagicMock(),
+        school_repo=school_repo or AsyncMock(),
+        student_repo=AsyncMock(),
+        invoice_repo=AsyncMock(),
+        cache=AsyncMock()
+    )
+
+@pytest.mark.asyncio
+async def test_stream_school_statement_emits_rows_then_trailer():
+    school = School.create(name="Springfield")
+    batches = [
+        [make_invoice("100.00", "40.00"), make_invoice("50.00", "0.00")],
+        [make_invoice("80.00", "80.00", Currency.EUR)],
+    ]
+
+    async def stream(school_id, batch_size=1000):
+        for batch in batches:
+            yield batch
+
+    statement_repo = MagicMock()
+    statement_repo.stream_school_invoices = stream
+    school_repo = AsyncMock()
+    school_repo.get_by_id.return_value = school
+    handlers = make_handlers(statement_repo, school_repo)
+
+    lines = []
+    async for chunk in await handlers.stream_school_account_statement(school.id):
+        lines.extend(chunk.splitlines())
+
+    assert len(lines) == 4
+    trailer = json.loads(lines[-1])
+    assert trailer["type"] == "summary"
+    assert trailer["invoice_count"] == 3
+    totals = {t["currency"]: t for t in trailer["totals"]}
+    assert Decimal(totals["USD"]["total_due"]) == Decimal("110.00")
+    assert Decimal(totals["EUR"]["total_due"]) == Decimal("0.00")
+
+@pytest.mark.asyncio
+async def test_stream_school_statement_unknown_school():
+    school_repo = AsyncMock()
+    school_repo.get_by_id.return_value = None
+    handlers = make_handlers(school_repo=school_repo)
+
+    with pytest.raises(EntityNotFound):
+        await handlers.stream_school_account_statement(uuid4())
+
+@pytest.mark.asyncio
+async def test_paginated_statement_uses_summary_totals_and_page_key():
+    from src.application.dtos import StatementSummaryDTO, CurrencyTotalDTO, PaginationParams
+
+    student_id = uuid4()
+    summary = StatementSummaryDTO(
+        entity_id=student_id, generated_at=datetime.utcnow(), invoice_count=30,
+        totals=[CurrencyTotalDTO(
+            currency=Currency.USD, invoice_count=30, total_invoiced=Decimal("3000.00"),
+            total_paid=Decimal("500.00"), total_due=Decimal("2500.00")
+        )]
+    )
+    page_rows = [make_invoice("100.00", "0.00") for _ in range(2)]
+    statement_repo = AsyncMock()
+    statement_repo.get_student_summary.return_value = summary
+    statement_repo.list_student_invoices.return_value = page_rows
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (7, None)
+
+    statement = await handlers.get_student_account_statement(student_id, PaginationParams(limit=2))
+
+    assert statement.total_due == Decimal("2500.00")
+    assert statement.invoice_count == 30
+    assert statement.currency == "USD"
+    assert statement.next_cursor is not None
+    cache_key = stored_key(handlers.cache)
+    assert cache_key == f"{{student:{student_id}}}:statement:v7:l2:first"
+    statement_repo.get_student_statement.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_paginated_statement_headline_for_empty_and_mixed_totals():
+    from src.application.dtos import StatementSummaryDTO, CurrencyTotalDTO, PaginationParams
+
+    def total(currency: Currency, due: str) -> CurrencyTotalDTO:
+        return CurrencyTotalDTO(
+            currency=currency, invoice_count=1, total_invoiced=Decimal(due), total_paid=Decimal(0), total_due=Decimal(due)
+        )
+
+    statement_repo = AsyncMock()
+    statement_repo.list_student_invoices.return_value = []
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (1, None)
+    headlines = []
+    for totals in ([], [total(Currency.USD, "10.00"), total(Currency.EUR, "5.00")]):
+        statement_repo.get_student_summary.return_value = StatementSummaryDTO(
+            entity_id=uuid4(), generated_at=datetime.utcnow(), invoice_count=len(totals), totals=totals
+        )
+        statement = await handlers.get_student_account_statement(uuid4(), PaginationParams(limit=2))
+        headlines.append((statement.currency, statement.total_due))
+
+    # No invoices: no currency at all; several currencies: no meaningful single total
+    assert headlines == [(None, Decimal(0)), ("MIXED", Decimal(0))]
+
+@pytest.mark.asyncio
+async def test_school_aging_is_cached_per_version_day_and_breakdown():
+    from src.application.dtos import AgingReportDTO, AgingBucketsDTO
+
+    school_id = uuid4()
+    report = AgingReportDTO(
+        entity_id=school_id, as_of=date(2099, 3, 1), generated_at=datetime.utcnow(),
+        buckets=[AgingBucketsDTO(currency=Currency.USD, invoice_count=2, days_1_30=Decimal("40.00"), total_due=Decimal("40.00"))]
+    )
+    statement_repo = AsyncMock()
+    statement_repo.get_school_aging.return_value = report
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (3, None)
+
+    result = await handlers.get_school_aging(school_id, date(2099, 3, 1), by_student=True)
+
+    assert result == report
+    statement_repo.get_school_aging.assert_awaited_once_with(school_id, date(2099, 3, 1), True)
+    assert stored_key(handlers.cache) == f"{{school:{school_id}}}:aging:v3:2099-03-01:students"
+
+    handlers.cache.get_versioned_model.return_value = (3, report)
+    cached = await handlers.get_school_aging(school_id, date(2099, 3, 1), by_student=True)
+    assert cached.buckets[0].days_1_30 == Decimal("40.00")
+    assert statement_repo.get_school_aging.await_count == 1
+
+@pytest.mark.asyncio
+async def test_aging_rejects_a_past_as_of():
+    from src.domain.exceptions import InvalidDateRange
+
+    statement_repo = AsyncMock()
+    handlers = make_handlers(statement_repo)
+
+    with pytest.raises(InvalidDateRange):
+        await handlers.get_student_aging(uuid4(), date(2020, 1, 1))
+    statement_repo.get_student_aging.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_student_aging_unknown_student_raises():
+    statement_repo = AsyncMock()
+    statement_repo.get_student_aging.return_value = None
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (0, None)
+
+    with pytest.raises(EntityNotFound):
+        await handlers.get_student_aging(uuid4())
+
+@pytest.mark.asyncio
+async def test_school_receivables_page_sets_cursor_from_last_school():
+    from src.application.dtos import PaginationParams, SchoolReceivablesDTO
+    from src.application.pagination import PageCursor
+
+    schools = [
+        SchoolReceivablesDTO(id=uuid4(), name=f"School {n}", created_at=datetime(2026, 1, n), totals=[])
+        for n in (2, 1)
+    ]
+    statement_repo = AsyncMock()
+    statement_repo.list_school_receivables.return_value = schools
+    statement_repo.count_school_receivables.return_value = 5
+    handlers = make_handlers(statement_repo)
+
+    page = await handlers.list_school_receivables(PaginationParams(limit=2, include_total=True))
+
+    assert page.items == schools
+    assert page.total == 5
+    cursor = PageCursor.decode(page.next_cursor)
+    assert (cursor.sort_key, cursor.id) == (schools[-1].created_at, schools[-1].id)
+
+    after = page.next_cursor
+    statement_repo.list_school_receivables.return_value = schools[:1]
+    last = await handlers.list_school_receivables(PaginationParams(limit=2, after=after))
+    assert last.next_cursor is None and last.total is None
+    assert statement_repo.list_school_receivables.call_args.kwargs["after"] == cursor
+
+@pytest.mark.asyncio
+async def test_school_collections_defaults_and_validates_the_range():
+    from src.application.dtos import CollectionsSeriesDTO
+    from src.domain.exceptions import InvalidDateRange
+
+    school_id = uuid4()
+    statement_repo = AsyncMock()
+    statement_repo.get_school_collections.side_effect = lambda school_id, start, end: CollectionsSeriesDTO(
+        school_id=school_id, from_date=start, to_date=end, generated_at=datetime.utcnow(), points=[]
+    )
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (1, None)
+
+    series = await handlers.get_school_collections(school_id, end=date(2026, 3, 31))
+    assert (series.from_date, series.to_date) == (date(2026, 3, 2), date(2026, 3, 31))
+    assert stored_key(handlers.cache) == f"{{school:{school_id}}}:collections:v1:2026-03-02:2026-03-31"
+
+    with pytest.raises(InvalidDateRange):
+        await handlers.get_school_collections(school_id, date(2026, 4, 1), date(2026, 3, 31))
+    with pytest.raises(InvalidDateRange):
+        await handlers.get_school_collections(school_id, date(2025, 1, 1), date(2026, 3, 31))
+    assert statement_repo.get_school_collections.await_count == 1
+
+@pytest.mark.asyncio
+async def test_student_period_statement_is_cached_per_range():
+    from src.application.dtos import AccountStatementDTO
+
+    student_id = uuid4()
+    statement = AccountStatementDTO(
+        entity_id=student_id, generated_at=datetime.utcnow(), invoices=[], total_due=Decimal("0"), currency="MIXED"
+    )
+    statement_repo = AsyncMock()
+    statement_repo.get_student_period_statement.return_value = statement
+    handlers = make_handlers(statement_repo)
+    handlers.cache.get_versioned_model.return_value = (4, None)
+
+    await handlers.get_student_period_statement(student_id, date(2026, 1, 1), date(2026, 1, 31))
+
+    statement_repo.get_student_period_statement.assert_awaited_once_with(student_id, date(2026, 1, 1), date(2026, 1, 31))
+    # Distinct from the full (`...:v4`) and paginated (`...:v4:l10:first`) statement keys
+    assert stored_key(handlers.cache) == f"{{student:{student_id}}}:statement:v4:2026-01-01:2026-01-31"
+
+class InMemoryCache(CacheService):
+    """Shared store standing in for Redis; every call yields to the loop like a network hop would."""
+
+    def __init__(self):
+        self.values = {}
+        self.versions = {}
+        self.locks = {}
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        await asyncio.sleep(0)
+        self.values[key] = value
+
+    async def increment_version(self, key_prefix):
+        await self.increment_versions([key_prefix])
+
+    async def increment_versions(self, key_prefixes):
+        await asyncio.sleep(0)
+        for key_prefix in key_prefixes:
+            self.versions[key_prefix] = self.versions.get(key_prefix, 0) + 1
+
+    async def get_version(self, key_prefix):
+        await asyncio.sleep(0)
+        return self.versions.get(key_prefix, 0)
+
+    async def acquire_lock(self, key, ttl_ms):
+        await asyncio.sleep(0)
+        if key in self.locks:
+            return None
+        self.locks[key] = token = str(uuid4())
+        return token
+
+    async def release_lock(self, key, token):
+        if self.locks.get(key) == token:
+            del self.locks[key]
+
+@pytest.mark.asyncio
+async def test_concurrent_statement_misses_build_once_per_version_across_instances(monkeypatch):
+    from src.application.dtos import AccountStatementDTO
+    from src.application.use_cases.queries import statement as statement_queries
+
+    monkeypatch.setattr(statement_queries, "REBUILD_POLL_SECONDS", 0.001)
+    student_id = uuid4()
+    queries = 0
+
+    async def get_student_statement(entity_id):
+        nonlocal queries
+        queries += 1
+        await asyncio.sleep(0.02)  # the aggregate takes a while: every request misses meanwhile
+        return AccountStatementDTO(
+            entity_id=entity_id, generated_at=datetime.utcnow(), invoices=[], total_due=Decimal("0"), currency="USD"
+        )
+
+    cache = InMemoryCache()
+    statement_repo = AsyncMock()
+    statement_repo.get_student_statement.side_effect = get_student_statement
+    # Two API instances: separate processes share the cache, but not their in-flight rebuilds
+    instances = []
+    for _ in range(2):
+        handlers = make_handlers(statement_repo)
+        handlers.cache = cache
+        handlers._rebuilds = SingleFlight()
+        instances.append(handlers)
+
+    async def burst(requests: int):
+        return await asyncio.gather(*(
+            instances[n % 2].get_student_account_statement(student_id) for n in range(requests)
+        ))
+
+    statements = await burst(100)
+    assert queries == 1
+    assert all(s.entity_id == student_id for s in statements)
+
+    await burst(100)
+    assert queries == 1
+
+    await cache.increment_version(f"student:{student_id}")
+    await burst(100)
+    assert queries == 2
+    assert cache.locks == {}
+
+@pytest.mark.asyncio
+async def test_statement_served_stale_while_the_new_version_is_rebuilt():
+    from src.application.dtos import AccountStatementDTO
+
+    student_id = uuid4()
+    builds = []
+
+    async def get_student_statement(entity_id):
+        builds.append(entity_id)
+        return AccountStatementDTO(
+            entity_id=entity_id, generated_at=datetime.utcnow(), invoices=[],
+            total_due=Decimal(len(builds)), currency="USD"
+        )
+
+    statement_repo = AsyncMock()
+    statement_repo.get_student_statement.side_effect = get_student_statement
+    pending = []
+    handlers = make_handlers(statement_repo)
+    handlers.cache = InMemoryCache()
+    handlers.stale_seconds = 300
+    handlers.revalidate = pending.append
+
+    first = await handlers.get_student_account_statement(student_id)
+    assert (first.total_due, first.stale) == (Decimal(1), False)
+
+    await handlers.cache.increment_version(f"student:{student_id}")
+    stale = await handlers.get_student_account_statement(student_id)
+    again = await handlers.get_student_account_statement(student_id)
+    assert (stale.total_due, stale.stale, again.stale) == (Decimal(1), True, True)
+    # One background rebuild queued, none run inline
+    assert len(pending) == 1 and len(builds) == 1
+
+    await pending[0](handlers)
+    rebuilt = await handlers.get_student_account_statement(student_id)
+    assert (rebuilt.total_due, rebuilt.stale) == (Decimal(2), False)
+
+    await handlers.cache.increment_version(f"student:{student_id}")
+    fresh = await handlers.get_student_account_statement(student_id, fresh=True)
+    assert (fresh.total_due, fresh.stale) == (Decimal(3), False)
+    assert len(pending) == 1
+
+@pytest.mark.asyncio
+async def test_statement_endpoint_reads_fresh_when_a_consistency_token_is_sent():
+    from httpx import AsyncClient
+    from src.main import app
+    from src.adapters.web.handlers import get_query_handlers
+    from src.application.dtos import AccountStatementDTO
+
+    student_id = uuid4()
+    handlers = MagicMock()
+    handlers.get_student_account_statement = AsyncMock(return_value=AccountStatementDTO(
+        entity_id=student_id, generated_at=datetime.utcnow(), invoices=[], total_due=Decimal(0), currency="USD"
+    ))
+    app.dependency_overrides[get_query_handlers] = lambda: handlers
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            plain = await client.get(f"/students/{student_id}/account-statement")
+            after_write = await client.get(
+                f"/students/{student_id}/account-statement", headers={"X-Consistency-Token": "0/16B3748"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert plain.status_code == after_write.status_code == 200
+    fresh_flags = [call.args[2] for call in handlers.get_student_account_statement.await_args_list]
+    assert fresh_flags == [False, True]
+
+@pytest.mark.asyncio
+async def test_statement_endpoint_rejects_an_empty_page():
+    from httpx import AsyncClient
+    from src.main import app
+    from src.adapters.web.handlers import get_query_handlers
+
+    handlers = MagicMock()
+    app.dependency_overrides[get_query_handlers] = lambda: handlers
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(f"/schools/{uuid4()}/account-statement", params={"limit": 0})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+    handlers.get_school_account_statement.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_fresh_reads_bypass_the_versioned_cache():
+    from src.application.dtos import AgingReportDTO
+
+    student_id = uuid4()
+    as_of = date(2099, 3, 1)
+    cached, current = (
+        AgingReportDTO(entity_id=student_id, as_of=as_of, generated_at=datetime.utcnow(), buckets=[])
+        for _ in range(2)
+    )
+    statement_repo = AsyncMock()
+    statement_repo.get_student_aging.return_value = current
+    handlers = make_handlers(statement_repo)
+    # Possibly built by a reader that did not see the caller's write yet
+    handlers.cache.get_versioned_model.return_value = (4, cached)
+
+    assert await handlers.get_student_aging(student_id, as_of, fresh=True) is current
+    handlers.cache.get_versioned_model.assert_not_awaited()
+    handlers.cache.set_versioned_model.assert_not_awaited()
+    assert await handlers.get_student_aging(student_id, as_of) is cached
+
+@pytest.mark.asyncio
+async def test_replica_handlers_build_cache_entries_on_the_primary():
+    from src.application.dtos import CollectionsSeriesDTO
+
+    school_id = uuid4()
+    series = CollectionsSeriesDTO(
+        school_id=school_id, from_date=date(2026, 3, 1), to_date=date(2026, 3, 2), generated_at=datetime.utcnow(), points=[]
+    )
+    primary = make_handlers(AsyncMock())
+    primary.statement_repo.get_school_collections.return_value = series
+    replica = make_handlers(AsyncMock())
+    replica.cache = primary.cache
+    replica.cache.get_versioned_model.return_value = (5, None)
+    on_primary = []
+
+    async def run_on_primary(work):
+        on_primary.append(work)
+        return await work(primary)
+
+    replica.on_primary = run_on_primary
+
+    result = await replica.get_school_collections(school_id, date(2026, 3, 1), date(2026, 3, 2))
+
+    assert result == series and len(on_primary) == 1
+    replica.statement_repo.get_school_collections.assert_not_awaited()
+    assert stored_key(primary.cache) == f"{{school:{school_id}}}:collections:v5:2026-03-01:2026-03-02"